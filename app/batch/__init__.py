@@ -0,0 +1,245 @@
+# app/batch/__init__.py
+
+# -----------------------------------------------------------------------------------
+# Non-interactive (batch) evaluation of calculator commands.
+# -----------------------------------------------------------------------------------
+
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, TextIO, Tuple
+from app.calculation import CalculationFactory
+from app.expression import EXPRESSION_START, evaluate_expression
+from app.history import CalculationHistory
+
+# One-line usage summary returned for the 'help' command.
+HELP_LINE = "usage: <operation> <num1> <num2> | <expression> | history | help | exit"
+
+
+def format_error(kind: str, message: object) -> str:
+    """
+    Formats an error as a structured result line, e.g.
+
+        error: division_by_zero: Cannot divide by zero.
+    """
+    return f"error: {kind}: {message}"
+
+
+# -----------------------------------------------------------------------------------
+# Session: command evaluation without prompts or printing
+# -----------------------------------------------------------------------------------
+class Session:
+    """
+    A Session evaluates the same grammar as the calculator REPL, but returns one
+    result line per command instead of printing. Errors never raise; they come
+    back as structured `error: <kind>: <message>` lines so a run can continue.
+    Each session keeps its own history.
+
+    """
+
+    def __init__(self) -> None:
+        self.history = CalculationHistory()
+
+    def evaluate(self, line: str) -> Optional[str]:
+        """
+        Evaluates one command line and returns its result line, or None for blank
+        lines and '#' comments.
+
+        """
+        line = line.strip()
+        if not line or line[0] == '#':
+            return None
+        command = line.lower()
+        if command == "help":
+            return HELP_LINE
+        if command == "history":
+            return self.format_history()
+        if line[0] in EXPRESSION_START:
+            return self.evaluate_expression(line)
+        return self.evaluate_calculation(line)
+
+    def evaluate_calculation(self, line: str) -> str:
+        try:
+            operation, num1, num2 = line.split()
+            a, b = float(num1), float(num2)
+        except ValueError:
+            return format_error("invalid_input", "expected <operation> <num1> <num2>")
+        try:
+            calculation = CalculationFactory.create_calculation(operation, a, b)
+        except ValueError as e:
+            return format_error("unsupported_operation", e)
+        try:
+            result = calculation.result
+        except ZeroDivisionError as e:
+            return format_error("division_by_zero", e)
+        except OverflowError as e:
+            return format_error("overflow", e.args[-1])
+        self.history.append(calculation)
+        return f"{result}"
+
+    def evaluate_expression(self, line: str) -> str:
+        try:
+            return f"{evaluate_expression(line)}"
+        except ZeroDivisionError as e:
+            return format_error("division_by_zero", e)
+        except OverflowError as e:
+            return format_error("overflow", e.args[-1])
+        except ValueError as e:
+            return format_error("invalid_expression", e)
+        except RecursionError:
+            # The expression module reports nesting it detects as ValueError; this catches
+            # anything deeper that slips through, so one input line never ends the run.
+            return format_error("invalid_expression", "Invalid expression: too deeply nested.")
+
+    def format_history(self) -> str:
+        if not self.history:
+            return "No calculations performed yet."
+        return "; ".join(f"{idx}. {calculation}" for idx, calculation in enumerate(self.history, start=1))
+
+
+# -----------------------------------------------------------------------------------
+# Generator pipeline
+# -----------------------------------------------------------------------------------
+
+def read_commands(stream: Iterable[str]) -> Iterator[str]:
+    """Yields stripped command lines from a stream, stopping at 'exit'."""
+    for line in stream:
+        line = line.strip()
+        if line.lower() == "exit":
+            return
+        yield line
+
+
+def evaluate_commands(lines: Iterable[str], session: Session) -> Iterator[str]:
+    """Yields the result line of every command; blank lines and comments produce none."""
+    evaluate = session.evaluate
+    for line in lines:
+        response = evaluate(line)
+        if response is not None:
+            yield response
+
+
+def run_batch(stream: Iterable[str], out: TextIO, session: Optional[Session] = None) -> int:
+    """
+    Streams commands from `stream` through a Session and writes one result line per
+    command to `out`. Nothing is prompted, printed or flushed per line; `out` should
+    be a buffered writer and is flushed once at the end. Returns the number of
+    result lines written.
+
+    """
+    session = session if session is not None else Session()
+    write = out.write
+    count = 0
+    for response in evaluate_commands(read_commands(stream), session):
+        write(response)
+        write("\n")
+        count += 1
+    out.flush()
+    return count
+
+
+# -----------------------------------------------------------------------------------
+# Multi-process evaluation
+# -----------------------------------------------------------------------------------
+
+def iter_chunks(lines: Iterable[str], chunk_size: int) -> Iterator[List[str]]:
+    """Groups lines into lists of at most `chunk_size` lines without reading ahead further."""
+    iterator = iter(lines)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# (maxsize, ttl, error_ttl, SQLite cache file or None) of the parent's result cache.
+CacheSettings = Tuple[int, Optional[float], Optional[float], Optional[str]]
+
+
+def cache_settings() -> Optional[CacheSettings]:
+    """Describes CalculationFactory.result_cache so that workers can open their own (None if unset)."""
+    cache = CalculationFactory.result_cache
+    if cache is None:
+        return None
+    return cache.maxsize, cache.ttl, cache.error_ttl, getattr(cache.backing, 'path', None)
+
+
+def init_worker(settings: Optional[CacheSettings]) -> None:
+    """
+    Sets up the result cache of a worker process. A forked worker inherits the
+    parent's cache, but not its SQLite writer thread, so anything it computed
+    would never reach the file; each worker opens the file again instead and
+    writes its pending results when it exits.
+
+    """
+    if settings is None:
+        CalculationFactory.result_cache = None
+        return
+    from app.cache import ResultCache
+    maxsize, ttl, error_ttl, path = settings
+    backing = None
+    if path is not None:
+        from multiprocessing.util import Finalize
+        from app.disk_cache import SQLiteResultCache
+        backing = SQLiteResultCache(path)
+        # Worker processes end without running atexit handlers, but they do run these.
+        Finalize(backing, backing.close, exitpriority=10)
+    CalculationFactory.result_cache = ResultCache(maxsize, ttl, error_ttl, backing=backing)
+
+
+def evaluate_chunk(lines: List[str]) -> List[str]:
+    """
+    Evaluates a chunk of commands in a worker process. Chunks are evaluated
+    independently, so there is no shared history to show; 'history' produces an
+    error line instead.
+
+    """
+    session = Session()
+    responses = []
+    for line in lines:
+        if line.lower() == "history":
+            responses.append(format_error("unsupported_command", "history is not available with --workers"))
+            continue
+        response = session.evaluate(line)
+        if response is not None:
+            responses.append(response)
+    return responses
+
+
+def run_parallel(stream: Iterable[str], out: TextIO, workers: int, chunk_size: int = 10000,
+                 max_pending: Optional[int] = None) -> int:
+    """
+    Splits the command stream into chunks and evaluates them in a ProcessPoolExecutor
+    with `workers` processes, each using CalculationFactory on its own. Results are
+    written in input order: futures wait in a FIFO reorder buffer and are written
+    as the oldest one completes, even if later chunks finish first.
+
+    At most `max_pending` chunks (default: twice the number of workers) are in
+    flight or waiting to be written, so memory stays bounded no matter how large
+    the input is. Each worker opens its own copy of the result cache (see
+    init_worker). Returns the number of result lines written.
+
+    """
+    max_pending = max_pending or workers * 2
+    write = out.write
+    count = 0
+    pending = deque()
+
+    def write_oldest() -> int:
+        responses = pending.popleft().result()
+        if responses:
+            write("\n".join(responses))
+            write("\n")
+        return len(responses)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(cache_settings(),)) as executor:
+        for chunk in iter_chunks(read_commands(stream), chunk_size):
+            if len(pending) >= max_pending:
+                count += write_oldest()
+            pending.append(executor.submit(evaluate_chunk, chunk))
+        while pending:
+            count += write_oldest()
+    out.flush()
+    return count
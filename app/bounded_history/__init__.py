@@ -0,0 +1,221 @@
+# app/bounded_history/__init__.py
+
+# -----------------------------------------------------------------------------------
+# Bounded calculation history: a fixed in-memory ring that spills to disk.
+# -----------------------------------------------------------------------------------
+
+
+import os
+import queue
+import tempfile
+import threading
+import time
+from array import array
+from typing import Dict, Iterator, List, Optional, Union
+from app.calculation import Calculation, CalculationFactory
+from app.history import Entry, HistoryObserver, ObservableHistory, calculation_from_entry, stored_value
+from app.history_log import HistoryLog
+
+DEFAULT_CAPACITY = 10000
+
+
+# -----------------------------------------------------------------------------------
+# History Store: BoundedHistory
+# -----------------------------------------------------------------------------------
+class BoundedHistory(ObservableHistory):
+    """
+    BoundedHistory keeps the newest `capacity` calculations in preallocated
+    columns used as a ring buffer. When the ring is full, its oldest eighth is
+    handed to a background thread that appends it to a HistoryLog segment, so
+    memory stays flat however long a session runs and append() never waits
+    for the disk.
+
+    Positions count from the oldest entry on disk, and indexing and iteration
+    page through both tiers transparently. With `path` the segment is a
+    persistent history log (earlier sessions come first, and close() writes
+    the ring out too); without it, a temporary file is used and removed on close().
+
+    If writing to the segment fails (for example when the disk is full), the
+    spill thread records the error and keeps draining its queue, so nothing
+    waits for it forever; the next append() or read of an on-disk entry
+    raises RuntimeError naming the original error.
+
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, path: Optional[str] = None) -> None:
+        if capacity < 1:
+            raise ValueError("BoundedHistory capacity must be at least 1.")
+        self.capacity = capacity
+        self._persistent = path is not None
+        if path is None:
+            directory = tempfile.mkdtemp(prefix='calculator-history-')
+            path = os.path.join(directory, 'spill.log')
+        self._log = HistoryLog(path)
+        self._log_lock = threading.Lock()  # The spill thread and readers share the log.
+        # Ring columns: entry at position p lives in slot p % capacity.
+        self._codes = array('B', bytes(capacity))
+        self._a = array('d', bytes(8 * capacity))
+        self._b = array('d', bytes(8 * capacity))
+        self._results = array('d', bytes(8 * capacity))
+        self._timestamps = array('d', bytes(8 * capacity))
+        self._names: List[str] = []
+        self._name_codes: Dict[str, int] = {}
+        self._start = len(self._log)  # Position of the oldest entry in the ring.
+        self._end = self._start  # Position after the newest entry.
+        self._observers: List[HistoryObserver] = []
+        # Entries leave the ring in blocks, so the hand-off to the spill thread is rare.
+        self._block = max(1, capacity // 8)
+        # Bounded, so a disk that cannot keep up slows appends down instead of growing memory.
+        self._spill_queue: queue.Queue = queue.Queue(maxsize=8)
+        self._spill_error: Optional[BaseException] = None
+        self._closed = False
+        self._spiller = threading.Thread(target=self._spill, name='history-spill', daemon=True)
+        self._spiller.start()
+
+    @property
+    def path(self) -> str:
+        return self._log.path
+
+    def _code_for(self, name: str) -> int:
+        code = self._name_codes.get(name)
+        if code is None:
+            code = len(self._names)
+            if code > 255:
+                raise ValueError("BoundedHistory supports at most 256 calculation types.")
+            self._names.append(name)
+            self._name_codes[name] = code
+        return code
+
+    # -- writing ----------------------------------------------------------------------
+    def append(self, calculation: Calculation) -> None:
+        """Adds a calculation, moving the oldest entry to disk when the ring is full."""
+        if self._spill_error is not None:
+            self._raise_spill_error()
+        result = stored_value(calculation.result)
+        a, b = stored_value(calculation.a), stored_value(calculation.b)
+        calculation_class = type(calculation)
+        name = CalculationFactory._registry.names.get(calculation_class, calculation_class.__name__)
+        code = self._code_for(name)
+        if self._end - self._start == self.capacity:
+            self._evict(self._block)
+        slot = self._end % self.capacity
+        self._codes[slot] = code
+        self._a[slot] = a
+        self._b[slot] = b
+        self._results[slot] = result
+        self._timestamps[slot] = time.time()
+        self._end += 1
+        if self._observers:
+            self._notify(self._end - 1, name, a, b, result)
+
+    def _evict(self, count: int) -> None:
+        """Hands the oldest `count` entries of the ring to the spill thread."""
+        names, codes, a, b, results, timestamps = (
+            self._names, self._codes, self._a, self._b, self._results, self._timestamps)
+        block = []
+        for position in range(self._start, self._start + count):
+            slot = position % self.capacity
+            block.append((names[codes[slot]], a[slot], b[slot], results[slot], timestamps[slot]))
+        self._spill_queue.put(block)
+        self._start += count
+
+    def _spill(self) -> None:
+        """Body of the background thread: appends evicted entries to the log."""
+        while True:
+            block = self._spill_queue.get()
+            try:
+                if block is None:
+                    return
+                # After a failure the remaining blocks are dropped, but still taken off
+                # the queue so that appends and readers never wait for this thread.
+                if self._spill_error is None:
+                    with self._log_lock:
+                        append_entry = self._log.append_entry
+                        for entry in block:
+                            append_entry(*entry)
+            except Exception as error:
+                self._spill_error = error
+            finally:
+                self._spill_queue.task_done()
+
+    def _raise_spill_error(self) -> None:
+        error = self._spill_error
+        raise RuntimeError(f"Moving history entries to '{self.path}' failed: {error}") from error
+
+    # -- reading ----------------------------------------------------------------------
+    def _entry(self, position: int) -> Entry:
+        if position >= self._start:
+            slot = position % self.capacity
+            return self._names[self._codes[slot]], self._a[slot], self._b[slot], self._results[slot]
+        self._spill_queue.join()  # Entries still on their way to disk are not readable yet.
+        if self._spill_error is not None:
+            self._raise_spill_error()
+        with self._log_lock:
+            name, a, b, result, _ = self._log.record(position)
+        return name, a, b, result
+
+    def entries(self) -> Iterator[Entry]:
+        """Yields every entry as (operation name, a, b, result), oldest first."""
+        for position in range(self._end):
+            yield self._entry(position)
+
+    def entry(self, index: int) -> Entry:
+        """Returns entry `index` as (operation name, a, b, result)."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("history index out of range")
+        return self._entry(index)
+
+    @property
+    def in_memory(self) -> int:
+        """Number of entries held in the ring."""
+        return self._end - self._start
+
+    def __len__(self) -> int:
+        return self._end
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Calculation, List[Calculation]]:
+        if isinstance(index, slice):
+            return [calculation_from_entry(*self._entry(i)) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("history index out of range")
+        return calculation_from_entry(*self._entry(index))
+
+    def __iter__(self) -> Iterator[Calculation]:
+        for entry in self.entries():
+            yield calculation_from_entry(*entry)
+
+    # -- shutdown ---------------------------------------------------------------------
+    def close(self) -> None:
+        """
+        Stops the spill thread and closes the segment. A persistent segment
+        receives the ring's entries first; a temporary one is deleted. If
+        writing the segment failed, the segment is still closed (and a
+        temporary one deleted) before the error is raised.
+
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self._persistent and self._end > self._start and self._spill_error is None:
+            self._evict(self._end - self._start)
+        self._spill_queue.put(None)
+        self._spiller.join()
+        self._log.close()
+        if not self._persistent:
+            os.remove(self._log.path)
+            os.rmdir(os.path.dirname(self._log.path))
+        if self._spill_error is not None:
+            self._raise_spill_error()
+
+    def __enter__(self) -> 'BoundedHistory':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(capacity={self.capacity}, entries={len(self)}, in_memory={self.in_memory})"
@@ -0,0 +1,147 @@
+# app/cache/__init__.py
+
+# -----------------------------------------------------------------------------------
+# Memoization of calculation results.
+# -----------------------------------------------------------------------------------
+
+
+import threading
+import time
+from collections import OrderedDict
+from decimal import Decimal, getcontext
+from typing import Any, Callable, Hashable, NamedTuple, Optional, Tuple, Type
+
+# Errors that depend only on the operands, so they can be remembered like results.
+CACHEABLE_ERRORS: Tuple[Type[BaseException], ...] = (ArithmeticError,)
+
+_MISSING = object()
+
+
+def make_key(calculation_class: type, a: Any, b: Any) -> Tuple:
+    """
+    Builds the cache key of a calculation. Operand types are part of the key so
+    that 1, 1.0 and True do not share an entry, and zeros also carry their repr
+    because 0.0 == -0.0 although e.g. -0.0 * 5 and 0.0 * 5 print differently.
+    Keys of Decimal operands include the context precision.
+
+    """
+    key = (calculation_class, type(a), a, type(b), b)
+    if not (a and b):
+        key += (repr(a), repr(b))
+    if type(a) is Decimal or type(b) is Decimal:
+        # Decimal results depend on the precision of the current context as well.
+        key += (getcontext().prec,)
+    return key
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    error_hits: int
+    size: int
+    maxsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+# -----------------------------------------------------------------------------------
+# ResultCache
+# -----------------------------------------------------------------------------------
+class ResultCache:
+    """
+    A bounded LRU cache of calculation results, with an optional time-to-live.
+
+    Errors listed in CACHEABLE_ERRORS (division by zero, overflow) are cached as
+    well, with their own `error_ttl`, and raised again on a hit; `error_hits`
+    counts those hits separately. Other exceptions are never cached.
+
+    A `backing` cache with the same calculate() method (such as
+    app.disk_cache.SQLiteResultCache) is consulted on every miss before the
+    calculation is executed.
+
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None, error_ttl: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic, backing: Optional[Any] = None) -> None:
+        if maxsize < 1:
+            raise ValueError("ResultCache maxsize must be at least 1.")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.error_ttl = ttl if error_ttl is None else error_ttl
+        self._clock = clock
+        self.backing = backing
+        # key -> (value or exception, is_error, expiry time or None)
+        self._entries: 'OrderedDict[Hashable, Tuple[Any, bool, Optional[float]]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = self.error_hits = 0
+
+    def _lookup(self, key: Hashable):
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING:
+                expiry = entry[2]
+                if expiry is not None and self._clock() >= expiry:
+                    del self._entries[key]
+                    self.expirations += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    if entry[1]:
+                        self.error_hits += 1
+                    return entry
+            self.misses += 1
+            return _MISSING
+
+    def _store(self, key: Hashable, value: Any, is_error: bool) -> None:
+        ttl = self.error_ttl if is_error else self.ttl
+        expiry = None if ttl is None else self._clock() + ttl
+        with self._lock:
+            self._entries[key] = (value, is_error, expiry)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Returns the cached value of `key`, or calls `compute` and caches its outcome."""
+        entry = self._lookup(key)
+        if entry is _MISSING:
+            try:
+                value = compute()
+            except CACHEABLE_ERRORS as error:
+                self._store(key, (type(error), error.args), True)
+                raise
+            self._store(key, value, False)
+            return value
+        value, is_error, _ = entry
+        if is_error:
+            error_type, args = value
+            raise error_type(*args)
+        return value
+
+    def calculate(self, calculation) -> Any:
+        """Returns the result of `calculation`, executing it only on a cache miss."""
+        key = make_key(type(calculation), calculation.a, calculation.b)
+        backing = self.backing
+        if backing is None:
+            return self.get_or_compute(key, calculation.execute)
+        return self.get_or_compute(key, lambda: backing.calculate(calculation))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        return CacheStats(self.hits, self.misses, self.evictions, self.expirations, self.error_hits,
+                          len(self._entries), self.maxsize)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(maxsize={self.maxsize}, ttl={self.ttl}, entries={len(self)})"
@@ -5,8 +5,25 @@
 # -----------------------------------------------------------------------------------
 
 
+import importlib
+import math
+import threading
+import weakref
 from abc import ABC, abstractmethod
-from app.operations import Operations
+from array import array
+from itertools import compress
+from time import perf_counter_ns
+from types import MappingProxyType
+from typing import Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Type, Union
+from app.dispatch import AmbiguousNameError, PrefixTable
+from app.operations import BatchResult, Operations
+from app.stats import STATS
+
+# Sentinel marking a Calculation whose result has not been computed yet.
+_NOT_COMPUTED = object()
+# Calculations shared through CalculationFactory.intern_table. Every holder of such
+# an instance would see a change to it, so their operands are read-only.
+_frozen: 'weakref.WeakSet[Calculation]' = weakref.WeakSet()
 
 # -----------------------------------------------------------------------------------
 # Abstract Base Class: Calculation
@@ -20,12 +37,99 @@ class Calculation(ABC):
     
     """
 
+    # __slots__ keeps every history entry free of a per-instance __dict__.
+    # Subclasses declare an empty __slots__ so they stay dict-free as well.
+    # __weakref__ lets app.interning hold shared instances weakly.
+    __slots__ = ('_a', '_b', '_result', '__weakref__')
+
     def __init__(self, a: float, b: float) -> None:
         
        # Initializes a Calculation instance with two operands (numbers involved in the calculation).
        
-        self.a: float = a  # Stores the first operand as a floating-point number.
-        self.b: float = b  # Stores the second operand as a floating-point number.
+        self._a: float = a  # Stores the first operand as a floating-point number.
+        self._b: float = b  # Stores the second operand as a floating-point number.
+        self._result = _NOT_COMPUTED  # The result is computed on first use and then reused.
+
+    @property
+    def a(self) -> float:
+        return self._a
+
+    @a.setter
+    def a(self, value: float) -> None:
+        # Changing an operand invalidates the cached result.
+        self._check_mutable()
+        self._a = value
+        self._result = _NOT_COMPUTED
+
+    @property
+    def b(self) -> float:
+        return self._b
+
+    @b.setter
+    def b(self, value: float) -> None:
+        self._check_mutable()
+        self._b = value
+        self._result = _NOT_COMPUTED
+
+    def freeze(self) -> 'Calculation':
+        """Makes the operands read-only, for an instance that is shared. Returns the calculation."""
+        _frozen.add(self)
+        return self
+
+    @property
+    def frozen(self) -> bool:
+        return self in _frozen
+
+    def _check_mutable(self) -> None:
+        if self in _frozen:
+            raise AttributeError(f"{self.__class__.__name__} is shared and cannot be changed.")
+
+    @property
+    def result(self) -> float:
+        """
+        The result of the calculation. It is computed by `execute` the first time it 
+        is requested and cached on the instance, so printing the same calculation 
+        again (for example in the history) does not redo the arithmetic. Errors such 
+        as division by zero are not cached and are raised on every access.
+
+        When CalculationFactory.result_cache is set, `execute` only runs for 
+        operands that are not in that cache yet.
+
+        """
+        result = self._result
+        if result is _NOT_COMPUTED:
+            if STATS.enabled:
+                return self._timed_result()
+            cache = CalculationFactory.result_cache
+            result = self._result = self.execute() if cache is None else cache.calculate(self)
+        return result
+
+    def _timed_result(self) -> float:
+        # Same as `result`, but records the latency (or the error) of `execute` in STATS.
+        operation = CalculationFactory._registry.names.get(type(self), type(self).__name__)
+        cache = CalculationFactory.result_cache
+        start = perf_counter_ns()
+        try:
+            result = self._result = self.execute() if cache is None else cache.calculate(self)
+        except ZeroDivisionError:
+            STATS.record_error(operation, 'zero_division')
+            raise
+        except OverflowError:
+            STATS.record_error(operation, 'overflow')
+            raise
+        STATS.record(operation, perf_counter_ns() - start)
+        return result
+
+    @classmethod
+    def from_result(cls, a: float, b: float, result: float) -> 'Calculation':
+        """
+        Rebuilds a calculation whose result is already known (for example one read 
+        back from a stored history) without running the arithmetic again.
+
+        """
+        calculation = cls(a, b)
+        calculation._result = result
+        return calculation
 
     @abstractmethod
     def execute(self) -> float:
@@ -36,6 +140,28 @@ class Calculation(ABC):
         """
         pass  # The actual implementation will be provided by the subclass. # pragma: no cover
 
+    @classmethod
+    def execute_many(cls, a: Sequence[float], b: Sequence[float]) -> BatchResult:
+        """
+        Computes the calculation for every pair of operands and returns
+        (results, errors) like the Operations.batch_* methods: float64 results
+        and a uint8 mask with 1 (and NaN as the result) for each pair that
+        failed with an ArithmeticError. This default executes one instance per
+        pair; the built-in types use the batch kernels of Operations instead.
+
+        """
+        results = array('d')
+        errors = array('B')
+        for x, y in zip(a, b):
+            try:
+                results.append(cls(x, y).execute())
+            except ArithmeticError:
+                results.append(math.nan)
+                errors.append(1)
+            else:
+                errors.append(0)
+        return results, errors
+
     def __str__(self) -> str:
         """
         Provides a user-friendly string representation of the Calculation instance, 
@@ -43,7 +169,7 @@ class Calculation(ABC):
         and **Debugging** by giving a clear output for each calculation.
 
         """
-        result = self.execute()  # Run the calculation to get the result.
+        result = self.result  # Use the cached result, running the calculation only once.
         operation_name = self.__class__.__name__.replace('Calculation', '')  # Derive operation name.
         return f"{self.__class__.__name__}: {self.a} {operation_name} {self.b} = {result}"
 
@@ -56,6 +182,144 @@ class Calculation(ABC):
         """
         return f"{self.__class__.__name__}(a={self.a}, b={self.b})"
 
+# -----------------------------------------------------------------------------------
+# Registry Snapshot
+# -----------------------------------------------------------------------------------
+class Registry(NamedTuple):
+    """
+    One immutable version of CalculationFactory's registry. Every mapping is a
+    read-only view of a dict that is never changed after the snapshot is built,
+    so a reader holding a snapshot sees consistent tables without any locking.
+
+    """
+
+    # Calculation types (like "add" or "subtract") and their classes.
+    calculations: Mapping[str, Type[Calculation]]
+    # Each registered class and its calculation type.
+    names: Mapping[type, str]
+    # Extra spellings (like "plus") and the calculation type they stand for.
+    aliases: Mapping[str, str]
+    # Plugin types that are declared but not imported yet, and their "module:Class" target.
+    lazy: Mapping[str, str]
+    # Precompiled lookup of types, aliases and unambiguous abbreviations ("mul").
+    dispatch: PrefixTable
+    # The list of types shown when a lookup misses.
+    available_types: str
+    # Counts snapshots, so tables built from the registry (like the REPL's command
+    # table) know when to rebuild.
+    version: int
+
+
+def _snapshot(calculations: Dict, names: Dict, aliases: Dict, lazy: Dict, version: int) -> Registry:
+    types = list(calculations) + list(lazy)
+    return Registry(MappingProxyType(calculations), MappingProxyType(names), MappingProxyType(aliases),
+                    MappingProxyType(lazy), PrefixTable(types, aliases, kind="calculation type"),
+                    ', '.join(types), version)
+
+
+# -----------------------------------------------------------------------------------
+# Bulk Calculations: CalculationBatch
+# -----------------------------------------------------------------------------------
+def _column(values: Sequence[float]) -> Sequence[float]:
+    # Operands are stored as float64. An int too large for a float (e.g. 10**400)
+    # leaves the column a plain list, so the batch kernels flag just that row.
+    try:
+        return array('d', values)
+    except OverflowError:
+        return list(values)
+
+
+class CalculationBatch:
+    """
+    Calculations created in bulk by CalculationFactory.create_many, stored column
+    by column like CalculationHistory: the distinct calculation classes, one
+    code per row saying which class it uses, and the operand columns.
+
+    Nothing is computed until `results()` is called. It then runs each class's
+    `execute_many` once over all of that class's rows and returns the results
+    and error mask in row order. This columnar path does not go through STATS
+    or the result cache.
+
+    Indexing, slicing or iteration hand out ordinary Calculation objects, built
+    on demand and with their result filled in once `results()` has run.
+
+    """
+
+    def __init__(self, classes: List[Type[Calculation]], codes: Optional[array],
+                 a: Sequence[float], b: Sequence[float]) -> None:
+        self.classes = classes  # The distinct calculation classes, in order of first use.
+        self._codes = codes  # Index into `classes` per row; None when there is only one class.
+        self.a = a
+        self.b = b
+        self._results: Optional[BatchResult] = None
+
+    def calculation_class(self, index: int) -> Type[Calculation]:
+        """The calculation class of row `index`."""
+        return self.classes[0] if self._codes is None else self.classes[self._codes[index]]
+
+    def results(self) -> BatchResult:
+        """
+        Returns (results, errors): float64 results in row order and a uint8 mask
+        with 1 where the row failed (its result is NaN). Computed once.
+
+        """
+        if self._results is None:
+            self._results = self._compute()
+        return self._results
+
+    def _compute(self) -> BatchResult:
+        codes = self._codes
+        if codes is None:
+            return self.classes[0].execute_many(self.a, self.b)
+        result_groups, error_groups = [], []
+        code_bytes = codes.tobytes()
+        for code, calculation_class in enumerate(self.classes):
+            # Each class's kernel runs once over that class's rows, in row order. The
+            # selector (1 for the rows of this class) is built by bytes.translate in C.
+            selected = code_bytes.translate(bytes(256)[:code] + b'\x01' + bytes(255 - code))
+            group_results, group_errors = calculation_class.execute_many(
+                list(compress(self.a, selected)), list(compress(self.b, selected)))
+            result_groups.append(iter(group_results))
+            error_groups.append(iter(group_errors))
+        # Every row takes the next result of its class's group, which restores row order.
+        results = array('d', map(next, map(result_groups.__getitem__, codes)))
+        errors = array('B', map(next, map(error_groups.__getitem__, codes)))
+        return results, errors
+
+    def _materialize(self, index: int) -> Calculation:
+        calculation_class = self.calculation_class(index)
+        a, b = self.a[index], self.b[index]
+        intern_table = CalculationFactory.intern_table
+        if self._results is not None and not self._results[1][index]:
+            result = self._results[0][index]
+            if intern_table is not None:
+                return intern_table.intern(calculation_class, a, b, result)
+            return calculation_class.from_result(a, b, result)
+        if intern_table is not None:
+            return intern_table.intern(calculation_class, a, b)
+        return calculation_class(a, b)
+
+    def __len__(self) -> int:
+        return len(self.a)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Calculation, List[Calculation]]:
+        if isinstance(index, slice):
+            return [self._materialize(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("batch index out of range")
+        return self._materialize(index)
+
+    def __iter__(self) -> Iterator[Calculation]:
+        for index in range(len(self)):
+            yield self._materialize(index)
+
+    def __repr__(self) -> str:
+        names = ', '.join(calculation_class.__name__ for calculation_class in self.classes)
+        return f"{self.__class__.__name__}(rows={len(self)}, classes=[{names}])"
+
+
 # -----------------------------------------------------------------------------------
 # Factory Class: CalculationFactory
 # -----------------------------------------------------------------------------------
@@ -65,32 +329,218 @@ class CalculationFactory:
     of Calculation subclasses. This design pattern allows us to encapsulate the 
     logic of object creation and make it flexible.
 
+    The registry is safe to use from many threads. Lookups read the current
+    Registry snapshot once and never take a lock; changes copy the snapshot,
+    modify the copy and publish it with a single assignment, one change at a time.
+
     """
 
-    # _calculations is a dictionary that holds a mapping of calculation types 
-    # (like "add" or "subtract") to their respective classes.
-    _calculations = {}
+    # _registry is the current Registry snapshot. It is replaced as a whole, never modified.
+    _registry = _snapshot({}, {}, {}, {}, 0)
+    # Serializes changes to the registry; readers do not use it.
+    _lock = threading.Lock()
+    # Optional shared cache of results (an app.cache.ResultCache), consulted by
+    # Calculation.result before running execute.
+    result_cache = None
+    # Optional app.interning.InternTable. When set, create_calculation (and the
+    # history stores) hand out one shared, frozen instance per distinct input.
+    intern_table = None
+
+    @classmethod
+    def _publish(cls, calculations: Dict, names: Dict, aliases: Dict, lazy: Dict) -> None:
+        # Called with _lock held, with fresh dicts that nothing else references.
+        cls._registry = _snapshot(calculations, names, aliases, lazy, cls._registry.version + 1)
+
+    @classmethod
+    def _copy(cls) -> Tuple[Dict, Dict, Dict, Dict]:
+        registry = cls._registry
+        return dict(registry.calculations), dict(registry.names), dict(registry.aliases), dict(registry.lazy)
+
+    @classmethod
+    def is_registered(cls, calculation_type: str) -> bool:
+        """True if `calculation_type` names a type or alias, loaded or not."""
+        registry = cls._registry
+        name = calculation_type.lower()
+        return name in registry.calculations or name in registry.aliases or name in registry.lazy
+
+    @classmethod
+    def _check_new(cls, registry: Registry, calculation_type: str, aliases: Iterable[str]) -> None:
+        # A lazily declared type may be claimed by the class that implements it, so its
+        # own name and aliases only count as taken for other types.
+        if calculation_type in registry.calculations or calculation_type in registry.aliases:
+            raise ValueError(f"Calculation type '{calculation_type}' is already registered.")
+        for alias in aliases:
+            if (alias == calculation_type or alias in registry.calculations or alias in registry.lazy
+                    or registry.aliases.get(alias, calculation_type) != calculation_type):
+                raise ValueError(f"Calculation type '{alias}' is already registered.")
 
     @classmethod
-    def register_calculation(cls, calculation_type: str):
+    def register_calculation(cls, calculation_type: str, aliases: Iterable[str] = ()):
         """
         This method is a decorator used to register a specific Calculation subclass 
         under a unique calculation type. Registering classes with string identifiers 
         like "add" or "multiply" enables easy access to different operations 
-        dynamically at runtime.
+        dynamically at runtime. Optional `aliases` are extra names for the same type.
+        Registering a type declared with `register_lazy` replaces the declaration.
 
         """
         def decorator(subclass):
             # Convert calculation_type to lowercase to ensure consistency.
             calculation_type_lower = calculation_type.lower()
-            # Check if the calculation type has already been registered to avoid duplication.
-            if calculation_type_lower in cls._calculations:
-                raise ValueError(f"Calculation type '{calculation_type}' is already registered.")
-            # Register the subclass in the _calculations dictionary.
-            cls._calculations[calculation_type_lower] = subclass
+            aliases_lower = [alias.lower() for alias in aliases]
+            with cls._lock:
+                # Check if the calculation type has already been registered to avoid duplication.
+                cls._check_new(cls._registry, calculation_type_lower, aliases_lower)
+                calculations, names, aliases_map, lazy = cls._copy()
+                # Register the subclass in the calculations dictionary.
+                calculations[calculation_type_lower] = subclass
+                names.setdefault(subclass, calculation_type_lower)
+                for alias in aliases_lower:
+                    aliases_map[alias] = calculation_type_lower
+                lazy.pop(calculation_type_lower, None)
+                cls._publish(calculations, names, aliases_map, lazy)
             return subclass  # Return the subclass for chaining or additional use.
         return decorator  # Return the decorator function.
 
+    @classmethod
+    def register_lazy(cls, calculation_type: str, target: str, aliases: Iterable[str] = ()) -> None:
+        """
+        Declares a calculation type implemented by the Calculation subclass at
+        `target` ("package.module:ClassName") without importing it. The type
+        is listed and resolved like any other, and its module is imported the
+        first time a calculation of that type is created. app.plugins declares
+        the types found in entry points and manifests this way.
+
+        """
+        module_name, _, class_name = target.partition(':')
+        if not module_name or not class_name:
+            raise ValueError(f"Invalid plugin target for '{calculation_type}': '{target}' (expected 'module:Class').")
+        calculation_type_lower = calculation_type.lower()
+        aliases_lower = [alias.lower() for alias in aliases]
+        with cls._lock:
+            if cls.is_registered(calculation_type_lower):
+                raise ValueError(f"Calculation type '{calculation_type}' is already registered.")
+            cls._check_new(cls._registry, calculation_type_lower, aliases_lower)
+            calculations, names, aliases_map, lazy = cls._copy()
+            lazy[calculation_type_lower] = target
+            for alias in aliases_lower:
+                aliases_map[alias] = calculation_type_lower
+            cls._publish(calculations, names, aliases_map, lazy)
+
+    @classmethod
+    def _load(cls, calculation_type: str, target: str) -> Type[Calculation]:
+        """Imports a lazily declared type and registers its class under the declared name."""
+        # The import runs without the lock: the plugin module may register itself with
+        # the decorator, and the import system already serializes concurrent imports.
+        module_name, _, class_name = target.partition(':')
+        try:
+            subclass = getattr(importlib.import_module(module_name), class_name)
+            if not (isinstance(subclass, type) and issubclass(subclass, Calculation)):
+                raise TypeError(f"{target} is not a Calculation subclass")
+        except Exception as error:
+            # Whatever a broken plugin raises on import (SyntaxError, a missing dependency,
+            # an error in its module code) is reported like an unknown type, not a crash.
+            raise ValueError(f"Cannot load calculation type '{calculation_type}' from '{target}': {error}.") from error
+        with cls._lock:
+            registry = cls._registry
+            registered = registry.calculations.get(calculation_type)
+            if registered is not None:
+                # The module registered itself, or another thread loaded it first.
+                return registered
+            if registry.lazy.get(calculation_type) == target:
+                calculations, names, aliases, lazy = cls._copy()
+                calculations[calculation_type] = subclass
+                names.setdefault(subclass, calculation_type)
+                del lazy[calculation_type]
+                cls._publish(calculations, names, aliases, lazy)
+        return subclass
+
+    @classmethod
+    def get_calculation_class(cls, calculation_type: str) -> Optional[Type[Calculation]]:
+        """
+        Returns the class registered under the exact (lowercase) type name,
+        importing a lazily declared plugin if needed, or None for unknown types.
+
+        """
+        registry = cls._registry
+        calculation_class = registry.calculations.get(calculation_type)
+        if calculation_class is None and calculation_type in registry.lazy:
+            calculation_class = cls._load(calculation_type, registry.lazy[calculation_type])
+        return calculation_class
+
+    @classmethod
+    def unregister_calculation(cls, calculation_type: str) -> None:
+        """Removes a registered (or lazily declared) calculation type together with its aliases."""
+        calculation_type_lower = calculation_type.lower()
+        with cls._lock:
+            calculations, names, aliases, lazy = cls._copy()
+            subclass = calculations.pop(calculation_type_lower, None)
+            if subclass is None and lazy.pop(calculation_type_lower, None) is None:
+                raise ValueError(f"Unsupported calculation type: '{calculation_type}'.")
+            if subclass is not None and names.get(subclass) == calculation_type_lower:
+                del names[subclass]
+            for alias, target in list(aliases.items()):
+                if target == calculation_type_lower:
+                    del aliases[alias]
+            cls._publish(calculations, names, aliases, lazy)
+
+    @classmethod
+    def _resolve(cls, registry: Registry, calculation_type: str) -> Type[Calculation]:
+        """Returns the class for a type, alias or abbreviation, importing a plugin if needed."""
+        try:
+            name = registry.dispatch.resolve(calculation_type)
+        except AmbiguousNameError:
+            if STATS.enabled:
+                STATS.record_error('unknown', 'ambiguous_type')
+            raise
+        calculation_class = registry.calculations.get(name)
+        # A plugin type is imported the first time it is requested.
+        if not calculation_class and name in registry.lazy:
+            calculation_class = cls._load(name, registry.lazy[name])
+        # If the type is unsupported, raise an error with the available types.
+        if not calculation_class:
+            if STATS.enabled:
+                STATS.record_error('unknown', 'unsupported_type')
+            raise ValueError(f"Unsupported calculation type: '{calculation_type}'. Available types: {registry.available_types}")
+        return calculation_class
+
+    @classmethod
+    def create_many(cls, operations: Union[str, Sequence[str]], a: Sequence[float],
+                    b: Sequence[float]) -> CalculationBatch:
+        """
+        Creates calculations in bulk from columnar data. `operations` is either
+        one calculation type for every row, or a sequence parallel to the
+        operand sequences `a` and `b` with a type, alias or abbreviation per row.
+
+        Each distinct spelling is resolved once, against one registry snapshot,
+        instead of once per row, and the operands are converted to float64
+        columns in one pass. Returns a CalculationBatch, whose `results()`
+        computes every row grouped by calculation type.
+
+        """
+        if len(a) != len(b) or (not isinstance(operations, str) and len(operations) != len(a)):
+            raise ValueError("Operation and operand sequences must have the same length.")
+        registry = cls._registry
+        a, b = _column(a), _column(b)
+        if isinstance(operations, str):
+            return CalculationBatch([cls._resolve(registry, operations)], None, a, b)
+        classes: List[Type[Calculation]] = []
+        class_codes: Dict[Type[Calculation], int] = {}
+        spelling_codes: Dict[str, int] = {}
+        # dict.fromkeys keeps the distinct spellings in order of first use.
+        for spelling in dict.fromkeys(operations):
+            calculation_class = cls._resolve(registry, spelling)
+            code = class_codes.get(calculation_class)
+            if code is None:
+                code = len(classes)
+                if code > 255:
+                    raise ValueError("create_many supports at most 256 calculation types per batch.")
+                class_codes[calculation_class] = code
+                classes.append(calculation_class)
+            spelling_codes[spelling] = code
+        codes = None if len(classes) == 1 else array('B', map(spelling_codes.__getitem__, operations))
+        return CalculationBatch(classes, codes, a, b)
+
     @classmethod
     def create_calculation(cls, calculation_type: str, a: float, b: float) -> Calculation:
         """
@@ -111,14 +561,19 @@ class CalculationFactory:
         - **Error Handling**: If the specified type is not available, we provide a 
           clear error message listing valid options, helping prevent errors and 
           ensuring the user knows the supported types.
+        - **Abbreviations**: Aliases ("plus") and unambiguous prefixes of at least 
+          three letters ("mul") are accepted; an ambiguous prefix raises 
+          AmbiguousNameError, a ValueError listing the candidates.
+        - **Plugins**: Types declared with `register_lazy` are imported on first use.
+        - **Interning**: With an `intern_table`, identical inputs return the same
+          frozen instance instead of a new one.
         """
-        calculation_type_lower = calculation_type.lower()
-        calculation_class = cls._calculations.get(calculation_type_lower)
-        # If the type is unsupported, raise an error with the available types.
-        if not calculation_class:
-            available_types = ', '.join(cls._calculations.keys())
-            raise ValueError(f"Unsupported calculation type: '{calculation_type}'. Available types: {available_types}")
+        # One snapshot serves the whole lookup, whatever other threads register meanwhile.
+        calculation_class = cls._resolve(cls._registry, calculation_type)
         # Create and return an instance of the requested calculation class with the provided operands.
+        intern_table = cls.intern_table
+        if intern_table is not None:
+            return intern_table.intern(calculation_class, a, b)
         return calculation_class(a, b)
 
 # -----------------------------------------------------------------------------------
@@ -129,7 +584,7 @@ class CalculationFactory:
 # multiplication, or division). These classes inherit from Calculation, implementing 
 # the `execute` method to perform the specific arithmetic operation. 
 
-@CalculationFactory.register_calculation('add')
+@CalculationFactory.register_calculation('add', aliases=('plus',))
 class AddCalculation(Calculation):
     """
     AddCalculation represents an addition operation between two numbers.
@@ -141,12 +596,18 @@ class AddCalculation(Calculation):
     - **Clear Responsibility**: Each class has a clear, single purpose, making the code easier to read.
     """
 
+    __slots__ = ()
+
+    @classmethod
+    def execute_many(cls, a: Sequence[float], b: Sequence[float]) -> BatchResult:
+        return Operations.batch_addition(a, b)
+
     def execute(self) -> float:
         # Calls the addition method from the Operation module to perform the addition.
         return Operations.addition(self.a, self.b)
 
 
-@CalculationFactory.register_calculation('subtract')
+@CalculationFactory.register_calculation('subtract', aliases=('minus',))
 class SubtractCalculation(Calculation):
     """
     SubtractCalculation represents a subtraction operation between two numbers.
@@ -155,12 +616,18 @@ class SubtractCalculation(Calculation):
     the implementation separate from other operations.
     """
 
+    __slots__ = ()
+
+    @classmethod
+    def execute_many(cls, a: Sequence[float], b: Sequence[float]) -> BatchResult:
+        return Operations.batch_subtraction(a, b)
+
     def execute(self) -> float:
         # Calls the subtraction method from the Operation module to perform the subtraction.
         return Operations.subtraction(self.a, self.b)
 
 
-@CalculationFactory.register_calculation('multiply')
+@CalculationFactory.register_calculation('multiply', aliases=('times',))
 class MultiplyCalculation(Calculation):
     """
     MultiplyCalculation represents a multiplication operation.
@@ -169,6 +636,12 @@ class MultiplyCalculation(Calculation):
     concerns, making it easy to adjust the multiplication logic without affecting other calculations.
     """
 
+    __slots__ = ()
+
+    @classmethod
+    def execute_many(cls, a: Sequence[float], b: Sequence[float]) -> BatchResult:
+        return Operations.batch_multiplication(a, b)
+
     def execute(self) -> float:
         # Calls the multiplication method from the Operation module to perform the multiplication.
         return Operations.multiplication(self.a, self.b)
@@ -184,6 +657,12 @@ class DivideCalculation(Calculation):
     checks if the second operand is zero before performing the operation.
     """
 
+    __slots__ = ()
+
+    @classmethod
+    def execute_many(cls, a: Sequence[float], b: Sequence[float]) -> BatchResult:
+        return Operations.batch_division(a, b)
+
     def execute(self) -> float:
         # Before performing division, check if `b` is zero to avoid ZeroDivisionError.
         if self.b == 0:
@@ -200,6 +679,12 @@ class PowerCalculation(Calculation):
     concerns, making it easy to adjust the power logic without affecting other calculations.
     """
 
+    __slots__ = ()
+
+    @classmethod
+    def execute_many(cls, a: Sequence[float], b: Sequence[float]) -> BatchResult:
+        return Operations.batch_power(a, b)
+
     def execute(self) -> float:
         # Calls the power method from the Operation module.
         return Operations.power(self.a, self.b) # pragma: no cover
@@ -213,6 +698,12 @@ class ModuloCalculation(Calculation):
     concerns, making it easy to adjust the modulus logic without affecting other calculations.
     """
 
+    __slots__ = ()
+
+    @classmethod
+    def execute_many(cls, a: Sequence[float], b: Sequence[float]) -> BatchResult:
+        return Operations.batch_modulo(a, b)
+
     def execute(self) -> float:
         if self.b == 0:
                 raise ZeroDivisionError("Cannot divide by zero.")
@@ -8,8 +8,37 @@ and divide numbers based on what the user types.
 # This is like opening a toolbox and pulling out the tools we need to do our math.
 from app.operations import Operations
 import readline
-from typing import List
+from typing import Iterable, Optional, Union
 from app.calculation import Calculation, CalculationFactory
+from app.dispatch import AmbiguousNameError, PrefixTable
+from app.history import CalculationHistory, ObservableHistory, format_entry
+from app.history_log import HistoryLog
+from app.bounded_history import BoundedHistory
+from app.history_index import HistoryIndex, HistoryScan, parse_query
+from app.history_summary import HistorySummary
+from app.stats import STATS
+from app.expression import EXPRESSION_START, count_nodes, evaluate_expression, format_tree, optimize, parse
+
+# Special commands of the REPL. They take precedence over calculation types of the same name.
+SPECIAL_COMMANDS = ('exit', 'help', 'history', 'summary', 'cache', 'stats', 'simplify', 'backend')
+
+_command_table = None
+_command_table_version = -1
+
+def command_table() -> PrefixTable:
+    """
+    Returns the REPL's dispatch table: special commands and registered calculation types
+    (with their aliases and abbreviations) resolved in one lookup. It is rebuilt only when
+    a calculation type has been registered or removed since it was last built.
+    """
+    global _command_table, _command_table_version
+    registry = CalculationFactory._registry
+    if _command_table_version != registry.version:
+        names = SPECIAL_COMMANDS + tuple(name for name in registry.dispatch.names if name not in SPECIAL_COMMANDS)
+        aliases = {alias: name for alias, name in registry.aliases.items() if alias not in SPECIAL_COMMANDS}
+        _command_table = PrefixTable(names, aliases, kind="command")
+        _command_table_version = registry.version
+    return _command_table
 
 def display_help() -> None:
     """
@@ -26,10 +55,27 @@ def display_help() -> None:
             subtract  : Subtracts the second number from the first.
             multiply  : Multiplies two numbers.
             divide    : Divides the first number by the second.
+        - Operations and commands can be abbreviated to any unambiguous prefix of at
+          least three letters (mul 7 8, div 20 4, his); plus, minus and times are aliases.
+
+        <expression>
+        - Evaluate an infix expression using + - * / % ^ and parentheses.
+
+        simplify <expression>
+        - Show the expression after constant folding and algebraic simplification.
 
     Special Commands:
         help      : Display this help message.
         history   : Show the history of calculations.
+                    Add conditions to search it, e.g. 'history op=divide result>100 last=50'
+                    (fields: op, a, b, result with =, <, <=, >, >=; and last=N).
+        summary   : Show count, sum, mean, variance, min and max of the results per operation.
+        cache     : Show the hit, miss and eviction counts of the result cache (see --cache).
+        stats     : Show per-operation counts, errors and latency percentiles.
+                    Use 'stats on', 'stats off' or 'stats reset' to control collection.
+        backend   : Show or choose the number type for this session: float (default), int
+                    (exact integers), decimal [precision] or fraction, e.g. 'backend decimal 50'.
+                    Infix expressions are always evaluated in floating point.
         exit      : Exit the calculator.
 
     Examples:
@@ -37,29 +83,161 @@ def display_help() -> None:
         subtract 15.5 3.2
         multiply 7 8
         divide 20 4
+        (3 + 4) * 2 ^ 10 % 7
+        simplify (x * 1 + 0) * (2 + 3)
         """
     print(help_message)
 
 
-def display_history(history: List[Calculation]) -> None:
+def display_history(history: Iterable[Calculation]) -> None:
     """
     Displays the history of calculations performed during the session.
 
     Parameters:
-        history (List[Calculation]): A list of Calculation objects representing past calculations.
+        history (Iterable[Calculation]): A CalculationHistory (or list) of Calculation objects representing past calculations.
     """
     if not history:
         print("No calculations performed yet.")
+    elif isinstance(history, ObservableHistory):
+        # History stores are printed from their raw entries, so an entry of a type that is
+        # not available in this session (e.g. from an older history file) is still shown.
+        print("Calculation History:")
+        for idx, entry in enumerate(history.entries(), start=1):
+            print(f"{idx}. {format_entry(*entry)}")
     else:
         print("Calculation History:")
         for idx, calculation in enumerate(history, start=1):
             print(f"{idx}. {calculation}")
 
-def calculator():
-    """Basic REPL calculator that performs addition, subtraction, multiplication, and division."""
+def display_query(index: Union[HistoryIndex, HistoryScan], text: str) -> None:
+    """
+    Displays the history entries matching a query such as 'op=divide result>100 last=50',
+    numbered by their position in the full history.
+    """
+    try:
+        matches = index.query(**parse_query(text))
+    except ValueError as e:
+        print(e)
+        print("Type 'help' for more information.\n")
+        return
+    if not matches:
+        print("No calculations match.")
+        return
+    print(f"Matching calculations ({len(matches)}):")
+    for position, entry in matches.entries():
+        print(f"{position + 1}. {format_entry(*entry)}")
+
+def display_simplified(expression: str) -> None:
+    """
+    Displays an expression after the optimizer has folded constants, applied
+    algebraic identities and shared common subexpressions.
+    """
+    try:
+        tree = parse(expression)
+    except ValueError as e:
+        print(e)
+        return
+    optimized = optimize(tree)
+    print(f"Simplified: {format_tree(optimized)} (nodes: {count_nodes(tree)} -> {count_nodes(optimized)})\n")
+
+def display_cache() -> None:
+    """
+    Displays the counters of the shared result cache and of calculation
+    interning, if they are configured.
+    """
+    cache = CalculationFactory.result_cache
+    intern_table = CalculationFactory.intern_table
+    if cache is None:
+        print("Result cache is off. Start the calculator with --cache SIZE to enable it.")
+    else:
+        stats = cache.stats()
+        print(f"Result cache: {stats.size}/{stats.maxsize} entries, {stats.hits} hits "
+              f"({stats.error_hits} errors), {stats.misses} misses, {stats.evictions} evictions, "
+              f"{stats.expirations} expirations, hit rate {stats.hit_rate:.1%}")
+        backing = cache.backing
+        if backing is not None:
+            print(f"Disk cache {backing.path}: {backing.hits} hits ({backing.error_hits} errors), "
+                  f"{backing.misses} misses, {backing.written} written")
+    if intern_table is not None:
+        print(f"Interned calculations: {len(intern_table)} shared, {intern_table.hits} hits, "
+              f"{intern_table.misses} misses")
+    print()
+
+def select_backend(current, argument: str = ""):
+    """
+    Handles the 'backend' command: shows the session's numeric backend, or
+    switches to the one named in `argument` ('backend decimal 50' also sets the
+    precision). Returns the backend to use from now on; None stands for float.
+    """
+    if not argument:
+        print(f"Numeric backend: {describe_backend(current)}. "
+              "Choose with 'backend float|int|decimal [precision]|fraction'.\n")
+        return current
+    # The exact backends import decimal and fractions, so they are loaded on first use.
+    from app.numeric import get_backend
+    name, *rest = argument.split()
+    try:
+        if len(rest) > 1 or (rest and not rest[0].isdigit()):
+            raise ValueError("Usage: backend [float|int|decimal [precision]|fraction]")
+        backend = get_backend(name, int(rest[0]) if rest else None)
+    except ValueError as e:
+        print(f"{e}\n")
+        return current
+    backend = None if backend.name == 'float' else backend
+    print(f"Numeric backend: {describe_backend(backend)}.\n")
+    return backend
+
+def describe_backend(backend) -> str:
+    if backend is None:
+        return "float"
+    precision = getattr(backend, 'precision', None)
+    return backend.name if precision is None else f"{backend.name} (precision {precision})"
+
+def display_stats(argument: str = "") -> None:
+    """
+    Handles the 'stats' command: shows the collected statistics, or turns
+    collection on/off or resets it.
+    """
+    if argument == "on":
+        STATS.enable()
+        print("Statistics collection enabled.\n")
+    elif argument == "off":
+        STATS.disable()
+        print("Statistics collection disabled.\n")
+    elif argument == "reset":
+        STATS.reset()
+        print("Statistics reset.\n")
+    elif argument:
+        print("Usage: stats [on|off|reset]\n")
+    else:
+        if not STATS.enabled:
+            print("Statistics collection is off. Type 'stats on' to start collecting.")
+        print(STATS.format() + "\n")
+
+def calculator(history_file: Optional[str] = None, history_limit: Optional[int] = None):
+    """
+    Basic REPL calculator that performs addition, subtraction, multiplication, and division.
+
+    Args:
+        history_file (Optional[str]): Path of a persistent history log. When given, the history
+            is loaded from and appended to this file; otherwise it only lasts for the session.
+        history_limit (Optional[int]): Keep at most this many calculations in memory; older ones
+            are moved to disk (to `history_file`, or a temporary file) in the background.
+    """
     
-     # Initialize an empty list to keep track of calculation history
-    history: List[Calculation] = []
+     # Initialize an empty columnar history store to keep track of calculation history
+    # (or open the persistent log, which keeps the history of earlier sessions too).
+    if history_limit:
+        history = BoundedHistory(history_limit, history_file)
+    elif history_file:
+        history = HistoryLog(history_file)
+    else:
+        history = CalculationHistory()
+    index = None  # Built on the first history query, then kept up to date as calculations are added.
+    # Likewise for the running aggregates of the 'summary' command: opening a long persistent
+    # history stays cheap, and only the first 'summary' replays the entries loaded from disk.
+    summary = None
+    backend = None  # The session's numeric backend (see 'backend'); None is plain float.
     print("Type 'help' for instructions or 'exit' to quit.\n")
 
     # First, we print a message to welcome the user to the calculator.
@@ -72,33 +250,91 @@ def calculator():
         # Now we ask the user to type something, like "add 5 3". 
         # This will get the operation (like "add") and two numbers from the user.
         user_input = str = input(">> ").strip()
-       
+        if not user_input:
+            # Input is empty, so we skip processing and prompt again.
+            continue # pragma: no cover
+
         # Handle special commands
-        command = user_input.lower()
+        # The first word is resolved in one lookup in the precompiled command table, which
+        # knows the special commands, the calculation types, their aliases and abbreviations.
+        word, *rest = user_input.split(None, 1)
+        argument = rest[0] if rest else ""
+        target = None
+        if user_input[0] not in EXPRESSION_START:
+            try:
+                target = command_table().resolve(word)
+            except AmbiguousNameError as e:
+                print(e)
+                print("Type 'help' for more information.\n")
+                continue
+
         # This part checks if the user typed "exit". If they did, we print a message and stop the calculator.
-        
-        if command == "exit":
+        if target == "exit" and not argument:
             print("Exiting calculator...")
+            if history_file or history_limit:
+                history.close()  # Make every entry of this session durable, or remove the spill file.
             break  # This "break" command tells the program to stop running the loop and exit.
-        elif not user_input:
-            # Input is empty, so we skip processing and prompt again.
-            continue # pragma: no cover
 
         # LBYL is used here to check if the user input matches any special commands.
-        elif command == "help":
+        elif target == "help" and not argument:
             display_help()
             continue
-        elif command == "history":
+        elif target == "history" and not argument:
             display_history(history)
             continue
+        elif target == "history":
+            if index is None:
+                # An index grows with every entry ever added, so with a history limit
+                # queries scan the history instead and memory stays flat.
+                index = HistoryScan(history) if history_limit else HistoryIndex(history)
+            display_query(index, argument)
+            continue
+        elif target == "summary" and not argument:
+            if summary is None:
+                summary = HistorySummary(history)
+            print(summary.format() + "\n")
+            continue
+        elif target == "cache" and not argument:
+            display_cache()
+            continue
+        elif target == "stats":
+            display_stats(argument.lower())
+            continue
+        elif target == "backend":
+            backend = select_backend(backend, argument)
+            continue
+        elif target == "simplify" and argument:
+            display_simplified(argument)
+            continue
+        elif user_input[0] in EXPRESSION_START:
+            # Infix expressions are compiled once and cached, then evaluated.
+            try:
+                result = evaluate_expression(user_input)
+            except ZeroDivisionError:
+                print("Division by zero is not allowed")
+                continue
+            except (ValueError, OverflowError) as e:
+                if STATS.enabled and isinstance(e, ValueError):
+                    STATS.record_error('expression', 'parse_failure')
+                print(e)
+                print("Type 'help' for more information.\n")
+                continue
+            print(f"Result: {result}\n")
+            continue
 
         try:
             # Now we split the input into three parts: the operation (add, subtract, etc.) and the two numbers.
             operation, num1, num2 = user_input.split()
-            # We have to make sure the numbers are actually numbers, so we convert them to floats.
-            num1, num2 = float(num1), float(num2)
+            # We have to make sure the numbers are actually numbers, so we convert them to floats
+            # (or to the number type of the session's backend).
+            if backend is None:
+                num1, num2 = float(num1), float(num2)
+            else:
+                num1, num2 = backend.parse(num1), backend.parse(num2)
         except ValueError:
             # If the user doesn't type something correctly, like typing letters where numbers should be, we show an error.
+            if STATS.enabled:
+                STATS.record_error('input', 'parse_failure')
             print("Invalid input. Please follow the format: <operation> <num1> <num2>")
             print("Type 'help' for more information.\n")
             continue  # This "continue" means: try again by going back to the top of the loop.
@@ -125,7 +361,10 @@ def calculator():
 
         # Attempt to create a Calculation instance using the factory
         try:
-            calculation = CalculationFactory.create_calculation(operation, num1, num2)
+            # An abbreviation or alias resolved above is passed on as the full calculation type.
+            # A numeric backend creates it under its own rules (such as the decimal precision).
+            factory = CalculationFactory if backend is None else backend
+            calculation = factory.create_calculation(target or operation, num1, num2)
         except ValueError as ve:
             # Handle unsupported operations
             print(ve)
@@ -134,17 +373,24 @@ def calculator():
 
         # Attempt to execute the calculation
         try:
-            result = calculation.execute()
+            if backend is None:
+                result = calculation.result  # Computed once and cached for the Result line and the history.
+            else:
+                calculation = backend.calculate(calculation)
         except ZeroDivisionError as e:
             # Handles divide or modulo by zero
             print("Division by zero is not allowed")
             continue
 
-        except ValueError as e: # pragma: no cover
-                    # This part handles the case where someone tries to divide by zero, which we can't do.
-                    # The division function will throw an error if someone tries dividing by zero, and we catch that error here.
+        except ValueError as e:
+                    # This part handles operations a backend cannot do, such as a negative
+                    # decimal to a fractional power.
                     print(e)  # Show the error message.
                     continue  # Go back to the top of the loop and try again.
+        except OverflowError as e:
+            # A result too large for the number type, such as power 10 400 with floats.
+            print(f"{e.args[-1]}\n")
+            continue
         
         #print(f"Result: {result}")
 
@@ -0,0 +1,98 @@
+# app/client/__init__.py
+
+# -----------------------------------------------------------------------------------
+# Thin one-shot client for the background calculator daemon.
+# -----------------------------------------------------------------------------------
+
+# This module is imported on every one-shot `python main.py add 2 3` call, so it
+# only uses `os`, `socket` and `stat`. Nothing from the rest of the app (or `readline`) is
+# imported unless the daemon is not running and we have to compute in-process.
+
+# Annotations are not evaluated at runtime, so `typing` does not need importing either.
+from __future__ import annotations
+
+import os
+import socket
+import stat
+
+# How long to wait for the daemon before giving up and computing in-process.
+DAEMON_TIMEOUT = 2.0
+
+
+def socket_path() -> str:
+    """
+    Path of the daemon's Unix domain socket: $CALCULATOR_SOCKET if set, otherwise
+    calculator.sock in the per-user $XDG_RUNTIME_DIR, or failing that in a private
+    per-user directory under the temporary directory (see `private_directory`).
+    """
+    path = os.environ.get("CALCULATOR_SOCKET")
+    if path:
+        return path
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    return os.path.join(runtime or private_directory(), "calculator.sock")
+
+
+def private_directory() -> str:
+    """
+    Returns $TMPDIR/calculator-<uid>, creating it with mode 0700 if needed. The
+    temporary directory is shared with other users, so an existing entry is only
+    used if it is a real directory owned by the current user and closed to
+    everyone else; otherwise OSError is raised.
+    """
+    path = os.path.join(os.environ.get("TMPDIR", "/tmp"), f"calculator-{os.getuid()}")
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise PermissionError(f"Refusing to use {path}: it is not a private directory of the current user.")
+    return path
+
+
+def send_command(command: str, path: str | None = None) -> str | None:
+    """
+    Sends one command to the daemon and returns its reply line, or None if no
+    daemon answers on the socket: nothing listening, a stale or foreign socket
+    file, a timeout, or a connection dropped mid-reply all count as no daemon.
+    """
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(DAEMON_TIMEOUT)
+            client.connect(path or socket_path())
+            # 'exit' makes the daemon close the connection after replying, so reading
+            # until EOF collects exactly one reply.
+            client.sendall(f"{command}\nexit\n".encode("utf-8"))
+            chunks = []
+            while True:
+                chunk = client.recv(4096)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+    except OSError:
+        return None
+    return b"".join(chunks).decode("utf-8").rstrip("\n")
+
+
+def evaluate_in_process(command: str) -> str | None:
+    """Fallback used when no daemon is running: evaluate the command in this process."""
+    from app.batch import Session
+    from app.plugins import load_plugins
+    load_plugins()
+    return Session().evaluate(command)
+
+
+def run_one_shot(argv: list[str], path: str | None = None) -> int:
+    """
+    Runs a single command given as command-line arguments (e.g. ['add', '2', '3']),
+    preferring the warm daemon and falling back to in-process evaluation. Prints
+    the reply and returns the process exit code (1 for error replies).
+    """
+    command = " ".join(argv).strip()
+    reply = send_command(command, path)
+    if reply is None:
+        reply = evaluate_in_process(command)
+    if not reply:
+        return 0
+    print(reply)
+    return 1 if reply.startswith("error:") else 0
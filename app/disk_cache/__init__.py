@@ -0,0 +1,223 @@
+# app/disk_cache/__init__.py
+
+# -----------------------------------------------------------------------------------
+# Persistent result cache shared by calculator processes, backed by SQLite.
+# -----------------------------------------------------------------------------------
+
+
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import weakref
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from app.cache import CACHEABLE_ERRORS
+from app.calculation import CalculationFactory
+
+DEFAULT_BATCH_SIZE = 256
+DEFAULT_FLUSH_INTERVAL = 0.5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    operation TEXT NOT NULL,
+    a TEXT NOT NULL,
+    b TEXT NOT NULL,
+    result REAL,
+    error_type TEXT,
+    error_args TEXT,
+    PRIMARY KEY (operation, a, b)
+) WITHOUT ROWID
+"""
+_SELECT = "SELECT result, error_type, error_args FROM results WHERE operation = ? AND a = ? AND b = ?"
+_INSERT = "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)"
+
+# Errors that can be stored, by name. Anything else is raised but not persisted.
+_ERRORS = {error.__name__: error for error in (ZeroDivisionError, OverflowError, FloatingPointError, ArithmeticError)}
+
+# (result, error type name, JSON-encoded error args); exactly one of result and error type is set.
+Row = Tuple[Optional[float], Optional[str], Optional[str]]
+
+
+# Open caches, whose SQLite activity is paused while the process forks (see _before_fork).
+_open_caches: 'weakref.WeakSet[SQLiteResultCache]' = weakref.WeakSet()
+# The caches _before_fork locked, for _after_fork to unlock.
+_forking: List['SQLiteResultCache'] = []
+
+
+def _before_fork() -> None:
+    # A child forked while another thread is inside SQLite can inherit SQLite's
+    # internal mutexes locked and hang on its first database call, so forking
+    # waits until no thread of this process is using a cache.
+    global _forking
+    _forking = list(_open_caches)
+    for cache in _forking:
+        cache._read_lock.acquire()
+        cache._write_lock.acquire()
+
+
+def _after_fork() -> None:
+    global _forking
+    for cache in _forking:
+        cache._write_lock.release()
+        cache._read_lock.release()
+    _forking = []
+
+
+if hasattr(os, 'register_at_fork'):  # pragma: no branch
+    os.register_at_fork(before=_before_fork, after_in_parent=_after_fork, after_in_child=_after_fork)
+
+
+def _operand_key(value: Any) -> str:
+    # The type is part of the key (1 and 1.0 differ), and repr keeps floats exact and -0.0 apart.
+    return f"{type(value).__name__}:{value!r}"
+
+
+# -----------------------------------------------------------------------------------
+# SQLiteResultCache
+# -----------------------------------------------------------------------------------
+class SQLiteResultCache:
+    """
+    A result cache stored in a SQLite database in WAL mode, so any number of
+    calculator processes can read it while one of them writes.
+
+    New results never wait for the disk: they are kept in a pending batch
+    (which lookups also consult) and written by a background thread in one
+    transaction every `flush_interval` seconds or `batch_size` results. The
+    database runs with synchronous=NORMAL, so commits are not fsync'ed one by
+    one; a crash may lose the last batches but never corrupts the file.
+    Pending results are written when the cache is closed or the process exits.
+
+    Only float results (except NaN) and arithmetic errors are stored; other
+    results are computed every time.
+
+    """
+
+    def __init__(self, path: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL) -> None:
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._reader = self._connect()
+        self._reader.execute(_SCHEMA)
+        self._read_lock = threading.Lock()
+        self._pending: Dict[Tuple[str, str, str], Row] = {}
+        self._pending_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self.hits = self.misses = self.error_hits = self.written = 0
+        _open_caches.add(self)
+        self._writer = threading.Thread(target=self._write_loop, name='result-cache-writer', daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    # -- lookups ----------------------------------------------------------------------
+    def _lookup(self, key: Tuple[str, str, str]) -> Optional[Row]:
+        row = self._pending.get(key)
+        if row is None:
+            with self._read_lock:
+                row = self._reader.execute(_SELECT, key).fetchone()
+        return row
+
+    def get_or_compute(self, key: Tuple[str, str, str], compute: Callable[[], Any]) -> Any:
+        """Returns the stored outcome of `key`, or calls `compute` and queues its outcome for writing."""
+        row = self._lookup(key)
+        if row is not None:
+            result, error_type, error_args = row
+            if error_type is not None:
+                self.hits += 1
+                self.error_hits += 1
+                raise _ERRORS[error_type](*json.loads(error_args))
+            # A NULL or otherwise unusable result (e.g. a NaN an older version stored,
+            # which SQLite turns into NULL) is a miss; the result is computed again.
+            if type(result) is float:
+                self.hits += 1
+                return result
+        self.misses += 1
+        try:
+            result = compute()
+        except CACHEABLE_ERRORS as error:
+            if type(error).__name__ in _ERRORS:
+                self._queue(key, (None, type(error).__name__, json.dumps(error.args, default=str)))
+            raise
+        if type(result) is float and result == result:
+            # NaN is not queued: SQLite stores it as NULL, which would read back as no result.
+            self._queue(key, (result, None, None))
+        return result
+
+    def calculate(self, calculation) -> Any:
+        """Returns the result of `calculation`, executing it only if no process has stored it yet."""
+        operation = CalculationFactory._registry.names.get(type(calculation))
+        if operation is None:
+            # Only registered calculations have a name that means the same thing in every process.
+            return calculation.execute()
+        key = (operation, _operand_key(calculation.a), _operand_key(calculation.b))
+        return self.get_or_compute(key, calculation.execute)
+
+    # -- writing ----------------------------------------------------------------------
+    def _queue(self, key: Tuple[str, str, str], row: Row) -> None:
+        with self._pending_lock:
+            self._pending[key] = row
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def _write_pending(self, connection: sqlite3.Connection) -> None:
+        with self._write_lock:
+            with self._pending_lock:
+                batch = dict(self._pending)
+            if not batch:
+                return
+            connection.execute("BEGIN IMMEDIATE")
+            connection.executemany(_INSERT, [key + row for key, row in batch.items()])
+            connection.execute("COMMIT")
+            self.written += len(batch)
+            # Written entries stay visible in _pending until they are readable from the database.
+            with self._pending_lock:
+                for key in batch:
+                    if self._pending.get(key) == batch[key]:
+                        del self._pending[key]
+
+    def _write_loop(self) -> None:
+        """Body of the background writer thread."""
+        with self._write_lock:
+            connection = self._connect()
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self._write_pending(connection)
+        with self._write_lock:
+            connection.close()
+
+    def flush(self) -> None:
+        """Writes every pending result now."""
+        with self._read_lock:
+            self._write_pending(self._reader)
+
+    def close(self) -> None:
+        """Writes pending results, stops the writer thread and closes the database."""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._writer.join()
+        self.flush()
+        with self._read_lock:
+            self._reader.close()
+        _open_caches.discard(self)
+        atexit.unregister(self.close)
+
+    def __len__(self) -> int:
+        """Number of results stored in the database (not counting pending ones)."""
+        with self._read_lock:
+            return self._reader.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(path={self.path!r})"
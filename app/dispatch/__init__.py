@@ -0,0 +1,84 @@
+# app/dispatch/__init__.py
+
+# -----------------------------------------------------------------------------------
+# Precompiled name dispatch with aliases and unambiguous-prefix abbreviations.
+# -----------------------------------------------------------------------------------
+
+
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+# Abbreviations shorter than this are not accepted, so a stray letter never runs anything.
+MIN_PREFIX_LENGTH = 3
+
+
+class AmbiguousNameError(ValueError):
+    """Raised when an abbreviation matches more than one name."""
+
+    def __init__(self, message: str, candidates: Tuple[str, ...]) -> None:
+        super().__init__(message)
+        self.candidates = candidates
+
+
+class PrefixTable:
+    """
+    Resolves names, aliases and unambiguous prefixes of names to their target in
+    a single dict lookup. The table is the flattened form of a prefix trie:
+    every accepted spelling is precomputed when the table is built, so resolving
+    costs the same however many names there are. Ambiguous prefixes are kept in
+    a second table with their error message ready to raise.
+
+    Exact names and aliases always win over abbreviations of longer names.
+
+    """
+
+    __slots__ = ('kind', '_targets', '_ambiguous', 'names')
+
+    def __init__(self, names: Iterable[str], aliases: Optional[Mapping[str, str]] = None,
+                 kind: str = "name", min_prefix_length: int = MIN_PREFIX_LENGTH) -> None:
+        self.kind = kind
+        self.names: Tuple[str, ...] = tuple(names)
+        aliases = dict(aliases or {})
+        exact: Dict[str, str] = {name: name for name in self.names}
+        exact.update(aliases)
+        prefixes: Dict[str, List[str]] = {}
+        for spelling, target in exact.items():
+            for length in range(min_prefix_length, len(spelling)):
+                candidates = prefixes.setdefault(spelling[:length], [])
+                if target not in candidates:
+                    candidates.append(target)
+        self._targets: Dict[str, str] = {}
+        self._ambiguous: Dict[str, AmbiguousNameError] = {}
+        for prefix, candidates in prefixes.items():
+            if prefix in exact:
+                continue
+            if len(candidates) == 1:
+                self._targets[prefix] = candidates[0]
+            else:
+                candidates = tuple(sorted(candidates))
+                self._ambiguous[prefix] = AmbiguousNameError(
+                    f"Ambiguous {kind}: '{prefix}' could be {', '.join(candidates)}.", candidates)
+        self._targets.update(exact)
+
+    def resolve(self, word: str) -> Optional[str]:
+        """
+        Returns the target `word` stands for, or None if it matches nothing.
+        Raises AmbiguousNameError if it abbreviates several names.
+
+        """
+        target = self._targets.get(word)
+        if target is not None:
+            return target
+        lowered = word.lower()
+        target = self._targets.get(lowered)
+        if target is not None:
+            return target
+        error = self._ambiguous.get(lowered)
+        if error is not None:
+            raise AmbiguousNameError(str(error), error.candidates)
+        return None
+
+    def __contains__(self, word: str) -> bool:
+        return word.lower() in self._targets
+
+    def __len__(self) -> int:
+        return len(self._targets)
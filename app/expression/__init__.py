@@ -0,0 +1,432 @@
+# app/expression/__init__.py
+
+# -----------------------------------------------------------------------------------
+# Infix expressions such as "(3 + 4) * 2 ^ 10 % 7".
+# -----------------------------------------------------------------------------------
+
+
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Union
+from app.calculation import CalculationFactory
+
+# -----------------------------------------------------------------------------------
+# Expression Tree Nodes
+# -----------------------------------------------------------------------------------
+
+class Number(NamedTuple):
+    """A numeric literal in an expression tree."""
+    value: float
+
+
+class Variable(NamedTuple):
+    """A named input in an expression tree, bound when the expression is evaluated."""
+    name: str
+
+
+class BinaryOperation(NamedTuple):
+    """
+    An operator node in an expression tree. `calculation_type` is the name the
+    operation is registered under in CalculationFactory (e.g. 'add').
+    """
+    calculation_type: str
+    left: 'Node'
+    right: 'Node'
+
+
+Node = Union[Number, Variable, BinaryOperation]
+
+# Infix symbols and the registered calculation types they stand for.
+OPERATORS = {
+    '+': 'add',
+    '-': 'subtract',
+    '*': 'multiply',
+    '/': 'divide',
+    '%': 'modulo',
+    '^': 'power',
+}
+
+# Characters an infix expression can start with. Front ends evaluate inputs starting
+# with one of these as expressions instead of "<operation> <num1> <num2>" commands.
+EXPRESSION_START = frozenset('0123456789.(-+')
+
+# Symbols used when printing a tree back as text.
+SYMBOLS = {calculation_type: symbol for symbol, calculation_type in OPERATORS.items()}
+
+# Deepest nesting of parentheses and unary signs the parser accepts. Deeper input
+# is rejected before it can exhaust the interpreter's recursion limit.
+MAX_NESTING = 100
+_TOO_DEEP = "Invalid expression: too deeply nested."
+
+_TOKEN = re.compile(r"\s*(?:(\d+\.?\d*(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?)|([A-Za-z_]\w*)|(\S))")
+
+# -----------------------------------------------------------------------------------
+# Parser
+# -----------------------------------------------------------------------------------
+
+def tokenize(text: str) -> List[str]:
+    """Splits an expression into number, variable name and operator tokens."""
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        number, name, symbol = match.groups()
+        if symbol is not None and symbol not in OPERATORS and symbol not in '()':
+            raise ValueError(f"Invalid expression: unexpected character '{symbol}'.")
+        tokens.append(number or name or symbol)
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    """
+    Recursive-descent parser for the grammar below. Precedence goes from lowest
+    (+, -) to highest (^), and ^ is right associative, so 2 ^ 3 ^ 2 == 2 ^ 9 and
+    -2 ^ 2 == -4.
+
+        expression := term (('+' | '-') term)*
+        term       := unary (('*' | '/' | '%') unary)*
+        unary      := ('-' | '+') unary | power
+        power      := primary ('^' unary)?
+        primary    := NUMBER | NAME | '(' expression ')'
+
+    Every level of nesting passes through `unary`, which counts it against MAX_NESTING.
+    """
+
+    def __init__(self, tokens: List[str]) -> None:
+        self.tokens = tokens
+        self.position = 0
+        self.depth = 0
+
+    def peek(self) -> str:
+        return self.tokens[self.position] if self.position < len(self.tokens) else ''
+
+    def take(self) -> str:
+        token = self.peek()
+        if not token:
+            raise ValueError("Invalid expression: unexpected end of input.")
+        self.position += 1
+        return token
+
+    def parse(self) -> Node:
+        node = self.expression()
+        if self.peek():
+            raise ValueError(f"Invalid expression: unexpected '{self.peek()}'.")
+        return node
+
+    def expression(self) -> Node:
+        node = self.term()
+        while self.peek() in ('+', '-'):
+            symbol = self.take()
+            node = BinaryOperation(OPERATORS[symbol], node, self.term())
+        return node
+
+    def term(self) -> Node:
+        node = self.unary()
+        while self.peek() in ('*', '/', '%'):
+            symbol = self.take()
+            node = BinaryOperation(OPERATORS[symbol], node, self.unary())
+        return node
+
+    def unary(self) -> Node:
+        self.depth += 1
+        if self.depth > MAX_NESTING:
+            raise ValueError(_TOO_DEEP)
+        try:
+            if self.peek() in ('-', '+'):
+                negate = self.take() == '-'
+                operand = self.unary()
+                if not negate:
+                    return operand
+                if isinstance(operand, Number):
+                    return Number(-operand.value)
+                return BinaryOperation('multiply', Number(-1.0), operand)
+            return self.power()
+        finally:
+            self.depth -= 1
+
+    def power(self) -> Node:
+        node = self.primary()
+        if self.peek() == '^':
+            self.take()
+            node = BinaryOperation('power', node, self.unary())
+        return node
+
+    def primary(self) -> Node:
+        token = self.take()
+        if token == '(':
+            node = self.expression()
+            if self.peek() != ')':
+                raise ValueError("Invalid expression: expected ')'.")
+            self.take()
+            return node
+        if token in OPERATORS or token == ')':
+            raise ValueError(f"Invalid expression: unexpected '{token}'.")
+        if token[0].isalpha() or token[0] == '_':
+            return Variable(token)
+        return Number(float(token))
+
+
+def parse(text: str) -> Node:
+    """Parses an infix expression into a tree of Number, Variable and BinaryOperation nodes."""
+    tokens = tokenize(text)
+    if not tokens:
+        raise ValueError("Invalid expression: empty input.")
+    return _Parser(tokens).parse()
+
+
+def format_tree(node: Node) -> str:
+    """Prints a tree back as a fully parenthesized infix expression."""
+    if isinstance(node, Number):
+        return f"{node.value}"
+    if isinstance(node, Variable):
+        return node.name
+    symbol = SYMBOLS.get(node.calculation_type, node.calculation_type)
+    return f"({format_tree(node.left)} {symbol} {format_tree(node.right)})"
+
+# -----------------------------------------------------------------------------------
+# Compilation
+# -----------------------------------------------------------------------------------
+
+def compile_tree(node: Node) -> Callable[[Mapping[str, float]], float]:
+    """
+    Turns a tree into a closure tree. Every operator node is bound to the
+    Calculation subclass registered for its type up front, so evaluating the
+    closure only creates calculations and reads their `result`, which is
+    where STATS and CalculationFactory.result_cache see them.
+
+    Subtrees that occur more than once (common subexpressions) are evaluated
+    once per call: their closures store the value in a per-evaluation memo
+    that the other occurrences read back.
+
+    Trees too deep to compile or evaluate recursively (such as a chain of
+    thousands of additions) raise ValueError instead of RecursionError.
+    """
+    try:
+        counts: Counter = Counter()
+        _count_subtrees(node, counts)
+        shared = [subtree for subtree, count in counts.items()
+                  if count > 1 and isinstance(subtree, BinaryOperation)]
+        slots = {subtree: slot for slot, subtree in enumerate(shared)}
+        root = _compile_node(node, slots, {})
+    except RecursionError:
+        raise ValueError(_TOO_DEEP) from None
+    size = len(slots)
+
+    def evaluate(variables: Mapping[str, float]) -> float:
+        try:
+            return root(variables, [_UNSET] * size)
+        except RecursionError:
+            raise ValueError(_TOO_DEEP) from None
+    return evaluate
+
+
+# Marks a shared subtree that has not been evaluated yet in the current call.
+_UNSET = object()
+
+
+def _count_subtrees(node: Node, counts: Counter) -> None:
+    counts[node] += 1
+    if isinstance(node, BinaryOperation) and counts[node] == 1:
+        _count_subtrees(node.left, counts)
+        _count_subtrees(node.right, counts)
+
+
+def _compile_node(node: Node, slots: Dict[Node, int], compiled: Dict[Node, Callable]) -> Callable:
+    if node in compiled:
+        return compiled[node]
+    if isinstance(node, Number):
+        value = node.value
+        function = lambda variables, memo: value
+    elif isinstance(node, Variable):
+        name = node.name
+
+        def function(variables, memo):
+            try:
+                return variables[name]
+            except KeyError:
+                raise ValueError(f"Invalid expression: no value for variable '{name}'.") from None
+    else:
+        calculation_class = CalculationFactory.get_calculation_class(node.calculation_type)
+        if calculation_class is None:
+            raise ValueError(f"Unsupported calculation type: '{node.calculation_type}'.")
+        left = _compile_node(node.left, slots, compiled)
+        right = _compile_node(node.right, slots, compiled)
+        function = lambda variables, memo: calculation_class(left(variables, memo), right(variables, memo)).result
+        if node in slots:
+            function = _memoized(function, slots[node])
+    compiled[node] = function
+    return function
+
+
+def _memoized(function: Callable, slot: int) -> Callable:
+    def memoized(variables, memo):
+        value = memo[slot]
+        if value is _UNSET:
+            value = memo[slot] = function(variables, memo)
+        return value
+    return memoized
+
+
+class CompiledExpression:
+    """
+    A parsed, optimized and compiled expression. Calling it (or `evaluate`)
+    runs the closure tree with the given variable values; `tree` keeps the
+    optimized form for inspection.
+    """
+
+    __slots__ = ('source', 'tree', '_evaluate')
+
+    def __init__(self, source: str, tree: Node) -> None:
+        self.source = source
+        self.tree = tree
+        self._evaluate = compile_tree(tree)
+
+    def evaluate(self, **variables: float) -> float:
+        return self._evaluate(variables)
+
+    __call__ = evaluate
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.source!r})"
+
+
+def normalize(text: str) -> str:
+    """Normalizes expression text (surrounding whitespace stripped, inner runs collapsed) for the cache key."""
+    return ' '.join(text.split())
+
+
+@lru_cache(maxsize=1024)
+def _compile_normalized(normalized: str) -> CompiledExpression:
+    return CompiledExpression(normalized, optimize(parse(normalized)))
+
+
+def compile_expression(text: str) -> CompiledExpression:
+    """
+    Returns the compiled form of an expression. The parsed tree goes through
+    `optimize` before compiling. Compiled forms are kept in an LRU cache keyed
+    by the normalized expression text, so repeated expressions skip
+    tokenizing, parsing, optimizing and compiling.
+    """
+    return _compile_normalized(normalize(text))
+
+
+def evaluate_expression(text: str, **variables: float) -> float:
+    """Compiles (or fetches from the cache) and evaluates an expression."""
+    return compile_expression(text).evaluate(**variables)
+
+
+cache_info = _compile_normalized.cache_info
+cache_clear = _compile_normalized.cache_clear
+
+# -----------------------------------------------------------------------------------
+# Programmatic API and Optimizer
+# -----------------------------------------------------------------------------------
+
+def build(calculation_type: str, left: Any, right: Any) -> BinaryOperation:
+    """
+    Builds an operator node for any type registered in CalculationFactory.
+    Operands may be nodes, numbers or variable names, so rule-generated
+    formulas can be assembled without going through text:
+
+        build('add', build('multiply', 'x', 1), 0)
+    """
+    calculation_type_lower = calculation_type.lower()
+    registry = CalculationFactory._registry
+    if calculation_type_lower not in registry.calculations and calculation_type_lower not in registry.lazy:
+        raise ValueError(f"Unsupported calculation type: '{calculation_type}'. Available types: {registry.available_types}")
+    return BinaryOperation(calculation_type_lower, _as_node(left), _as_node(right))
+
+
+def _as_node(operand: Any) -> Node:
+    if isinstance(operand, (Number, Variable, BinaryOperation)):
+        return operand
+    if isinstance(operand, str):
+        return Variable(operand)
+    return Number(float(operand))
+
+
+def optimize(node: Node) -> Node:
+    """
+    Simplifies an expression tree bottom-up:
+
+    - **Constant folding**: operator nodes whose operands are both numbers are
+      replaced by their result (unless computing it fails, e.g. division by
+      zero, which is left in place to fail at evaluation time).
+    - **Identities**: x + 0, 0 + x, x - 0, x * 1, 1 * x, x / 1 and x ^ 1 become
+      x. Identities that would drop x, such as x * 0 -> 0, are not applied:
+      x may be inf or nan (inf * 0 is nan), an unbound variable or an
+      operation that fails (1 / 0, 10 ^ 400), and its error must still be
+      reported. Folding already handles them when both operands are numbers.
+    - **Common subexpressions**: structurally equal subtrees are replaced by
+      one shared node, which `compile_tree` evaluates once per call.
+    """
+    try:
+        return _optimize(node, {})
+    except RecursionError:
+        raise ValueError(_TOO_DEEP) from None
+
+
+def _optimize(node: Node, interned: Dict[Node, Node]) -> Node:
+    if isinstance(node, BinaryOperation):
+        left = _optimize(node.left, interned)
+        right = _optimize(node.right, interned)
+        node = _simplify(node.calculation_type, left, right)
+    # Hash-consing: equal subtrees become the same object.
+    return interned.setdefault(node, node)
+
+
+def _simplify(calculation_type: str, left: Node, right: Node) -> Node:
+    left_value = left.value if isinstance(left, Number) else None
+    right_value = right.value if isinstance(right, Number) else None
+    if left_value is not None and right_value is not None:
+        folded = _fold(calculation_type, left_value, right_value)
+        if folded is not None:
+            return folded
+    if calculation_type == 'add':
+        if right_value == 0:
+            return left
+        if left_value == 0:
+            return right
+    elif calculation_type == 'subtract':
+        if right_value == 0:
+            return left
+    elif calculation_type == 'multiply':
+        if right_value == 1:
+            return left
+        if left_value == 1:
+            return right
+    elif calculation_type == 'divide':
+        if right_value == 1:
+            return left
+    elif calculation_type == 'power':
+        if right_value == 1:
+            return left
+    return BinaryOperation(calculation_type, left, right)
+
+
+def _fold(calculation_type: str, a: float, b: float) -> Optional[Number]:
+    calculation_class = CalculationFactory.get_calculation_class(calculation_type)
+    if calculation_class is None:
+        return None
+    try:
+        return Number(calculation_class(a, b).execute())
+    except (ArithmeticError, ValueError):
+        return None
+
+
+def count_nodes(node: Node) -> int:
+    """Counts the node objects in a tree; a subtree shared by several parents is counted once."""
+    seen = set()
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        if isinstance(current, BinaryOperation):
+            stack.append(current.left)
+            stack.append(current.right)
+    return len(seen)
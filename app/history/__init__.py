@@ -0,0 +1,213 @@
+# app/history/__init__.py
+
+# -----------------------------------------------------------------------------------
+# Columnar calculation history.
+# -----------------------------------------------------------------------------------
+
+
+import math
+from abc import ABC, abstractmethod
+from array import array
+from typing import Dict, Iterator, List, Tuple, Type, Union
+from app.calculation import Calculation, CalculationFactory
+
+# A raw history entry: (operation name, a, b, result).
+Entry = Tuple[str, float, float, float]
+
+
+def stored_value(value: float) -> float:
+    """
+    Returns `value` as histories store it: as a float64. Exact numbers from the
+    int, decimal or fraction backends are rounded, and an integer beyond the
+    float range becomes inf with its sign.
+    """
+    if type(value) is float:
+        return value
+    try:
+        return float(value)
+    except OverflowError:
+        return math.inf if value > 0 else -math.inf
+
+
+def calculation_from_entry(operation: str, a: float, b: float, result: float) -> Calculation:
+    """Rebuilds a stored entry as a Calculation with its result already cached."""
+    calculation_class = CalculationFactory.get_calculation_class(operation)
+    if calculation_class is None:
+        raise ValueError(f"Unsupported calculation type: '{operation}'.")
+    return _rebuild(calculation_class, a, b, result)
+
+
+def _rebuild(calculation_class: Type[Calculation], a: float, b: float, result: float) -> Calculation:
+    # With interning on, every read of a repeated entry returns the same shared instance.
+    intern_table = CalculationFactory.intern_table
+    if intern_table is not None:
+        return intern_table.intern(calculation_class, a, b, result)
+    return calculation_class.from_result(a, b, result)
+
+
+def format_entry(operation: str, a: float, b: float, result: float) -> str:
+    """
+    Formats a stored entry the way its Calculation prints. An entry whose type is
+    not available in this session (such as a plugin that is not installed) is
+    shown from the stored values alone instead of failing.
+    """
+    try:
+        return f"{calculation_from_entry(operation, a, b, result)}"
+    except ValueError:
+        return f"{operation}: {a} {operation} {b} = {result}"
+
+
+# -----------------------------------------------------------------------------------
+# Observers
+# -----------------------------------------------------------------------------------
+class HistoryObserver(ABC):
+    """
+    A HistoryObserver follows a history store entry by entry, so indexes and
+    aggregates can be kept up to date without ever rescanning the history.
+
+    """
+
+    @abstractmethod
+    def on_append(self, position: int, operation: str, a: float, b: float, result: float) -> None:
+        """Called with every entry added to the history, in order."""
+        pass  # pragma: no cover
+
+    @abstractmethod
+    def reset(self) -> None:
+        """Called before the history replays all of its entries (e.g. after compaction)."""
+        pass  # pragma: no cover
+
+
+class ObservableHistory(ABC):
+    """
+    Observer support shared by the history stores. A store calls _notify() for
+    every appended entry and implements entries(), entry() and __len__, which
+    observers and queries read it through.
+
+    """
+
+    def add_observer(self, observer: HistoryObserver) -> HistoryObserver:
+        """Replays the existing entries into `observer` and keeps it informed of new ones."""
+        for position, (operation, a, b, result) in enumerate(self.entries()):
+            observer.on_append(position, operation, a, b, result)
+        self._observers.append(observer)
+        return observer
+
+    def remove_observer(self, observer: HistoryObserver) -> None:
+        self._observers.remove(observer)
+
+    @abstractmethod
+    def entries(self) -> Iterator[Entry]:
+        """Yields every entry as (operation name, a, b, result), oldest first."""
+        pass  # pragma: no cover
+
+    @abstractmethod
+    def entry(self, index: int) -> Entry:
+        """Returns entry `index` as (operation name, a, b, result) without building a Calculation."""
+        pass  # pragma: no cover
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of entries in the history."""
+        pass  # pragma: no cover
+
+    def _notify(self, position: int, operation: str, a: float, b: float, result: float) -> None:
+        for observer in self._observers:
+            observer.on_append(position, operation, a, b, result)
+
+    def _replay(self) -> None:
+        for observer in self._observers:
+            observer.reset()
+            for position, (operation, a, b, result) in enumerate(self.entries()):
+                observer.on_append(position, operation, a, b, result)
+
+# -----------------------------------------------------------------------------------
+# History Store: CalculationHistory
+# -----------------------------------------------------------------------------------
+class CalculationHistory(ObservableHistory):
+    """
+    CalculationHistory stores past calculations column by column instead of keeping
+    one Calculation object per entry. Operation codes live in a uint8 array and the
+    operands and result in float64 arrays, so every entry costs about 25 bytes.
+
+    Calculation objects are only built when something asks for one (indexing,
+    slicing or iteration). They come back with their result already cached, so
+    printing the history never repeats the arithmetic. With interning on
+    (CalculationFactory.intern_table), repeated entries come back as one
+    shared instance instead of a new object each.
+
+    """
+
+    def __init__(self) -> None:
+        self._codes = array('B')  # Operation code of each entry.
+        self._a = array('d')  # First operand of each entry.
+        self._b = array('d')  # Second operand of each entry.
+        self._results = array('d')  # Result of each entry.
+        # Operation codes are assigned per store in the order calculation classes are first seen.
+        self._classes: List[Type[Calculation]] = []
+        self._class_codes: Dict[Type[Calculation], int] = {}
+        self._names: List[str] = []  # Operation name of each code, as reported to observers.
+        self._observers: List[HistoryObserver] = []
+
+    def _code_for(self, calculation_class: Type[Calculation]) -> int:
+        code = self._class_codes.get(calculation_class)
+        if code is None:
+            code = len(self._classes)
+            if code > 255:
+                raise ValueError("CalculationHistory supports at most 256 calculation types.")
+            self._classes.append(calculation_class)
+            self._names.append(CalculationFactory._registry.names.get(calculation_class, calculation_class.__name__))
+            self._class_codes[calculation_class] = code
+        return code
+
+    def append(self, calculation: Calculation) -> None:
+        """
+        Adds a calculation to the history. The calculation's result is computed
+        (or taken from its cache) and stored alongside the operands.
+
+        """
+        result = stored_value(calculation.result)
+        a, b = stored_value(calculation.a), stored_value(calculation.b)
+        code = self._code_for(type(calculation))
+        self._codes.append(code)
+        self._a.append(a)
+        self._b.append(b)
+        self._results.append(result)
+        if self._observers:
+            self._notify(len(self._codes) - 1, self._names[code], a, b, result)
+
+    def entries(self) -> Iterator[Entry]:
+        """Yields every entry as (operation name, a, b, result) without building Calculations."""
+        names = self._names
+        for code, a, b, result in zip(self._codes, self._a, self._b, self._results):
+            yield names[code], a, b, result
+
+    def entry(self, index: int) -> Entry:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("history index out of range")
+        return self._names[self._codes[index]], self._a[index], self._b[index], self._results[index]
+
+    def _materialize(self, index: int) -> Calculation:
+        calculation_class = self._classes[self._codes[index]]
+        return _rebuild(calculation_class, self._a[index], self._b[index], self._results[index])
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Calculation, List[Calculation]]:
+        if isinstance(index, slice):
+            return [self._materialize(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("history index out of range")
+        return self._materialize(index)
+
+    def __iter__(self) -> Iterator[Calculation]:
+        for index in range(len(self)):
+            yield self._materialize(index)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(entries={len(self)})"
@@ -0,0 +1,346 @@
+# app/history_index/__init__.py
+
+# -----------------------------------------------------------------------------------
+# Secondary indexes and queries over the calculation history.
+# -----------------------------------------------------------------------------------
+
+
+import re
+from array import array
+from collections import deque
+from bisect import bisect_left, bisect_right
+from itertools import chain
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from app.calculation import Calculation
+from app.history import Entry, HistoryObserver, ObservableHistory
+
+RANGE_FIELDS = ('a', 'b', 'result')
+DEFAULT_PAGE_SIZE = 100
+# Appends go to an unsorted tail. A query merges the tail into the sorted run once
+# it holds more than max(_MIN_TAIL, sorted entries >> _TAIL_SHIFT) positions, which
+# keeps both the amortized merge cost and the linear scan per query small, and
+# makes building an index over an existing history a single sort.
+_MIN_TAIL = 1024
+_TAIL_SHIFT = 6
+
+
+class Bound(NamedTuple):
+    """
+    A range of values; None means unbounded on that side. NaN lies in no range:
+    it only matches the bound whose limits are NaN, as parsed from '=nan'.
+    """
+    low: Optional[float] = None
+    high: Optional[float] = None
+    low_inclusive: bool = True
+    high_inclusive: bool = True
+
+    @property
+    def matches_nan(self) -> bool:
+        low = self.low
+        return low is not None and low != low
+
+    def __contains__(self, value: float) -> bool:
+        if value != value:
+            return self.matches_nan
+        low, high = self.low, self.high
+        # Written as the conditions a value must meet, so that a NaN limit excludes every number.
+        if low is not None and not (value > low or (value == low and self.low_inclusive)):
+            return False
+        if high is not None and not (value < high or (value == high and self.high_inclusive)):
+            return False
+        return True
+
+    def intersect(self, other: 'Bound') -> 'Bound':
+        if self.matches_nan or other.matches_nan:
+            # The NaN bound only combines with itself or with an unbounded range.
+            if (self.matches_nan or self == Bound()) and (other.matches_nan or other == Bound()):
+                return self if self.matches_nan else other
+            return _EMPTY
+        low, low_inclusive = self.low, self.low_inclusive
+        if other.low is not None and (low is None or other.low > low or (other.low == low and not other.low_inclusive)):
+            low, low_inclusive = other.low, other.low_inclusive
+        high, high_inclusive = self.high, self.high_inclusive
+        if other.high is not None and (high is None or other.high < high or (other.high == high and not other.high_inclusive)):
+            high, high_inclusive = other.high, other.high_inclusive
+        return Bound(low, high, low_inclusive, high_inclusive)
+
+
+# A bound nothing lies in.
+_EMPTY = Bound(1.0, 0.0)
+
+
+class _SortedIndex:
+    """
+    Positions ordered by the value in `column`: a sorted run searched with bisect
+    plus a short unsorted tail of recent positions that is scanned linearly.
+    NaN values have no place in the order, so their positions are kept in a
+    separate list that only the '=nan' bound reads.
+
+    """
+
+    __slots__ = ('column', 'keys', 'positions', 'nans', 'tail')
+
+    def __init__(self, column: array) -> None:
+        self.column = column
+        self.keys = array('d')  # Sorted values.
+        self.positions = array('q')  # Position of each sorted value.
+        self.nans = array('q')  # Positions of the merged NaN values, in history order.
+        self.tail: List[int] = []
+
+    def _maybe_merge(self) -> None:
+        if len(self.tail) > max(_MIN_TAIL, len(self.positions) >> _TAIL_SHIFT):
+            self.merge()
+
+    def merge(self) -> None:
+        # The sorted run and the tail are two runs for Timsort, so this is close to a linear merge.
+        column = self.column
+        tail = self.tail
+        self.nans.extend(position for position in tail if column[position] != column[position])
+        numbers = (position for position in tail if column[position] == column[position])
+        order = sorted(chain(self.positions, numbers), key=column.__getitem__)
+        self.keys = array('d', map(column.__getitem__, order))
+        self.positions = array('q', order)
+        self.tail = []
+
+    def _span(self, bound: Bound):
+        keys = self.keys
+        start = 0 if bound.low is None else (bisect_left if bound.low_inclusive else bisect_right)(keys, bound.low)
+        stop = len(keys) if bound.high is None else (bisect_right if bound.high_inclusive else bisect_left)(keys, bound.high)
+        return start, max(start, stop)
+
+    def estimate(self, bound: Bound) -> int:
+        self._maybe_merge()
+        if bound.matches_nan:
+            return len(self.nans) + len(self.tail)
+        start, stop = self._span(bound)
+        return stop - start + len(self.tail)
+
+    def lookup(self, bound: Bound) -> List[int]:
+        """Returns the positions whose value lies in `bound`, in history order."""
+        if bound.matches_nan:
+            matches = list(self.nans)
+        else:
+            start, stop = self._span(bound)
+            matches = list(self.positions[start:stop])
+        column = self.column
+        matches.extend(position for position in self.tail if column[position] in bound)
+        matches.sort()
+        return matches
+
+
+# -----------------------------------------------------------------------------------
+# HistoryIndex
+# -----------------------------------------------------------------------------------
+class HistoryIndex(HistoryObserver):
+    """
+    HistoryIndex observes a history store and maintains, as entries are appended,
+    a position list per operation and sorted indexes over `a`, `b` and the result.
+    query() answers from the most selective index and checks the remaining
+    conditions against compact value columns, so no Calculation is built or
+    executed until a page of results is read.
+
+    """
+
+    def __init__(self, history: ObservableHistory) -> None:
+        self.history = history
+        self.reset()
+        history.add_observer(self)
+
+    def reset(self) -> None:
+        self._operations: Dict[str, array] = {}  # Operation name -> positions.
+        self._operation_codes: Dict[str, int] = {}
+        self._codes = array('H')  # Operation code of each entry, for filtering.
+        self._columns: Dict[str, array] = {field: array('d') for field in RANGE_FIELDS}
+        self._sorted: Dict[str, _SortedIndex] = {field: _SortedIndex(column) for field, column in self._columns.items()}
+
+    def on_append(self, position: int, operation: str, a: float, b: float, result: float) -> None:
+        positions = self._operations.get(operation)
+        if positions is None:
+            positions = self._operations[operation] = array('q')
+            self._operation_codes[operation] = len(self._operation_codes)
+        positions.append(position)
+        self._codes.append(self._operation_codes[operation])
+        columns = self._columns
+        columns['a'].append(a)
+        columns['b'].append(b)
+        columns['result'].append(result)
+        for index in self._sorted.values():
+            index.tail.append(position)
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def query(self, op: Optional[str] = None, last: Optional[int] = None, **bounds: Bound) -> 'QueryResult':
+        """
+        Returns the entries of operation `op` (any when None) whose fields lie in
+        the given bounds, e.g. query(op='divide', result=Bound(low=100)). With
+        `last`, only the newest `last` matches are kept.
+
+        """
+        for field in bounds:
+            if field not in self._columns:
+                raise ValueError(f"Invalid history query: unknown field '{field}'.")
+
+        if op is not None and op not in self._operations:
+            return QueryResult(self.history, ())
+
+        # Start from the smallest candidate set, then check the other conditions.
+        estimates = {field: self._sorted[field].estimate(bound) for field, bound in bounds.items()}
+        if op is not None:
+            estimates['op'] = len(self._operations[op])
+        if not estimates:
+            source = None
+            candidates: Sequence[int] = range(len(self))
+        else:
+            source = min(estimates, key=estimates.__getitem__)
+            if source == 'op':
+                candidates = self._operations[op]
+            else:
+                candidates = self._sorted[source].lookup(bounds[source])
+
+        checks = [(self._columns[field], bound) for field, bound in bounds.items() if field != source]
+        code = self._operation_codes.get(op) if op is not None and source != 'op' else None
+        if checks or code is not None:
+            candidates = self._filter(candidates, checks, code, last)
+        elif last is not None:
+            candidates = candidates[max(0, len(candidates) - last):]
+        return QueryResult(self.history, candidates)
+
+    def _filter(self, candidates: Sequence[int], checks, code: Optional[int], last: Optional[int]) -> List[int]:
+        codes = self._codes
+
+        def matches(position: int) -> bool:
+            return ((code is None or codes[position] == code)
+                    and all(column[position] in bound for column, bound in checks))
+
+        if last is None:
+            return [position for position in candidates if matches(position)]
+        # Walk backwards so only as many candidates as needed are checked.
+        found = []
+        for position in reversed(candidates):
+            if len(found) == last:
+                break
+            if matches(position):
+                found.append(position)
+        found.reverse()
+        return found
+
+
+# -----------------------------------------------------------------------------------
+# HistoryScan
+# -----------------------------------------------------------------------------------
+class HistoryScan:
+    """
+    Answers the same queries as HistoryIndex by reading the history from start
+    to end on every query, keeping no per-entry state. HistoryIndex holds about
+    70 bytes for every entry ever added, so a history whose memory must stay
+    flat (a BoundedHistory) is queried with a HistoryScan instead: slower
+    queries, but memory that only grows with the number of matches.
+
+    """
+
+    # Offset of each range field in an (operation, a, b, result) entry.
+    _FIELDS = {field: offset for offset, field in enumerate(RANGE_FIELDS, start=1)}
+
+    def __init__(self, history: ObservableHistory) -> None:
+        self.history = history
+
+    def query(self, op: Optional[str] = None, last: Optional[int] = None, **bounds: Bound) -> 'QueryResult':
+        """Same as HistoryIndex.query."""
+        for field in bounds:
+            if field not in self._FIELDS:
+                raise ValueError(f"Invalid history query: unknown field '{field}'.")
+        checks = [(self._FIELDS[field], bound) for field, bound in bounds.items()]
+        # With `last`, only the newest matches are kept while scanning.
+        matches = deque(maxlen=last) if last is not None else []
+        for position, entry in enumerate(self.history.entries()):
+            if (op is None or entry[0] == op) and all(entry[offset] in bound for offset, bound in checks):
+                matches.append(position)
+        return QueryResult(self.history, list(matches))
+
+
+class QueryResult:
+    """
+    The positions matching a query. Calculation objects are only built for the
+    entries that are actually read, one page at a time.
+
+    """
+
+    def __init__(self, history: ObservableHistory, positions: Sequence[int]) -> None:
+        self.history = history
+        self.positions = positions
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __getitem__(self, index: int) -> Calculation:
+        return self.history[self.positions[index]]
+
+    def __iter__(self) -> Iterator[Calculation]:
+        for page in self.pages():
+            yield from page
+
+    def page(self, number: int, size: int = DEFAULT_PAGE_SIZE) -> List[Calculation]:
+        """Returns page `number` (0-based) of `size` entries."""
+        history = self.history
+        return [history[position] for position in self.positions[number * size:(number + 1) * size]]
+
+    def pages(self, size: int = DEFAULT_PAGE_SIZE) -> Iterator[List[Calculation]]:
+        for number in range((len(self.positions) + size - 1) // size):
+            yield self.page(number, size)
+
+    def items(self) -> Iterator[Tuple[int, Calculation]]:
+        """Yields (position, Calculation) pairs in history order."""
+        return zip(self.positions, self)
+
+    def entries(self) -> Iterator[Tuple[int, Entry]]:
+        """Yields (position, (operation name, a, b, result)) pairs without building Calculations."""
+        entry = self.history.entry
+        for position in self.positions:
+            yield position, entry(position)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(matches={len(self)})"
+
+
+# -----------------------------------------------------------------------------------
+# Query text, as typed after 'history' in the REPL
+# -----------------------------------------------------------------------------------
+_CONDITION = re.compile(r'^(op|last|a|b|result)(<=|>=|=|<|>)(.+)$')
+
+
+def parse_query(text: str) -> dict:
+    """
+    Parses conditions like 'op=divide result>100 a<=5 last=50' into query()
+    keyword arguments. Conditions on the same field are combined.
+
+    """
+    arguments: dict = {}
+    for condition in text.split():
+        match = _CONDITION.match(condition)
+        if match is None:
+            raise ValueError(f"Invalid history query: cannot understand '{condition}'.")
+        field, operator, value = match.groups()
+        if field in ('op', 'last'):
+            if operator != '=':
+                raise ValueError(f"Invalid history query: use '{field}=...'.")
+            if field == 'op':
+                arguments['op'] = value.lower()
+                continue
+            if not value.isdigit():
+                raise ValueError("Invalid history query: 'last' needs a whole number.")
+            arguments['last'] = int(value)
+            continue
+        try:
+            number = float(value)
+        except ValueError:
+            raise ValueError(f"Invalid history query: '{value}' is not a number.")
+        bound = {
+            '=': Bound(number, number),
+            '<': Bound(high=number, high_inclusive=False),
+            '<=': Bound(high=number),
+            '>': Bound(low=number, low_inclusive=False),
+            '>=': Bound(low=number),
+        }[operator]
+        arguments[field] = arguments[field].intersect(bound) if field in arguments else bound
+    return arguments
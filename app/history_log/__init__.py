@@ -0,0 +1,255 @@
+# app/history_log/__init__.py
+
+# -----------------------------------------------------------------------------------
+# Persistent calculation history: an append-only file of fixed-size binary records.
+# -----------------------------------------------------------------------------------
+
+
+import json
+import mmap
+import os
+import struct
+import time
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from app.calculation import Calculation, CalculationFactory
+from app.history import Entry, HistoryObserver, ObservableHistory, calculation_from_entry, stored_value
+
+# File layout:
+#   header  HEADER_SIZE bytes: MAGIC, format version, the operation-name table as
+#           JSON (index == operation code), zero padded.
+#   records RECORD.size bytes each: operation code, a, b, result, timestamp.
+MAGIC = b'CALCHLOG'
+VERSION = 1
+HEADER_SIZE = 4096
+_HEADER_PREFIX = struct.Struct('<8sHI')  # magic, version, length of the JSON table
+RECORD = struct.Struct('<Bdddd')
+
+Record = Tuple[str, float, float, float, float]
+
+
+def _encode_header(names: List[str]) -> bytes:
+    table = json.dumps(names, separators=(',', ':')).encode()
+    header = _HEADER_PREFIX.pack(MAGIC, VERSION, len(table)) + table
+    if len(header) > HEADER_SIZE:
+        raise ValueError("History log operation table does not fit in the header.")
+    return header.ljust(HEADER_SIZE, b'\0')
+
+
+def _decode_header(header: bytes, path: str) -> List[str]:
+    if len(header) < HEADER_SIZE:
+        raise ValueError(f"'{path}' is not a calculator history log.")
+    magic, version, length = _HEADER_PREFIX.unpack_from(header)
+    if magic != MAGIC:
+        raise ValueError(f"'{path}' is not a calculator history log.")
+    if version != VERSION:
+        raise ValueError(f"Unsupported history log version {version} in '{path}'.")
+    start = _HEADER_PREFIX.size
+    return json.loads(header[start:start + length])
+
+
+# -----------------------------------------------------------------------------------
+# History Store: HistoryLog
+# -----------------------------------------------------------------------------------
+class HistoryLog(ObservableHistory):
+    """
+    HistoryLog is a durable drop-in for CalculationHistory. Every append packs one
+    fixed-size record into a write buffer; the buffer is written out and fsync'ed
+    (a checkpoint) every `checkpoint_every` records or `checkpoint_interval`
+    seconds, whichever comes first, and on close().
+
+    Reads go through a read-only memory map of the file, so reopening a log with
+    millions of entries costs one mmap call, and iterating it (for example in
+    display_history) builds one Calculation at a time without loading the file.
+
+    A crash can lose at most the records appended since the last checkpoint; a
+    partially written record at the end of the file is dropped when it is reopened.
+
+    """
+
+    def __init__(self, path: str, checkpoint_every: int = 1000, checkpoint_interval: float = 1.0) -> None:
+        self.path = path
+        self.checkpoint_every = checkpoint_every
+        self.checkpoint_interval = checkpoint_interval
+        self._observers: List[HistoryObserver] = []
+        self._open()
+
+    def _open(self) -> None:
+        path = self.path
+        try:
+            self._file = open(path, 'r+b')
+        except FileNotFoundError:
+            self._file = open(path, 'w+b')
+            self._file.write(_encode_header([]))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.seek(0)
+        self._names: List[str] = _decode_header(self._file.read(HEADER_SIZE), path)
+        self._codes: Dict[str, int] = {name: code for code, name in enumerate(self._names)}
+        size = os.fstat(self._file.fileno()).st_size
+        self._written = (size - HEADER_SIZE) // RECORD.size  # Records already in the file.
+        if HEADER_SIZE + self._written * RECORD.size != size:
+            # Drop a record torn by a crash in the middle of a write.
+            self._file.truncate(HEADER_SIZE + self._written * RECORD.size)
+        self._pending = bytearray()  # Packed records not yet written to the file.
+        self._unsynced = 0  # Records written or buffered since the last checkpoint.
+        self._last_checkpoint = time.monotonic()
+        self._map: Optional[mmap.mmap] = None
+        self._mapped = 0  # Records visible through self._map.
+
+    # -- writing ----------------------------------------------------------------------
+    def _code_for(self, name: str) -> int:
+        code = self._codes.get(name)
+        if code is None:
+            code = len(self._names)
+            if code > 255:
+                raise ValueError("HistoryLog supports at most 256 calculation types.")
+            header = _encode_header(self._names + [name])
+            # The header has a fixed size, so a new operation is recorded in place.
+            self._file.seek(0)
+            self._file.write(header)
+            self._file.flush()
+            self._names.append(name)
+            self._codes[name] = code
+        return code
+
+    def append(self, calculation: Calculation) -> None:
+        """Adds a calculation to the log, checkpointing when one is due."""
+        result = stored_value(calculation.result)
+        calculation_class = type(calculation)
+        name = CalculationFactory._registry.names.get(calculation_class, calculation_class.__name__)
+        self.append_entry(name, stored_value(calculation.a), stored_value(calculation.b), result)
+
+    def append_entry(self, operation: str, a: float, b: float, result: float,
+                     timestamp: Optional[float] = None) -> None:
+        """Adds a raw entry to the log; `timestamp` defaults to now."""
+        self._pending += RECORD.pack(self._code_for(operation), a, b, result,
+                                     time.time() if timestamp is None else timestamp)
+        self._unsynced += 1
+        if self._observers:
+            self._notify(len(self) - 1, operation, a, b, result)
+        if (self._unsynced >= self.checkpoint_every
+                or time.monotonic() - self._last_checkpoint >= self.checkpoint_interval):
+            self.checkpoint()
+
+    def flush(self) -> None:
+        """Writes buffered records to the file (without waiting for the disk)."""
+        if self._pending:
+            self._file.seek(0, os.SEEK_END)
+            self._file.write(self._pending)
+            self._written += len(self._pending) // RECORD.size
+            self._pending = bytearray()
+        self._file.flush()
+
+    def checkpoint(self) -> None:
+        """Writes buffered records and fsyncs the file, making every entry so far durable."""
+        self.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_checkpoint = time.monotonic()
+
+    # -- reading ----------------------------------------------------------------------
+    def _view(self) -> mmap.mmap:
+        """Returns a memory map that covers every record appended so far."""
+        if self._pending:
+            self.flush()
+        if self._map is None or self._mapped != self._written:
+            # The old map is not closed here: a records() generator may still be reading it.
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._mapped = self._written
+        return self._map
+
+    def record(self, index: int) -> Record:
+        """Returns entry `index` as (operation name, a, b, result, timestamp)."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("history index out of range")
+        code, a, b, result, timestamp = RECORD.unpack_from(self._view(), HEADER_SIZE + index * RECORD.size)
+        return self._names[code], a, b, result, timestamp
+
+    def records(self) -> Iterator[Record]:
+        """Yields every entry as (operation name, a, b, result, timestamp), oldest first."""
+        view = self._view()
+        names = self._names
+        unpack_from = RECORD.unpack_from
+        for offset in range(HEADER_SIZE, HEADER_SIZE + self._mapped * RECORD.size, RECORD.size):
+            code, a, b, result, timestamp = unpack_from(view, offset)
+            yield names[code], a, b, result, timestamp
+
+    def entries(self) -> Iterator[Entry]:
+        """Yields every entry as (operation name, a, b, result), oldest first."""
+        for name, a, b, result, _ in self.records():
+            yield name, a, b, result
+
+    def entry(self, index: int) -> Entry:
+        """Returns entry `index` as (operation name, a, b, result)."""
+        return self.record(index)[:4]
+
+    def _materialize(self, index: int) -> Calculation:
+        name, a, b, result, _ = self.record(index)
+        return calculation_from_entry(name, a, b, result)
+
+    def __len__(self) -> int:
+        return self._written + len(self._pending) // RECORD.size
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Calculation, List[Calculation]]:
+        if isinstance(index, slice):
+            return [self._materialize(i) for i in range(*index.indices(len(self)))]
+        return self._materialize(index)
+
+    def __iter__(self) -> Iterator[Calculation]:
+        for index in range(len(self)):
+            yield self._materialize(index)
+
+    # -- maintenance ------------------------------------------------------------------
+    def compact(self, keep: Optional[int] = None) -> None:
+        """
+        Rewrites the log keeping only the newest `keep` entries (all of them when
+        None) and only the operation names those entries use. The new log is
+        written to a temporary file and swapped in with an atomic rename, so a
+        crash during compaction leaves the old log intact.
+
+        """
+        self.checkpoint()
+        start = 0 if keep is None else max(0, len(self) - keep)
+        names: List[str] = []
+        codes: Dict[str, int] = {}
+        temporary = self.path + '.compact'
+        with open(temporary, 'wb') as out:
+            out.write(_encode_header([]))  # Rewritten below once the table is known.
+            for index in range(start, len(self)):
+                name, a, b, result, timestamp = self.record(index)
+                code = codes.get(name)
+                if code is None:
+                    code = codes[name] = len(names)
+                    names.append(name)
+                out.write(RECORD.pack(code, a, b, result, timestamp))
+            out.seek(0)
+            out.write(_encode_header(names))
+            out.flush()
+            os.fsync(out.fileno())
+        self._close_files()
+        os.replace(temporary, self.path)
+        self._open()
+        self._replay()  # Positions changed, so observers start over.
+
+    def _close_files(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def close(self) -> None:
+        """Checkpoints and closes the log."""
+        if not self._file.closed:
+            self.checkpoint()
+            self._close_files()
+
+    def __enter__(self) -> 'HistoryLog':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(path={self.path!r}, entries={len(self)})"
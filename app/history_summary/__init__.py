@@ -0,0 +1,104 @@
+# app/history_summary/__init__.py
+
+# -----------------------------------------------------------------------------------
+# Running aggregates over the calculation history.
+# -----------------------------------------------------------------------------------
+
+
+import math
+from typing import Dict
+from app.history import HistoryObserver, ObservableHistory
+
+
+class RunningStats:
+    """
+    Count, sum, mean, variance, min and max of a stream of values, updated in
+    O(1) per value. Mean and variance use Welford's algorithm, which stays
+    accurate where the textbook sum-of-squares formula cancels catastrophically.
+
+    """
+
+    __slots__ = ('count', 'total', 'mean', '_m2', 'min', 'max')
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self._m2 = 0.0  # Sum of squared differences from the mean.
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def variance(self) -> float:
+        """Sample variance; 0.0 until there are two values."""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(self.variance)
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "mean": self.mean,
+            "variance": self.variance,
+            "stdev": self.stdev,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+
+# -----------------------------------------------------------------------------------
+# HistorySummary
+# -----------------------------------------------------------------------------------
+class HistorySummary(HistoryObserver):
+    """
+    HistorySummary observes a history store and keeps RunningStats of the results
+    per operation and over all operations. Reading them is O(1) in the size of
+    the history: they are updated as each calculation is added, never recomputed.
+
+    """
+
+    def __init__(self, history: ObservableHistory) -> None:
+        self.reset()
+        history.add_observer(self)
+
+    def reset(self) -> None:
+        self.total = RunningStats()
+        self.operations: Dict[str, RunningStats] = {}
+
+    def on_append(self, position: int, operation: str, a: float, b: float, result: float) -> None:
+        stats = self.operations.get(operation)
+        if stats is None:
+            stats = self.operations[operation] = RunningStats()
+        stats.add(result)
+        self.total.add(result)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Returns the aggregates as plain data: one entry per operation plus 'all'."""
+        data = {operation: stats.as_dict() for operation, stats in sorted(self.operations.items())}
+        data['all'] = self.total.as_dict()
+        return data
+
+    def format(self) -> str:
+        """Formats the aggregates as a table for the REPL."""
+        if not self.total.count:
+            return "No calculations performed yet."
+        lines = [f"{'operation':<12}{'count':>8}{'sum':>14}{'mean':>14}{'variance':>14}{'min':>14}{'max':>14}"]
+        rows = sorted(self.operations.items()) + [('all', self.total)]
+        for operation, stats in rows:
+            lines.append(f"{operation:<12}{stats.count:>8}{stats.total:>14.6g}{stats.mean:>14.6g}"
+                         f"{stats.variance:>14.6g}{stats.min:>14.6g}{stats.max:>14.6g}")
+        return "\n".join(lines)
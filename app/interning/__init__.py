@@ -0,0 +1,79 @@
+# app/interning/__init__.py
+
+# -----------------------------------------------------------------------------------
+# Shared Calculation instances for repeated (operation, a, b) combinations.
+# -----------------------------------------------------------------------------------
+
+
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Tuple, Type
+from app.cache import make_key
+from app.calculation import Calculation
+
+_MISSING = object()
+
+
+# -----------------------------------------------------------------------------------
+# InternTable
+# -----------------------------------------------------------------------------------
+class InternTable:
+    """
+    A flyweight table handing out one shared, frozen Calculation per distinct
+    (calculation class, a, b), keyed like ResultCache so that 1, 1.0 and -0.0
+    stay apart. A shared instance computes its result once for every holder.
+
+    Instances are held weakly, so one stays shared for as long as anything
+    (a caller, a list of calculations) still uses it; the `maxsize` most
+    recently requested ones are also held strongly, so hot combinations
+    survive between requests while memory stays bounded.
+
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        if maxsize < 1:
+            raise ValueError("InternTable maxsize must be at least 1.")
+        self.maxsize = maxsize
+        self._table: 'weakref.WeakValueDictionary[Tuple, Calculation]' = weakref.WeakValueDictionary()
+        self._recent: 'OrderedDict[Tuple, Calculation]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def intern(self, calculation_class: Type[Calculation], a: Any, b: Any, result: Any = _MISSING) -> Calculation:
+        """
+        Returns the shared `calculation_class(a, b)`, creating and freezing it
+        on first use. A known `result` (e.g. from a stored history) is given
+        to a new instance so it never has to run the arithmetic.
+
+        """
+        key = make_key(calculation_class, a, b)
+        with self._lock:
+            calculation = self._table.get(key)
+            if calculation is None:
+                self.misses += 1
+                if result is _MISSING:
+                    calculation = calculation_class(a, b)
+                else:
+                    calculation = calculation_class.from_result(a, b, result)
+                self._table[key] = calculation.freeze()
+            else:
+                self.hits += 1
+            recent = self._recent
+            recent[key] = calculation
+            recent.move_to_end(key)
+            if len(recent) > self.maxsize:
+                recent.popitem(last=False)
+        return calculation
+
+    def clear(self) -> None:
+        with self._lock:
+            self._recent.clear()
+            self._table.clear()
+
+    def __len__(self) -> int:
+        """Number of shared instances that are still alive."""
+        return len(self._table)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(maxsize={self.maxsize}, entries={len(self)})"
@@ -0,0 +1,227 @@
+# app/kernels/__init__.py
+
+# -----------------------------------------------------------------------------------
+# Autotuned choice between interchangeable batch kernels.
+# -----------------------------------------------------------------------------------
+
+
+import json
+import math
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+# Environment variable holding the path of the kernel profile.
+PROFILE_ENV = "CALCULATOR_KERNEL_PROFILE"
+# Bumped whenever the profile format or the bucket boundaries change.
+PROFILE_VERSION = 1
+# Upper bounds of the input-size buckets; larger inputs share one last bucket.
+SIZE_BUCKETS = (16, 256, 4096, 65536)
+# Number of elements kernels are timed on for each bucket.
+SAMPLE_SIZES = SIZE_BUCKETS + (2 * SIZE_BUCKETS[-1],)
+# Each kernel is run on about this many elements per measurement, so small
+# buckets are timed over several calls instead of one too short to measure.
+_ELEMENTS_PER_MEASUREMENT = 4096
+
+Key = Tuple[str, str, int]
+
+
+def kernel_profile_path() -> str:
+    """
+    Path of the kernel profile: $CALCULATOR_KERNEL_PROFILE if set, otherwise
+    calculator/kernels.json in the per-user cache directory.
+    """
+    path = os.environ.get(PROFILE_ENV)
+    if path:
+        return path
+    cache = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache, "calculator", "kernels.json")
+
+
+def size_bucket(length: int) -> int:
+    """Returns the index of the size bucket an input of `length` elements falls into."""
+    return bisect_left(SIZE_BUCKETS, length)
+
+
+def input_kind(a: Any, b: Any) -> str:
+    """'buffer' when both operands are contiguous one-dimensional float64 buffers, otherwise 'sequence'."""
+    return 'buffer' if _is_float_buffer(a) and _is_float_buffer(b) else 'sequence'
+
+
+def _is_float_buffer(values: Any) -> bool:
+    if type(values) is array:
+        return values.typecode == 'd'
+    # A strided view (e.g. memoryview(...)[::2]) cannot be handed to NumPy as a plain buffer.
+    return type(values) is memoryview and values.format == 'd' and values.ndim == 1 and values.c_contiguous
+
+
+# -----------------------------------------------------------------------------------
+# KernelDispatcher
+# -----------------------------------------------------------------------------------
+class KernelDispatcher:
+    """
+    Runs each batch operation with whichever of its kernels is fastest for the
+    input at hand. `kernels` maps every operation to its named kernels, which
+    must return the same results, so only speed decides between them.
+
+    Decisions are made per (operation, input kind, size bucket): the first call
+    that falls into a new combination times every candidate kernel on sample
+    data of that size and keeps the fastest. With a `path`, the decisions are
+    saved in a small JSON profile and read back by later runs, so calibration
+    only happens once per machine; a profile written by another Python version,
+    machine or set of kernels is ignored and rebuilt.
+
+    Kernels named in `buffer_only` are only candidates for float64 buffers.
+
+    """
+
+    def __init__(self, kernels: Mapping[str, Mapping[str, Callable[[Any, Any], Any]]],
+                 path: Optional[str] = None, buffer_only: Iterable[str] = (), repeat: int = 3) -> None:
+        self.kernels = {operation: dict(variants) for operation, variants in kernels.items()}
+        self.path = path
+        self.buffer_only = frozenset(buffer_only)
+        self.repeat = repeat
+        self.decisions: Dict[Key, str] = {}
+        self.calibrations = 0
+        self._chosen: Dict[Key, Callable[[Any, Any], Any]] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def run(self, operation: str, a: Sequence[float], b: Sequence[float]) -> Any:
+        """Runs `operation` on `a` and `b` with the kernel chosen for their kind and size."""
+        key = (operation, input_kind(a, b), size_bucket(len(a)))
+        kernel = self._chosen.get(key)
+        if kernel is None:
+            kernel = self._choose(key)
+        return kernel(a, b)
+
+    def candidates(self, operation: str, kind: str) -> List[str]:
+        """Names of the kernels of `operation` that may run on inputs of `kind`."""
+        return [name for name in self.kernels[operation] if kind == 'buffer' or name not in self.buffer_only]
+
+    def calibrate(self, operations: Optional[Iterable[str]] = None) -> Dict[Key, str]:
+        """
+        Times the kernels of `operations` (default: all) for every input kind and
+        size bucket now, replacing earlier decisions, and saves the profile.
+        Returns the decisions.
+        """
+        with self._lock:
+            self._load()
+            for operation in (self.kernels if operations is None else operations):
+                for kind in ('sequence', 'buffer'):
+                    for bucket in range(len(SAMPLE_SIZES)):
+                        self._decide((operation, kind, bucket))
+            self.save()
+            return dict(self.decisions)
+
+    def describe(self) -> str:
+        """The decisions as a table, one line per operation, input kind and size bucket."""
+        lines = []
+        for (operation, kind, bucket), name in sorted(self.decisions.items()):
+            size = f"<= {SIZE_BUCKETS[bucket]}" if bucket < len(SIZE_BUCKETS) else f"> {SIZE_BUCKETS[-1]}"
+            lines.append(f"{operation:<15}{kind:<10}{size:<10}{name}")
+        return "\n".join(lines)
+
+    def environment(self) -> str:
+        """Identifies what the decisions depend on; a profile for another environment is not reused."""
+        import platform
+        names = sorted({name for variants in self.kernels.values() for name in variants})
+        return (f"{platform.python_implementation()} {platform.python_version()} {platform.machine()}; "
+                f"kernels: {', '.join(names)}")
+
+    def save(self) -> None:
+        """
+        Writes the decisions to the profile (if there is a `path`). A profile
+        that cannot be written is skipped: it only saves calibration time.
+        """
+        if self.path is None:
+            return
+        data = {
+            "version": PROFILE_VERSION,
+            "environment": self.environment(),
+            "decisions": {f"{operation}/{kind}/{bucket}": name
+                          for (operation, kind, bucket), name in sorted(self.decisions.items())},
+        }
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(temporary, 'w', encoding='utf-8') as file:
+                json.dump(data, file, indent=1)
+            # Readers in other processes see either the old profile or the new one, never half of it.
+            os.replace(temporary, self.path)
+        except OSError:
+            pass
+
+    def _choose(self, key: Key) -> Callable[[Any, Any], Any]:
+        with self._lock:
+            self._load()
+            name = self.decisions.get(key)
+            if name is None:
+                name = self._decide(key)
+                self.save()
+            kernel = self._chosen[key] = self.kernels[key[0]][name]
+        return kernel
+
+    def _decide(self, key: Key) -> str:
+        operation, kind, bucket = key
+        candidates = self.candidates(operation, kind)
+        if len(candidates) > 1:
+            a, b = _sample(kind, SAMPLE_SIZES[bucket])
+            timings = {name: self._measure(self.kernels[operation][name], a, b) for name in candidates}
+            name = min(candidates, key=timings.__getitem__)
+            self.calibrations += 1
+        else:
+            name = candidates[0]
+        self.decisions[key] = name
+        self._chosen.pop(key, None)
+        return name
+
+    def _measure(self, kernel: Callable[[Any, Any], Any], a: Sequence[float], b: Sequence[float]) -> float:
+        # The best of `repeat` runs: slower runs only measure interference from elsewhere.
+        number = max(1, _ELEMENTS_PER_MEASUREMENT // len(a))
+        best = math.inf
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                kernel(a, b)
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    def _load(self) -> None:
+        # Reads the profile once, before the first decision is needed.
+        if self._loaded:
+            return
+        self._loaded = True
+        if self.path is None:
+            return
+        try:
+            with open(self.path, encoding='utf-8') as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return
+        if (not isinstance(data, dict) or data.get("version") != PROFILE_VERSION
+                or data.get("environment") != self.environment() or not isinstance(data.get("decisions"), dict)):
+            return
+        for text, name in data["decisions"].items():
+            operation, _, rest = text.partition('/')
+            kind, _, bucket = rest.partition('/')
+            # Entries that no longer fit the kernels or buckets are dropped and recalibrated when needed.
+            if (operation in self.kernels and kind in ('sequence', 'buffer') and bucket.isdigit()
+                    and int(bucket) < len(SAMPLE_SIZES) and name in self.candidates(operation, kind)):
+                self.decisions[(operation, kind, int(bucket))] = name
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(path={self.path!r}, decisions={len(self.decisions)})"
+
+
+def _sample(kind: str, length: int) -> Tuple[Sequence[float], Sequence[float]]:
+    # Operands every operation computes without errors (no zero divisors, small
+    # powers), since that is the case worth making fast.
+    a = [1.0 + (i % 89) * 0.25 for i in range(length)]
+    b = [0.5 + (i % 13) * 0.125 for i in range(length)]
+    if kind == 'buffer':
+        return array('d', a), array('d', b)
+    return a, b
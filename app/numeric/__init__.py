@@ -0,0 +1,228 @@
+# app/numeric/__init__.py
+
+# -----------------------------------------------------------------------------------
+# Numeric backends: the number types calculations run on.
+# -----------------------------------------------------------------------------------
+
+
+import decimal
+import math
+import sys
+from fractions import Fraction
+from typing import Any, Dict, Optional, Tuple
+from app.calculation import Calculation, CalculationFactory, DivideCalculation, PowerCalculation
+
+# gmpy2 is optional. When it is installed, the exact backends use its GMP integers
+# and rationals, which are much faster than int and Fraction on large numbers.
+try:
+    import gmpy2
+except ImportError:  # pragma: no cover
+    gmpy2 = None
+
+if gmpy2 is not None:  # pragma: no cover
+    _Integer, _Rational = gmpy2.mpz, gmpy2.mpq
+    _INTEGERS: Tuple[type, ...] = (int, type(gmpy2.mpz(0)))
+    _RATIONALS: Tuple[type, ...] = (Fraction, type(gmpy2.mpq(0)))
+else:
+    _Integer, _Rational = int, Fraction
+    _INTEGERS = (int,)
+    _RATIONALS = (Fraction,)
+
+# Larger exponents are refused by the exact backends: power 10 1e10 would run for
+# hours and fill the memory before its result could be shown.
+MAX_EXPONENT = 10_000
+
+
+# -----------------------------------------------------------------------------------
+# NumericBackend
+# -----------------------------------------------------------------------------------
+class NumericBackend:
+    """
+    A numeric backend turns operand text into numbers of one type and computes
+    calculations on them. This base class is the native float backend, the
+    calculator's default; the exact backends below override `parse` and, where
+    the number type needs it, `calculate`.
+
+    Calculation classes and Operations work on any number type that supports
+    the arithmetic operators, so a backend only decides which type reaches them.
+
+    """
+
+    name = 'float'
+
+    def parse(self, text: str) -> Any:
+        """Converts operand text to this backend's number type (ValueError if it is not a number)."""
+        return float(text)
+
+    def convert(self, value: Any) -> Any:
+        """Converts a number (or numeric text) to this backend's number type."""
+        return self.parse(value) if isinstance(value, str) else float(value)
+
+    def calculate(self, calculation: Calculation) -> Calculation:
+        """
+        Computes `calculation` with this backend's rules and returns the
+        calculation to keep, whose `result` is then cached.
+        """
+        calculation.result
+        return calculation
+
+    def create_calculation(self, calculation_type: str, a: Any, b: Any) -> Calculation:
+        """
+        CalculationFactory.create_calculation for operands already of this
+        backend's type, made under the backend's rules (e.g. the decimal
+        precision, which is part of result cache and intern keys).
+        """
+        return CalculationFactory.create_calculation(calculation_type, a, b)
+
+    def create(self, calculation_type: str, a: Any, b: Any) -> Calculation:
+        """
+        Creates and computes one calculation with this backend, converting the
+        operands first: a per-call alternative to selecting a session backend.
+        """
+        return self.calculate(self.create_calculation(calculation_type, self.convert(a), self.convert(b)))
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}()"
+
+
+class ExactIntBackend(NumericBackend):
+    """
+    Exact integers. Integral operands stay integers (of any size), so addition,
+    subtraction, multiplication and modulo run on the native fast path; the
+    other operands are parsed as fractions. Division and negative powers, which
+    integers would only give as a float, are computed on rationals, and an
+    integral rational result is returned as an integer. Only results that are
+    irrational (such as 2 ^ 0.5) stay floats.
+
+    Exponents above MAX_EXPONENT and results with more digits than Python
+    converts to text are reported as OverflowError.
+
+    """
+
+    name = 'int'
+
+    def parse(self, text: str) -> Any:
+        try:
+            return _Integer(int(text))
+        except ValueError:
+            return _integral(_Rational(Fraction(text)))
+
+    def convert(self, value: Any) -> Any:
+        if isinstance(value, str):
+            return self.parse(value)
+        if isinstance(value, _INTEGERS):
+            return _Integer(value)
+        return _integral(_Rational(Fraction(value)))
+
+    def calculate(self, calculation: Calculation) -> Calculation:
+        a, b = calculation.a, calculation.b
+        if isinstance(calculation, PowerCalculation):
+            if abs(b) > MAX_EXPONENT:
+                raise OverflowError(f"Exponent too large for exact numbers (the limit is {MAX_EXPONENT}).")
+            exact = b < 0
+        else:
+            exact = isinstance(calculation, DivideCalculation)
+        if exact:
+            result = type(calculation)(_Rational(a), _Rational(b)).result
+            if not isinstance(result, _RATIONALS):
+                return calculation  # Irrational; the float is as good as it gets.
+        else:
+            result = calculation.result
+            if not isinstance(result, _RATIONALS) or result.denominator != 1:
+                # The fast path: integers in, an integer out (or a fraction or irrational float).
+                _check_digits(result)
+                return calculation
+        result = _integral(result)
+        _check_digits(result)
+        return type(calculation).from_result(a, b, result)
+
+
+class FractionBackend(NumericBackend):
+    """Exact rationals (fractions.Fraction, or gmpy2.mpq when available) for every operand and result."""
+
+    name = 'fraction'
+
+    def parse(self, text: str) -> Any:
+        return _Rational(Fraction(text))
+
+    def convert(self, value: Any) -> Any:
+        return _Rational(Fraction(value))
+
+
+class DecimalBackend(NumericBackend):
+    """
+    decimal.Decimal operands, computed with `precision` significant digits
+    (28 by default). Decimal errors are reported like the float ones: an
+    invalid operation (such as a negative number to a fractional power) as
+    ValueError and an exponent out of range as OverflowError.
+
+    """
+
+    name = 'decimal'
+
+    def __init__(self, precision: int = 28) -> None:
+        if precision < 1:
+            raise ValueError("Decimal precision must be at least 1.")
+        self.precision = precision
+        self._context = decimal.Context(prec=precision)
+
+    def parse(self, text: str) -> Any:
+        try:
+            return decimal.Decimal(text)
+        except decimal.InvalidOperation:
+            raise ValueError(f"Invalid decimal number: '{text}'.") from None
+
+    def convert(self, value: Any) -> Any:
+        return self.parse(value) if isinstance(value, str) else decimal.Decimal(value)
+
+    def create_calculation(self, calculation_type: str, a: Any, b: Any) -> Calculation:
+        with decimal.localcontext(self._context):
+            return CalculationFactory.create_calculation(calculation_type, a, b)
+
+    def calculate(self, calculation: Calculation) -> Calculation:
+        try:
+            with decimal.localcontext(self._context):
+                calculation.result
+        except decimal.Overflow:
+            raise OverflowError("Numerical result out of range") from None
+        except decimal.InvalidOperation:
+            raise ValueError(f"Invalid operation for decimal numbers: {calculation!r}.") from None
+        return calculation
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(precision={self.precision})"
+
+
+def _check_digits(value: Any) -> None:
+    # Python refuses to convert integers of more than sys.get_int_max_str_digits() digits
+    # to text, so such a result could not even be shown.
+    limit = sys.get_int_max_str_digits()
+    if limit and isinstance(value, (*_INTEGERS, *_RATIONALS)):
+        if max(value.numerator.bit_length(), value.denominator.bit_length()) > limit / math.log10(2):
+            raise OverflowError(f"Exact result has more than {limit} digits.")
+
+
+def _integral(value: Any) -> Any:
+    # A rational with denominator 1 is returned as an integer.
+    return _Integer(value.numerator) if value.denominator == 1 else value
+
+
+# The backends by name, in the order they are listed to users.
+BACKENDS: Dict[str, type] = {
+    backend.name: backend for backend in (NumericBackend, ExactIntBackend, DecimalBackend, FractionBackend)
+}
+
+
+def get_backend(name: str, precision: Optional[int] = None) -> NumericBackend:
+    """
+    Returns a backend by name ('float', 'int', 'decimal' or 'fraction').
+    `precision` is only accepted by 'decimal'.
+    """
+    backend_class = BACKENDS.get(name.lower())
+    if backend_class is None:
+        raise ValueError(f"Unknown numeric backend: '{name}'. Available backends: {', '.join(BACKENDS)}")
+    if precision is not None:
+        if backend_class is not DecimalBackend:
+            raise ValueError(f"The '{backend_class.name}' backend does not take a precision.")
+        return DecimalBackend(precision)
+    return backend_class()
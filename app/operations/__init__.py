@@ -1,3 +1,123 @@
+import math
+import operator
+from array import array
+from functools import partial
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+from app.kernels import KernelDispatcher, kernel_profile_path
+
+# NumPy is optional. When it is installed and the caller hands us NumPy arrays we
+# let NumPy run the whole loop in C; otherwise we fall back to the array module.
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+# A batch result is a pair: the result buffer and a per-element error mask
+# (1 where the element could not be computed, e.g. division by zero).
+BatchResult = Tuple[Any, Any]
+
+
+def _check_lengths(a: Sequence[float], b: Sequence[float]) -> None:
+    if len(a) != len(b):
+        raise ValueError("Operand sequences must have the same length.")
+
+
+def _is_numpy(a: Any, b: Any) -> bool:
+    return numpy is not None and (isinstance(a, numpy.ndarray) or isinstance(b, numpy.ndarray))
+
+
+def _batch(func: Callable[[float, float], float], a: Sequence[float], b: Sequence[float]) -> BatchResult:
+    # map() over an operator function keeps the whole loop inside the interpreter's C code.
+    _check_lengths(a, b)
+    try:
+        results = array('d', map(func, a, b))
+    except ArithmeticError:
+        # An element failed (a zero divisor, an int too large for a float such as
+        # 10**400): redo the batch element by element so that only those elements are flagged.
+        return _batch_guarded(func, a, b)
+    return results, array('B', bytes(len(results)))
+
+
+def _batch_scalar(func: Callable[[float, float], float], a: Sequence[float], b: Sequence[float]) -> BatchResult:
+    # One call of the scalar operation per element, collected in lists and copied
+    # into the result buffers at the end. The scalar operations report a zero
+    # divisor as ValueError, which is flagged like the arithmetic errors.
+    _check_lengths(a, b)
+    results = []
+    errors = []
+    for x, y in zip(a, b):
+        try:
+            results.append(float(func(x, y)))
+        except (ArithmeticError, ValueError):
+            results.append(math.nan)
+            errors.append(1)
+        else:
+            errors.append(0)
+    return array('d', results), array('B', errors)
+
+
+def _batch_guarded(func: Callable[[float, float], float], a: Sequence[float], b: Sequence[float]) -> BatchResult:
+    # Elements that fail are set to NaN and flagged in the mask instead of raising partway through.
+    _check_lengths(a, b)
+    results = array('d')
+    errors = array('B')
+    append_result, append_error = results.append, errors.append
+    for x, y in zip(a, b):
+        try:
+            append_result(func(x, y))
+        except ArithmeticError:
+            append_result(math.nan)
+            append_error(1)
+        else:
+            append_error(0)
+    return results, errors
+
+
+def _batch_numpy(ufunc: Any, func: Callable[[float, float], float], a: Any, b: Any,
+                 zero_guard: bool, flag_overflow: bool) -> BatchResult:
+    # The mask matches the array path: a zero divisor is flagged when `zero_guard`
+    # is set, and a non-finite result of finite operands (overflow, 0 ** -1,
+    # (-8) ** 0.5) only when `flag_overflow` is, i.e. for operations whose scalar
+    # version raises instead of returning inf.
+    try:
+        x = numpy.asarray(a, dtype=numpy.float64)
+        y = numpy.asarray(b, dtype=numpy.float64)
+    except OverflowError:
+        # An int operand too large for a float64: take the element-by-element path.
+        results, errors = _batch_guarded(func, _as_list(a), _as_list(b))
+        return numpy.asarray(results), numpy.asarray(errors)
+    _check_lengths(x, y)
+    with numpy.errstate(all='ignore'):
+        results = ufunc(x, y)
+    errors = numpy.zeros(results.shape, dtype=bool)
+    if flag_overflow:
+        errors |= ~numpy.isfinite(results) & numpy.isfinite(x) & numpy.isfinite(y)
+    if zero_guard:
+        errors |= y == 0
+    results[errors] = numpy.nan
+    return results, errors.astype(numpy.uint8)
+
+
+def _batch_numpy_buffer(ufunc: Any, func: Callable[[float, float], float], zero_guard: bool, flag_overflow: bool,
+                        a: Sequence[float], b: Sequence[float]) -> BatchResult:
+    # float64 buffers (array('d'), memoryview) are viewed by NumPy without copying,
+    # and the results are copied back into array-module buffers like the other kernels return.
+    results, errors = _batch_numpy(ufunc, func, numpy.frombuffer(a), numpy.frombuffer(b), zero_guard, flag_overflow)
+    return array('d', results.tobytes()), array('B', errors.tobytes())
+
+
+def _as_list(values: Any) -> Any:
+    # NumPy scalars follow NumPy's error rules (1.0 / 0 is inf), so hand Python floats to the operator.
+    return values.tolist() if isinstance(values, numpy.ndarray) else values
+
+
+def _real_power(a: float, b: float) -> float:
+    result = a ** b
+    if isinstance(result, complex):
+        raise ArithmeticError("Power result is not a real number.")
+    return result
+
+
 class Operations:
 
     # Static methods allow us to use these methods without needing to create an instance of the class
@@ -29,4 +149,109 @@ class Operations:
     def modulo(a: float, b:float) -> float:
         if b == 0:
             raise ValueError("Division by zero is not allowed.") 
-        return a % b
+        result = a % b
+        if result and (result < 0) != (b < 0):
+            # decimal.Decimal's % keeps the sign of a; every number type follows the sign of b.
+            result += b
+        return result
+
+    # -------------------------------------------------------------------------------
+    # Batch versions
+    # -------------------------------------------------------------------------------
+    # Each batch method takes two equal-length sequences or buffers (lists,
+    # array.array, memoryview, NumPy arrays) and returns (results, errors):
+    # a float64 result buffer and a uint8 mask with 1 for every element that
+    # could not be computed. Failed elements hold NaN in the result buffer.
+    # Overflow behaves like the scalar operators: a float sum, product or
+    # quotient that overflows is inf, while a power that overflows fails.
+    #
+    # NumPy arrays are computed by NumPy and come back as NumPy arrays. Other
+    # operands go to one of the interchangeable kernels in KERNELS, which
+    # `dispatcher` picks by timing them (see app.kernels); with no dispatcher
+    # the DEFAULT_KERNELS are used.
+
+    dispatcher: Optional[KernelDispatcher] = None
+
+    @staticmethod
+    def batch_addition(a: Sequence[float], b: Sequence[float]) -> BatchResult:
+        return _run_batch('addition', a, b)
+
+    @staticmethod
+    def batch_subtraction(a: Sequence[float], b: Sequence[float]) -> BatchResult:
+        return _run_batch('subtraction', a, b)
+
+    @staticmethod
+    def batch_multiplication(a: Sequence[float], b: Sequence[float]) -> BatchResult:
+        return _run_batch('multiplication', a, b)
+
+    @staticmethod
+    def batch_division(a: Sequence[float], b: Sequence[float]) -> BatchResult:
+        return _run_batch('division', a, b)
+
+    @staticmethod
+    def batch_power(a: Sequence[float], b: Sequence[float]) -> BatchResult:
+        # Power can overflow, divide by zero (0 ** -1) or go complex ((-8) ** 0.5),
+        # so it is guarded like division.
+        return _run_batch('power', a, b)
+
+    @staticmethod
+    def batch_modulo(a: Sequence[float], b: Sequence[float]) -> BatchResult:
+        return _run_batch('modulo', a, b)
+
+
+# -----------------------------------------------------------------------------------
+# Batch kernels
+# -----------------------------------------------------------------------------------
+# Every batch operation has several kernels that return the same results and
+# error mask; which one is fastest depends on the input size and type:
+#   scalar   - calls the scalar operation for each element (pure Python)
+#   operator - maps the operator-module function over the operands in C and
+#              redoes the batch element by element only if an element fails
+#   array    - a Python loop appending to array-module buffers, each element guarded
+#   numpy    - NumPy on float64 buffers (when NumPy is installed)
+#
+# Per operation: the scalar operation, the operator-module function, and the
+# NumPy ufunc name with its `zero_guard` and `flag_overflow` settings (see _batch_numpy).
+_BATCH_SPECS: Dict[str, Tuple[Callable[[float, float], float], Callable[[float, float], float], str, bool, bool]] = {
+    'addition': (Operations.addition, operator.add, 'add', False, False),
+    'subtraction': (Operations.subtraction, operator.sub, 'subtract', False, False),
+    'multiplication': (Operations.multiplication, operator.mul, 'multiply', False, False),
+    'division': (Operations.division, operator.truediv, 'true_divide', True, False),
+    'power': (_real_power, _real_power, 'power', False, True),
+    'modulo': (Operations.modulo, operator.mod, 'mod', True, False),
+}
+
+KERNELS: Dict[str, Dict[str, Callable[[Sequence[float], Sequence[float]], BatchResult]]] = {
+    name: {
+        'scalar': partial(_batch_scalar, scalar),
+        'operator': partial(_batch, function),
+        'array': partial(_batch_guarded, function),
+    }
+    for name, (scalar, function, _, _, _) in _BATCH_SPECS.items()
+}
+if numpy is not None:  # pragma: no branch
+    for name, (_, function, ufunc, zero_guard, flag_overflow) in _BATCH_SPECS.items():
+        KERNELS[name]['numpy'] = partial(_batch_numpy_buffer, getattr(numpy, ufunc), function, zero_guard, flag_overflow)
+
+# NumPy converts its operands to float64 first, which is exact only for operands
+# that already are float64, so the dispatcher only uses it on float64 buffers.
+BUFFER_ONLY_KERNELS = ('numpy',)
+# The kernels used without a dispatcher.
+DEFAULT_KERNELS = {'addition': 'operator', 'subtraction': 'operator', 'multiplication': 'operator',
+                   'division': 'array', 'power': 'array', 'modulo': 'array'}
+
+# Kernels are timed on first use for each operation, input type and size, and the
+# choices are kept in a per-user profile file; set Operations.dispatcher to None
+# to always use the DEFAULT_KERNELS.
+Operations.dispatcher = KernelDispatcher(KERNELS, kernel_profile_path(), buffer_only=BUFFER_ONLY_KERNELS)
+
+
+def _run_batch(name: str, a: Sequence[float], b: Sequence[float]) -> BatchResult:
+    if _is_numpy(a, b):
+        _, function, ufunc, zero_guard, flag_overflow = _BATCH_SPECS[name]
+        return _batch_numpy(getattr(numpy, ufunc), function, a, b,
+                            zero_guard, flag_overflow)
+    dispatcher = Operations.dispatcher
+    if dispatcher is None:
+        return KERNELS[name][DEFAULT_KERNELS[name]](a, b)
+    return dispatcher.run(name, a, b)
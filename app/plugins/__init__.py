@@ -0,0 +1,145 @@
+# app/plugins/__init__.py
+
+# -----------------------------------------------------------------------------------
+# Discovery of third-party Calculation types (entry points and manifests).
+# -----------------------------------------------------------------------------------
+
+
+import json
+import os
+import sys
+import warnings
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from app.calculation import CalculationFactory
+
+# Entry point group a package declares its calculations in, e.g. in pyproject.toml:
+#     [project.entry-points."calculator.calculations"]
+#     cube = "inhouse_ops.cube:CubeCalculation"
+ENTRY_POINT_GROUP = "calculator.calculations"
+# Environment variable holding manifest paths, separated like PATH.
+MANIFEST_ENV = "CALCULATOR_PLUGINS"
+
+
+def iter_entry_points(group: str = ENTRY_POINT_GROUP, path: Optional[Iterable[str]] = None) -> Iterator[Tuple[str, str]]:
+    """
+    Yields (name, "module:Class") for every entry point of `group` declared by
+    the distributions installed on `path` (default: sys.path).
+
+    Only the entry_points.txt files of *.dist-info and *.egg-info directories are
+    read. importlib.metadata would find the same entries, but importing it costs
+    more than the rest of the calculator's startup together. As with
+    importlib.metadata, the first distribution on the path wins a name.
+
+    """
+    seen = set()
+    for directory in (sys.path if path is None else path):
+        try:
+            listing = sorted(os.listdir(directory or '.'))
+        except OSError:
+            continue
+        for entry in listing:
+            if not entry.endswith(('.dist-info', '.egg-info')):
+                continue
+            try:
+                with open(os.path.join(directory, entry, 'entry_points.txt'), encoding='utf-8') as file:
+                    text = file.read()
+            except OSError:
+                continue
+            for name, target in _parse_entry_points(text, group):
+                if name not in seen:
+                    seen.add(name)
+                    yield name, target
+
+
+def _parse_entry_points(text: str, group: str) -> Iterator[Tuple[str, str]]:
+    section = None
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line[0] in '#;':
+            continue
+        if line[0] == '[':
+            section = line[1:-1].strip()
+        elif section == group and '=' in line:
+            name, _, target = line.partition('=')
+            # Drop extras ("module:Class [extra]"); they do not affect the import.
+            yield name.strip(), target.split('[')[0].strip()
+
+
+def read_manifest(path: str) -> Dict[str, Tuple[str, List[str]]]:
+    """
+    Reads a registry manifest: a JSON object whose "calculations" map each
+    calculation type either to its "module:Class" target or to an object with
+    a "target" and a list of "aliases":
+
+        {"calculations": {"cube": "inhouse_ops.cube:CubeCalculation",
+                          "hypot": {"target": "inhouse_ops.geometry:Hypot", "aliases": ["hyp"]}}}
+
+    Returns {type: (target, aliases)}.
+    """
+    with open(path, encoding='utf-8') as file:
+        try:
+            data = json.load(file)
+        except json.JSONDecodeError as error:
+            raise ValueError(f"Invalid plugin manifest '{path}': {error}.") from None
+    calculations = data.get("calculations") if isinstance(data, dict) else None
+    if not isinstance(calculations, dict):
+        raise ValueError(f"Invalid plugin manifest '{path}': expected a \"calculations\" object.")
+    declared = {}
+    for name, spec in calculations.items():
+        if isinstance(spec, str):
+            declared[name] = (spec, [])
+        elif isinstance(spec, dict) and isinstance(spec.get("target"), str) and _is_name_list(spec.get("aliases", [])):
+            declared[name] = (spec["target"], list(spec.get("aliases", [])))
+        else:
+            raise ValueError(f"Invalid plugin manifest '{path}': bad entry for '{name}'.")
+    return declared
+
+
+def _is_name_list(value) -> bool:
+    # A bare string is rejected too: list("hyp") would make three one-letter aliases.
+    return isinstance(value, list) and all(isinstance(item, str) for item in value)
+
+
+def load_plugins(manifests: Optional[Iterable[str]] = None, entry_points: bool = True) -> List[str]:
+    """
+    Declares every plugin calculation to CalculationFactory without importing
+    any of them: the entry points of installed packages (unless `entry_points`
+    is false), then the given manifests, or those listed in $CALCULATOR_PLUGINS
+    when `manifests` is None. Types that are already known are skipped, so
+    calling this again is harmless. An alias that is already taken is dropped,
+    and an entry that cannot be declared (such as a malformed target) is
+    skipped, each with a RuntimeWarning; the other plugins are still declared.
+    A manifest that cannot be read at all raises OSError or ValueError.
+
+    Returns the calculation types that were declared.
+    """
+    if manifests is None:
+        manifests = [path for path in os.environ.get(MANIFEST_ENV, '').split(os.pathsep) if path]
+    declared = []
+    if entry_points:
+        for name, target in iter_entry_points():
+            if _declare(name, target, ()):
+                declared.append(name)
+    for manifest in manifests:
+        for name, (target, aliases) in read_manifest(manifest).items():
+            if _declare(name, target, aliases):
+                declared.append(name)
+    return declared
+
+
+def _declare(name: str, target: str, aliases: Iterable[str]) -> bool:
+    if CalculationFactory.is_registered(name):
+        return False
+    free = []
+    for alias in aliases:
+        if CalculationFactory.is_registered(alias) or alias.lower() in (name.lower(), *free):
+            warnings.warn(f"Plugin alias '{alias}' for '{name}' is already registered; ignoring it.",
+                          RuntimeWarning, stacklevel=3)
+        else:
+            free.append(alias.lower())
+    try:
+        CalculationFactory.register_lazy(name, target, free)
+    except ValueError as error:
+        warnings.warn(f"Skipping plugin '{name}': {error}", RuntimeWarning, stacklevel=3)
+        return False
+    return True
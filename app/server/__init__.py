@@ -0,0 +1,203 @@
+# app/server/__init__.py
+
+# -----------------------------------------------------------------------------------
+# asyncio calculation server speaking a newline-delimited line protocol.
+# -----------------------------------------------------------------------------------
+
+
+import asyncio
+import os
+import socket
+import stat
+from typing import Iterable, List, Optional
+from app.batch import Session, format_error
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8601
+
+# Replies are queued on the transport and only awaited (drained) once this many
+# bytes are waiting, so pipelined requests are answered without a round trip each.
+WRITE_HIGH_WATER = 64 * 1024
+
+# Longest request line accepted; longer lines are skipped and answered with an error.
+LINE_LIMIT = 64 * 1024
+
+# -----------------------------------------------------------------------------------
+# Protocol
+# -----------------------------------------------------------------------------------
+#
+# Each request is one line in the calculator grammar (`add 1 2`, `(1 + 2) * 3`,
+# `history`, `help`) and gets exactly one reply line: a result or a structured
+# `error: <kind>: <message>` line (see app.batch); a line over LINE_LIMIT bytes is
+# answered with a `line_too_long` error. Blank lines and `#` comments get no reply.
+# `exit` closes the connection. Every connection has its own Session and therefore
+# its own history.
+
+_LINE_TOO_LONG = f"{format_error('line_too_long', f'Lines are limited to {LINE_LIMIT} bytes.')}\n".encode("utf-8")
+
+
+async def handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """Serves one client connection until it sends 'exit' or disconnects."""
+    session = Session()
+    evaluate = session.evaluate
+    transport = writer.transport
+    try:
+        while True:
+            try:
+                line = await reader.readuntil(b"\n")
+            except asyncio.IncompleteReadError as error:
+                line = error.partial  # The last line may lack its newline; empty at EOF.
+            except asyncio.LimitOverrunError:
+                await skip_line(reader)
+                writer.write(_LINE_TOO_LONG)
+                continue
+            if not line:
+                break
+            command = line.decode("utf-8", errors="replace").strip()
+            if command.lower() == "exit":
+                break
+            response = evaluate(command)
+            if response is None:
+                continue
+            writer.write(response.encode("utf-8") + b"\n")
+            if transport.get_write_buffer_size() > WRITE_HIGH_WATER:
+                await writer.drain()
+        await writer.drain()
+    except ConnectionError:  # pragma: no cover
+        pass  # The client went away; nothing left to answer.
+    finally:
+        writer.close()
+
+
+async def skip_line(reader: asyncio.StreamReader) -> None:
+    """Discards the rest of the current line, a buffer at a time rather than all at once."""
+    while True:
+        try:
+            await reader.readuntil(b"\n")
+            return
+        except asyncio.LimitOverrunError as error:
+            await reader.readexactly(error.consumed)
+        except asyncio.IncompleteReadError:
+            return  # The connection ended mid-line.
+
+
+async def start_server(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> asyncio.AbstractServer:
+    """Starts listening and returns the server; use port 0 to pick a free port."""
+    return await asyncio.start_server(handle_connection, host, port, limit=LINE_LIMIT, backlog=1024)
+
+
+async def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> None:  # pragma: no cover
+    """Runs the server until it is cancelled (e.g. with Ctrl+C)."""
+    server = await start_server(host, port)
+    async with server:
+        await server.serve_forever()
+
+
+async def start_unix_server(path: str) -> asyncio.AbstractServer:
+    """
+    Starts listening on a Unix domain socket, the transport used by the warm
+    background daemon that one-shot `python main.py add 2 3` calls hand off to.
+    A stale socket left by a previous daemon of the same user is replaced; any
+    other file at `path`, or the socket of a daemon still running, is left alone
+    and OSError is raised.
+
+    """
+    remove_stale_socket(path)
+    # Binding here (rather than passing the path to asyncio, which removes any socket
+    # already at the path) keeps sockets that are not ours to remove.
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        listener.bind(path)
+    except OSError:
+        listener.close()
+        raise
+    return await asyncio.start_unix_server(handle_connection, sock=listener, limit=LINE_LIMIT, backlog=1024)
+
+
+def remove_stale_socket(path: str) -> bool:
+    """
+    Removes `path` if it is a socket owned by the current user that no daemon
+    listens on any more. Returns whether it was removed.
+    """
+    try:
+        info = os.lstat(path)
+    except FileNotFoundError:
+        return False
+    if not stat.S_ISSOCK(info.st_mode) or info.st_uid != os.getuid():
+        return False
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(path)
+        except ConnectionRefusedError:
+            os.unlink(path)
+            return True
+    return False
+
+
+async def serve_unix(path: str) -> None:  # pragma: no cover
+    """Runs the daemon until it is cancelled, removing its socket file on the way out."""
+    server = await start_unix_server(path)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if os.path.exists(path):
+            os.unlink(path)
+
+# -----------------------------------------------------------------------------------
+# Local Test Client
+# -----------------------------------------------------------------------------------
+class CalculatorClient:
+    """
+    A small asyncio client for the line protocol, meant for local testing. Use
+    `request` for one command at a time, or `pipeline` to send many commands
+    before reading any replies.
+
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> 'CalculatorClient':
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def request(self, command: str) -> str:
+        replies = await self.pipeline([command])
+        return replies[0]
+
+    async def pipeline(self, commands: Iterable[str]) -> List[str]:
+        """
+        Sends every command, then reads one reply per command. Commands must not be
+        blank, comments or 'exit', since those get no reply.
+
+        """
+        commands = list(commands)
+        self.writer.write("".join(f"{command}\n" for command in commands).encode("utf-8"))
+        await self.writer.drain()
+        replies = []
+        for _ in commands:
+            line = await self.reader.readline()
+            if not line:
+                raise ConnectionError("Server closed the connection.")
+            replies.append(line.decode("utf-8").rstrip("\n"))
+        return replies
+
+    async def close(self) -> None:
+        self.writer.write(b"exit\n")
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+def run_client(commands: Iterable[str], host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+               timeout: Optional[float] = 10.0) -> List[str]:
+    """Synchronous helper: connects, pipelines `commands` and returns the replies."""
+    async def main() -> List[str]:
+        client = await CalculatorClient.connect(host, port)
+        try:
+            return await asyncio.wait_for(client.pipeline(commands), timeout)
+        finally:
+            await client.close()
+    return asyncio.run(main())
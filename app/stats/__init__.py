@@ -0,0 +1,167 @@
+# app/stats/__init__.py
+
+# -----------------------------------------------------------------------------------
+# Low-overhead counters and latency histograms for the calculation path.
+# -----------------------------------------------------------------------------------
+
+
+import math
+from typing import Dict, List
+
+# Every power-of-two range of latencies is split into 2 ** SUB_BUCKET_BITS linear
+# sub-buckets (HDR-histogram style), so any recorded value is reported within
+# about 1 / 2 ** SUB_BUCKET_BITS (~6%) of its true value.
+SUB_BUCKET_BITS = 4
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+# Values below this are stored exactly, one bucket per value.
+_LINEAR_LIMIT = SUB_BUCKETS * 2
+# Enough buckets for any latency below 2 ** 64 ns.
+_BUCKET_COUNT = (65 - SUB_BUCKET_BITS) * SUB_BUCKETS
+
+
+def bucket_index(value: int) -> int:
+    """Maps a non-negative integer (nanoseconds) to its histogram bucket."""
+    if value < _LINEAR_LIMIT:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS - 1
+    return shift * SUB_BUCKETS + (value >> shift)
+
+
+def bucket_value(index: int) -> int:
+    """Returns the highest value that falls into bucket `index`."""
+    if index < _LINEAR_LIMIT:
+        return index
+    shift = index // SUB_BUCKETS - 1
+    mantissa = index - shift * SUB_BUCKETS
+    return ((mantissa + 1) << shift) - 1
+
+
+# -----------------------------------------------------------------------------------
+# LatencyHistogram
+# -----------------------------------------------------------------------------------
+class LatencyHistogram:
+    """
+    A fixed-size, log-linear latency histogram. Recording is one bucket
+    calculation and one list increment; percentiles are read by walking the
+    buckets, so they cost nothing until someone asks for them.
+
+    """
+
+    __slots__ = ('counts', 'total', 'max')
+
+    def __init__(self) -> None:
+        self.counts: List[int] = [0] * _BUCKET_COUNT
+        self.total = 0
+        self.max = 0
+
+    def record(self, value: int) -> None:
+        self.counts[bucket_index(value)] += 1
+        self.total += 1
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, pct: float) -> int:
+        """Returns the value at percentile `pct` (0-100), or 0 when nothing was recorded."""
+        if not self.total:
+            return 0
+        target = max(1, math.ceil(self.total * pct / 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(bucket_value(index), self.max)
+        return self.max  # pragma: no cover
+
+
+# -----------------------------------------------------------------------------------
+# OperationStats and StatsRegistry
+# -----------------------------------------------------------------------------------
+class OperationStats:
+    """Counts, error counts by kind and the latency histogram for one operation."""
+
+    __slots__ = ('count', 'errors', 'latency')
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.errors: Dict[str, int] = {}
+        self.latency = LatencyHistogram()
+
+    def snapshot(self) -> Dict[str, object]:
+        return {
+            "count": self.count,
+            "errors": dict(self.errors),
+            "p50_ns": self.latency.percentile(50),
+            "p99_ns": self.latency.percentile(99),
+            "p999_ns": self.latency.percentile(99.9),
+            "max_ns": self.latency.max,
+        }
+
+
+class StatsRegistry:
+    """
+    Collects per-operation statistics. Collection is off by default; every
+    instrumented call site checks the plain `enabled` attribute first, so when
+    disabled the overhead is a single attribute lookup.
+
+    Error kinds used by the calculator are 'zero_division', 'overflow',
+    'unsupported_type' and 'parse_failure'.
+
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self._operations: Dict[str, OperationStats] = {}
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        self._operations = {}
+
+    def _stats_for(self, operation: str) -> OperationStats:
+        stats = self._operations.get(operation)
+        if stats is None:
+            stats = self._operations[operation] = OperationStats()
+        return stats
+
+    def record(self, operation: str, latency_ns: int) -> None:
+        """Records one successful call of `operation` that took `latency_ns`."""
+        stats = self._stats_for(operation)
+        stats.count += 1
+        stats.latency.record(latency_ns)
+
+    def record_error(self, operation: str, kind: str) -> None:
+        """Records one failed call of `operation` with error `kind`."""
+        errors = self._stats_for(operation).errors
+        errors[kind] = errors.get(kind, 0) + 1
+
+    def snapshot(self) -> Dict[str, Dict[str, object]]:
+        """Returns the statistics of every operation seen so far, as plain data."""
+        return {operation: stats.snapshot() for operation, stats in sorted(self._operations.items())}
+
+    def format(self) -> str:
+        """Formats the statistics as a table for the REPL."""
+        if not self._operations:
+            return "No statistics collected yet."
+        lines = [f"{'operation':<12}{'count':>8}{'p50':>12}{'p99':>12}{'p999':>12}  errors"]
+        for operation, data in self.snapshot().items():
+            errors = ", ".join(f"{kind}={count}" for kind, count in sorted(data["errors"].items())) or "-"
+            lines.append(f"{operation:<12}{data['count']:>8}{_format_ns(data['p50_ns']):>12}"
+                         f"{_format_ns(data['p99_ns']):>12}{_format_ns(data['p999_ns']):>12}  {errors}")
+        return "\n".join(lines)
+
+
+def _format_ns(value: int) -> str:
+    if value >= 1_000_000:
+        return f"{value / 1_000_000:.2f} ms"
+    if value >= 1_000:
+        return f"{value / 1_000:.2f} us"
+    return f"{value} ns"
+
+
+# The process-wide registry used by the calculator. Turn it on with STATS.enable()
+# (or the REPL's 'stats on') and read it with STATS.snapshot().
+STATS = StatsRegistry()
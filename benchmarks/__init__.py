@@ -0,0 +1,115 @@
+# benchmarks/__init__.py
+
+# -----------------------------------------------------------------------------------
+# Shared helpers for the benchmark suites: timing statistics, JSON reports and
+# regression comparison against a saved baseline.
+# -----------------------------------------------------------------------------------
+
+
+import json
+import math
+import platform
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Sequence
+
+
+def summarize(samples_ns: Sequence[float]) -> Dict[str, float]:
+    """Summarizes per-call timings (in nanoseconds) into the statistics we report."""
+    ordered = sorted(samples_ns)
+    return {
+        "samples": len(ordered),
+        "min_ns": ordered[0],
+        "median_ns": statistics.median(ordered),
+        "mean_ns": statistics.fmean(ordered),
+        "stdev_ns": statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+        "p95_ns": percentile(ordered, 95),
+        "p99_ns": percentile(ordered, 99),
+        "max_ns": ordered[-1],
+    }
+
+
+def percentile(ordered: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence."""
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def time_per_call(func: Callable[[], object], number: int, repeat: int) -> List[float]:
+    """
+    Runs `func` `number` times per sample, `repeat` samples in total, and returns
+    the average nanoseconds per call of each sample.
+    """
+    samples = []
+    perf_counter_ns = time.perf_counter_ns
+    for _ in range(repeat):
+        start = perf_counter_ns()
+        for _ in range(number):
+            func()
+        samples.append((perf_counter_ns() - start) / number)
+    return samples
+
+
+def build_report(suite: str, results: Dict[str, Dict[str, float]]) -> Dict[str, object]:
+    """Wraps benchmark results with enough environment data to compare runs sensibly."""
+    return {
+        "suite": suite,
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "timestamp": time.time(),
+        "results": results,
+    }
+
+
+def write_report(report: Dict[str, object], path: str) -> None:
+    with open(path, "w") as out:
+        json.dump(report, out, indent=2, sort_keys=True)
+        out.write("\n")
+
+
+def load_report(path: str) -> Dict[str, object]:
+    with open(path) as stream:
+        return json.load(stream)
+
+
+def compare(baseline: Dict[str, object], current: Dict[str, object], threshold: float = 0.10,
+            metric: str = "median_ns") -> List[Dict[str, object]]:
+    """
+    Compares two reports benchmark by benchmark and returns one row per benchmark
+    present in both. A row is flagged as a regression when `metric` got slower by
+    more than `threshold` (a fraction, 0.10 == 10%).
+    """
+    rows = []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        change = (result[metric] - base[metric]) / base[metric] if base[metric] else 0.0
+        rows.append({
+            "name": name,
+            "baseline": base[metric],
+            "current": result[metric],
+            "change": change,
+            "regression": change > threshold,
+        })
+    return rows
+
+
+def print_results(results: Dict[str, Dict[str, float]], metric: str = "median_ns") -> None:
+    width = max((len(name) for name in results), default=0)
+    for name, result in results.items():
+        print(f"{name:<{width}}  {result[metric]:>12.1f} ns  (p95 {result['p95_ns']:.1f} ns)")
+
+
+def print_comparison(rows: List[Dict[str, object]]) -> int:
+    """Prints a comparison table and returns the number of regressions."""
+    width = max((len(row["name"]) for row in rows), default=0)
+    regressions = 0
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else ""
+        regressions += row["regression"]
+        print(f"{row['name']:<{width}}  {row['baseline']:>12.1f} -> {row['current']:>12.1f} ns"
+              f"  {row['change']:+7.1%}  {flag}")
+    return regressions
@@ -0,0 +1,128 @@
+# benchmarks/micro.py
+
+# -----------------------------------------------------------------------------------
+# Micro-benchmarks for the calculator hot paths.
+#
+# Usage:
+#     python -m benchmarks.micro                                  # print results
+#     python -m benchmarks.micro --output baseline.json           # save a baseline
+#     python -m benchmarks.micro --compare baseline.json          # flag regressions
+#     python -m benchmarks.micro --filter factory --quick         # a quick subset
+#
+# --compare exits with status 1 when any benchmark's --metric (median by default)
+# got slower than the baseline by more than --threshold (10% by default).
+# -----------------------------------------------------------------------------------
+
+
+import argparse
+import contextlib
+import io
+import sys
+from typing import Callable, Dict, List, Tuple
+
+from app.operations import Operations
+from app.calculation import CalculationFactory
+from app.calculator import display_history
+from app.history import CalculationHistory
+from benchmarks import (
+    build_report,
+    compare,
+    load_report,
+    print_comparison,
+    print_results,
+    summarize,
+    time_per_call,
+    write_report,
+)
+
+CALCULATION_TYPES = ['add', 'subtract', 'multiply', 'divide', 'power', 'modulo']
+OPERATIONS = ['addition', 'subtraction', 'multiplication', 'division', 'power', 'modulo']
+HISTORY_SIZES = [10, 100, 1000]
+
+
+def _create_miss() -> None:
+    try:
+        CalculationFactory.create_calculation('floor', 7.0, 3.0)
+    except ValueError:
+        pass
+
+
+def _history(size: int) -> CalculationHistory:
+    history = CalculationHistory()
+    for i in range(size):
+        calculation_type = CALCULATION_TYPES[i % len(CALCULATION_TYPES)]
+        history.append(CalculationFactory.create_calculation(calculation_type, float(i + 2), 3.0))
+    return history
+
+
+def _display_history(history: CalculationHistory) -> Callable[[], None]:
+    def run() -> None:
+        with contextlib.redirect_stdout(io.StringIO()):
+            display_history(history)
+    return run
+
+
+def benchmarks() -> List[Tuple[str, Callable[[], object], int]]:
+    """
+    Returns (name, callable, calls per sample) for every benchmark. Calls per
+    sample are scaled so each sample takes a comparable amount of time.
+    """
+    cases = []
+    for name in OPERATIONS:
+        method = getattr(Operations, name)
+        cases.append((f"operations.{name}", lambda method=method: method(7.0, 3.0), 20000))
+
+    cases.append(("factory.create_calculation.hit",
+                  lambda: CalculationFactory.create_calculation('multiply', 7.0, 3.0), 10000))
+    cases.append(("factory.create_calculation.miss", _create_miss, 2000))
+
+    for calculation_type in CALCULATION_TYPES:
+        calculation = CalculationFactory.create_calculation(calculation_type, 7.0, 3.0)
+        cases.append((f"calculation.{calculation_type}.execute", calculation.execute, 20000))
+
+    calculation = CalculationFactory.create_calculation('divide', 7.0, 3.0)
+    cases.append(("calculation.__str__", calculation.__str__, 10000))
+    cases.append(("calculation.__repr__", calculation.__repr__, 10000))
+
+    for size in HISTORY_SIZES:
+        cases.append((f"display_history.{size}", _display_history(_history(size)), max(1, 5000 // size)))
+    return cases
+
+
+def run(filter_text: str = "", repeat: int = 15, scale: float = 1.0) -> Dict[str, Dict[str, float]]:
+    """Runs every benchmark whose name contains `filter_text` and returns its statistics."""
+    results = {}
+    for name, func, number in benchmarks():
+        if filter_text not in name:
+            continue
+        func()  # Warm up caches before timing.
+        results[name] = summarize(time_per_call(func, max(1, int(number * scale)), repeat))
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for Operations, CalculationFactory and Calculation.")
+    parser.add_argument("--output", metavar="FILE", help="write results as JSON to FILE")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare against a saved JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="slowdown (fraction of the baseline median) flagged as a regression")
+    parser.add_argument("--metric", default="median_ns", choices=["median_ns", "min_ns", "mean_ns", "p95_ns"],
+                        help="statistic compared against the baseline")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=15, help="samples per benchmark")
+    parser.add_argument("--quick", action="store_true", help="run 10x fewer calls per sample")
+    args = parser.parse_args(argv)
+
+    results = run(args.filter, args.repeat, 0.1 if args.quick else 1.0)
+    report = build_report("micro", results)
+    if args.output:
+        write_report(report, args.output)
+    if args.compare:
+        regressions = print_comparison(compare(load_report(args.compare), report, args.threshold, args.metric))
+        return 1 if regressions else 0
+    print_results(results, args.metric)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
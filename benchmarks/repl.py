@@ -0,0 +1,151 @@
+# benchmarks/repl.py
+
+# -----------------------------------------------------------------------------------
+# End-to-end REPL throughput benchmark.
+#
+# Drives the real app.calculator.calculator() loop with a synthetic command stream,
+# with `input` and `sys.stdout` swapped for fast in-memory stand-ins, and reports
+# commands per second plus the latency distribution of each command type.
+#
+# Usage:
+#     python -m benchmarks.repl                                   # 100k commands
+#     python -m benchmarks.repl --commands 20000 --seed 7
+#     python -m benchmarks.repl --output repl.json
+#     python -m benchmarks.repl --compare repl.json               # flag regressions
+# -----------------------------------------------------------------------------------
+
+
+import argparse
+import builtins
+import random
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from app.calculator import calculator
+from benchmarks import (
+    build_report,
+    compare,
+    load_report,
+    print_comparison,
+    print_results,
+    summarize,
+    write_report,
+)
+
+# Relative weight of every command type in the synthetic stream. 'history' prints the
+# whole history so far, so it is kept rare to stop the run from going quadratic.
+DEFAULT_MIX = {
+    "valid": 70,
+    "expression": 10,
+    "invalid_input": 6,
+    "unsupported": 6,
+    "division_by_zero": 6,
+    "help": 1.99,
+    "history": 0.01,
+}
+
+OPERATIONS = ['add', 'subtract', 'multiply', 'divide', 'power', 'modulo']
+
+
+def _command(kind: str, rng: random.Random) -> str:
+    a, b = rng.randint(1, 999), rng.randint(1, 9)
+    if kind == "valid":
+        return f"{rng.choice(OPERATIONS)} {a} {b}"
+    if kind == "expression":
+        return f"({a} + {b}) * {b} ^ 2 % 7"
+    if kind == "invalid_input":
+        return rng.choice(["add two three", "multiply 4", "divide 1 2 3"])
+    if kind == "unsupported":
+        return f"floor {a} {b}"
+    if kind == "division_by_zero":
+        return f"{rng.choice(['divide', 'modulo'])} {a} 0"
+    return kind  # 'help' and 'history' are commands on their own.
+
+
+def generate_stream(count: int, mix: Optional[Dict[str, float]] = None, seed: int = 1) -> List[Tuple[str, str]]:
+    """Returns `count` (command type, command line) pairs drawn from `mix`."""
+    mix = mix or DEFAULT_MIX
+    rng = random.Random(seed)
+    kinds = rng.choices(list(mix), weights=list(mix.values()), k=count)
+    return [(kind, _command(kind, rng)) for kind in kinds]
+
+
+class _NullWriter:
+    """A stdout stand-in that accepts and discards text as cheaply as possible."""
+
+    def write(self, text: str) -> int:
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+
+def run(stream: List[Tuple[str, str]]) -> Dict[str, object]:
+    """
+    Runs calculator() over `stream` and returns throughput and per-type latencies.
+    The latency of a command is the time from handing it to the REPL until the
+    REPL asks for the next line, so it covers parsing, dispatch, exception
+    handling and printing.
+    """
+    commands = [line for _, line in stream] + ["exit"]
+    stamps = []
+    stamp = stamps.append
+    perf_counter_ns = time.perf_counter_ns
+    feed = iter(commands).__next__
+
+    def fake_input(prompt: str = "") -> str:
+        stamp(perf_counter_ns())
+        return feed()
+
+    original_input, original_stdout = builtins.input, sys.stdout
+    builtins.input, sys.stdout = fake_input, _NullWriter()
+    try:
+        start = perf_counter_ns()
+        calculator()
+        elapsed_ns = perf_counter_ns() - start
+    finally:
+        builtins.input, sys.stdout = original_input, original_stdout
+
+    latencies = defaultdict(list)
+    for index, (kind, _) in enumerate(stream):
+        latencies[kind].append(stamps[index + 1] - stamps[index])
+    return {
+        "commands": len(stream),
+        "elapsed_s": elapsed_ns / 1e9,
+        "commands_per_second": len(stream) / (elapsed_ns / 1e9),
+        "results": {f"repl.{kind}": summarize(samples) for kind, samples in sorted(latencies.items())},
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="End-to-end REPL throughput benchmark.")
+    parser.add_argument("--commands", type=int, default=100000, help="number of commands in the stream")
+    parser.add_argument("--seed", type=int, default=1, help="random seed for the command stream")
+    parser.add_argument("--output", metavar="FILE", help="write results as JSON to FILE")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare against a saved JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="slowdown (fraction of the baseline median) flagged as a regression")
+    args = parser.parse_args(argv)
+
+    outcome = run(generate_stream(args.commands, seed=args.seed))
+    results = outcome["results"]
+    # Throughput is stored as ns per command so it compares like the latencies do.
+    per_command_ns = 1e9 / outcome["commands_per_second"]
+    results["repl.throughput"] = summarize([per_command_ns])
+    report = build_report("repl", results)
+    report["commands_per_second"] = outcome["commands_per_second"]
+    if args.output:
+        write_report(report, args.output)
+    print(f"{outcome['commands']} commands in {outcome['elapsed_s']:.3f} s "
+          f"({outcome['commands_per_second']:,.0f} commands/s)")
+    if args.compare:
+        regressions = print_comparison(compare(load_report(args.compare), report, args.threshold))
+        return 1 if regressions else 0
+    print_results(results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,61 @@
-# This line is importing the "calculator" function from another file.
-# Imagine that "calculator" is like a tool or recipe that we've already written somewhere else,
-# and now we are telling the computer, "Go and find that calculator tool for us."
-# The "app" part is like a folder, and inside that folder, there's another file called "calculator.py",
-# which has the tool (function) called "calculator" that we need.
-from app.calculator import calculator
+import sys
+
+
+def parse_args(argv=None):
+    # These options let the calculator run without the interactive prompt.
+    import argparse
+    parser = argparse.ArgumentParser(description="Command-line calculator.")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="evaluate commands from FILE ('-' for stdin) without prompts and print one result per line")
+    parser.add_argument("--workers", metavar="N", type=int, default=1,
+                        help="evaluate batch input in N worker processes (results keep input order)")
+    parser.add_argument("--chunk-size", metavar="LINES", type=int, default=10000,
+                        help="number of lines handed to a worker at a time (with --workers)")
+    parser.add_argument("--serve", action="store_true",
+                        help="serve the calculator over a newline-delimited TCP protocol")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (with --serve)")
+    parser.add_argument("--port", type=int, default=8601, help="port to listen on (with --serve)")
+    parser.add_argument("--daemon", action="store_true",
+                        help="run a warm background daemon on a Unix socket for one-shot calls")
+    parser.add_argument("--socket", metavar="PATH",
+                        help="Unix socket path for --daemon (default: $CALCULATOR_SOCKET or a private per-user socket)")
+    parser.add_argument("--history-file", metavar="PATH",
+                        help="keep the interactive history in a persistent log at PATH")
+    parser.add_argument("--history-limit", metavar="N", type=int,
+                        help="keep only the newest N calculations in memory and move older ones to disk")
+    parser.add_argument("--cache", metavar="SIZE", type=int,
+                        help="remember the results of up to SIZE distinct calculations (LRU)")
+    parser.add_argument("--cache-ttl", metavar="SECONDS", type=float,
+                        help="forget cached results after SECONDS (with --cache)")
+    parser.add_argument("--cache-file", metavar="PATH",
+                        help="share cached results with other calculator processes through a SQLite file")
+    parser.add_argument("--intern", metavar="SIZE", type=int,
+                        help="share one immutable calculation per distinct (operation, a, b), keeping the SIZE "
+                             "most recent ones alive")
+    parser.add_argument("--tune-kernels", action="store_true",
+                        help="time the batch kernels of every operation now, save the choices to the kernel "
+                             "profile ($CALCULATOR_KERNEL_PROFILE or a per-user cache file) and exit")
+    parser.add_argument("--plugins", metavar="MANIFEST", action="append",
+                        help="declare the calculation types listed in a JSON plugin manifest (repeatable; "
+                             "default: $CALCULATOR_PLUGINS)")
+    return parser.parse_args(argv)
+
+
+def run_batch_mode(path, workers=1, chunk_size=10000):
+    # Batch mode streams commands through a generator pipeline and writes the results through
+    # one large buffered writer instead of printing (and flushing) every line.
+    # With more than one worker, chunks of the input are evaluated in parallel processes.
+    from app.batch import run_batch, run_parallel
+    out = open(sys.stdout.fileno(), "w", buffering=1 << 16, closefd=False)
+    try:
+        stream = sys.stdin if path == "-" else open(path)
+    except OSError as error:
+        sys.exit(f"Cannot read batch file: {error}")
+    with stream:
+        if workers > 1:
+            run_parallel(stream, out, workers, chunk_size)
+        else:
+            run_batch(stream, out)
 
 # This part of the code is super important! It checks if this file is being run directly by the computer.
 # Let me explain: when we write Python programs, sometimes we want to run them directly,
@@ -11,9 +63,77 @@ from app.calculator import calculator
 # The "__name__" is a special word in Python. It tells us if we are running the program directly.
 # "__main__" is what Python calls this program when we run it directly.
 
-# So, what this line means is: "If you're running this program directly (not as part of another program), 
+# So, what this line means is: "If you're running this program directly (not as part of another program),
 # then go ahead and start the calculator."
 if __name__ == "__main__":
-    # Now, we use the calculator tool we got earlier. This will start the calculator, which is a program 
-    # that keeps running and doing math based on what we tell it.
-    calculator()
+    # A one-shot call like "python main.py add 2 3" is handed to the warm daemon (or computed
+    # in-process if none is running). It is checked first, before anything heavy is imported.
+    if len(sys.argv) > 1 and not sys.argv[1].startswith("-"):
+        from app.client import run_one_shot
+        sys.exit(run_one_shot(sys.argv[1:]))
+
+    args = parse_args()
+    if args.tune_kernels:
+        # Batch kernels are otherwise timed the first time each operation meets a new input
+        # size; tuning them all up front spares later runs (and other processes) that pause.
+        from app.operations import Operations
+        Operations.dispatcher.calibrate()
+        print(Operations.dispatcher.describe())
+        print(f"Saved to {Operations.dispatcher.path}")
+        sys.exit(0)
+    # Plugin calculation types from installed packages and manifests are declared by name
+    # only; their modules are imported the first time one of them is used.
+    from app.plugins import load_plugins
+    try:
+        load_plugins(args.plugins)
+    except (OSError, ValueError) as error:
+        sys.exit(f"Cannot load plugins: {error}")
+    if args.cache or args.cache_file:
+        # Repeated (operation, a, b) calculations are answered from memory in every mode,
+        # and with --cache-file from results earlier or concurrent processes computed.
+        from app.cache import ResultCache
+        from app.calculation import CalculationFactory
+        backing = None
+        if args.cache_file:
+            from app.disk_cache import SQLiteResultCache
+            backing = SQLiteResultCache(args.cache_file)
+        CalculationFactory.result_cache = ResultCache(args.cache or 1024, args.cache_ttl, backing=backing)
+    if args.intern:
+        # Repeated inputs reuse one frozen Calculation (and its result) instead of a new object each.
+        from app.calculation import CalculationFactory
+        from app.interning import InternTable
+        CalculationFactory.intern_table = InternTable(args.intern)
+    if args.serve or args.daemon:
+        # One long-lived asyncio process serves many concurrent clients.
+        import asyncio
+        from app.server import serve, serve_unix
+        from app.client import socket_path
+        try:
+            if args.daemon:
+                # Treat SIGTERM like Ctrl+C so the daemon removes its socket file when stopped.
+                import signal
+                signal.signal(signal.SIGTERM, signal.default_int_handler)
+                asyncio.run(serve_unix(args.socket or socket_path()))
+            else:
+                asyncio.run(serve(args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+        except OSError as error:
+            sys.exit(f"Cannot start server: {error}")
+    elif args.batch is not None:
+        run_batch_mode(args.batch, args.workers, args.chunk_size)
+    elif not sys.stdin.isatty():
+        # Commands piped in on stdin are treated as a batch too.
+        run_batch_mode("-", args.workers, args.chunk_size)
+    else:
+        # This line is importing the "calculator" function from another file.
+        # Imagine that "calculator" is like a tool or recipe that we've already written somewhere else,
+        # and now we are telling the computer, "Go and find that calculator tool for us."
+        # The "app" part is like a folder, and inside that folder, there's another file called "calculator.py",
+        # which has the tool (function) called "calculator" that we need.
+        # We only import it here, so the other modes don't pay for loading the interactive REPL.
+        from app.calculator import calculator
+
+        # Now, we use the calculator tool we got earlier. This will start the calculator, which is a program
+        # that keeps running and doing math based on what we tell it.
+        calculator(args.history_file, args.history_limit)
@@ -0,0 +1,5 @@
+""" tests/conftest.py """
+from app.operations import Operations
+
+# Tests time the batch kernels in memory; they never read or write the user's kernel profile.
+Operations.dispatcher.path = None
@@ -0,0 +1,221 @@
+""" tests/test_batch.py """
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+
+from app.batch import (
+    HELP_LINE,
+    Session,
+    cache_settings,
+    evaluate_chunk,
+    evaluate_commands,
+    init_worker,
+    iter_chunks,
+    read_commands,
+    run_batch,
+    run_parallel,
+)
+from app.cache import ResultCache
+from app.calculation import CalculationFactory
+from app.disk_cache import SQLiteResultCache
+
+
+@pytest.mark.parametrize(
+    "line, expected",
+    [
+        ("add 2 3", "5.0"),
+        ("DIVIDE 10 4", "2.5"),
+        ("(1 + 2) * 3", "9.0"),
+        ("help", HELP_LINE),
+        ("divide 1 0", "error: division_by_zero: Cannot divide by zero."),
+        ("modulo 1 0", "error: division_by_zero: Cannot divide by zero."),
+        ("power 10 400", "error: overflow: Numerical result out of range"),
+        ("floor 1 2", "error: unsupported_operation: Unsupported calculation type: 'floor'."),
+        ("add two three", "error: invalid_input: expected <operation> <num1> <num2>"),
+        ("add 1", "error: invalid_input: expected <operation> <num1> <num2>"),
+        ("1 / 0", "error: division_by_zero: Cannot divide by zero."),
+        ("10 ^ 400", "error: overflow: Numerical result out of range"),
+        ("(1 +", "error: invalid_expression: Invalid expression: unexpected end of input."),
+        ("(" * 1500 + "1" + ")" * 1500, "error: invalid_expression: Invalid expression: too deeply nested."),
+    ],
+    ids=[
+        "calculation",
+        "case_insensitive_operation",
+        "expression",
+        "help",
+        "divide_by_zero",
+        "modulo_by_zero",
+        "power_overflow",
+        "unsupported_operation",
+        "non_numeric_operands",
+        "missing_operand",
+        "expression_divide_by_zero",
+        "expression_overflow",
+        "invalid_expression",
+        "too_deeply_nested_expression",
+    ]
+)
+def test_session_evaluate(line, expected):
+    """Test that every command produces one result line and errors are structured."""
+    response = Session().evaluate(line)
+    assert response.startswith(expected)
+
+
+def test_session_survives_recursion_error():
+    """Test that a RecursionError while evaluating an expression becomes an error line and the run goes on."""
+    out = StringIO()
+    with patch('app.batch.evaluate_expression', side_effect=[RecursionError, 3.0]):
+        run_batch(StringIO("1 + 1\n1 + 2\n"), out)
+    assert out.getvalue() == "error: invalid_expression: Invalid expression: too deeply nested.\n3.0\n"
+
+
+@pytest.mark.parametrize("line", ["", "   ", "# a comment"])
+def test_session_skips_blank_lines_and_comments(line):
+    """Test that blank lines and comments produce no result line."""
+    assert Session().evaluate(line) is None
+
+
+def test_session_history():
+    """Test that successful calculations are recorded in the session's own history."""
+    # Arrange
+    session = Session()
+    assert session.evaluate("history") == "No calculations performed yet."
+
+    # Act
+    session.evaluate("add 1 2")
+    session.evaluate("divide 1 0")
+    session.evaluate("multiply 2 3")
+
+    # Assert
+    assert session.evaluate("history") == (
+        "1. AddCalculation: 1.0 Add 2.0 = 3.0; 2. MultiplyCalculation: 2.0 Multiply 3.0 = 6.0"
+    )
+
+
+def test_pipeline_stops_at_exit():
+    """Test that the generator pipeline is lazy and stops reading at 'exit'."""
+    # Arrange
+    lines = iter(["add 1 1", "", "exit", "add 2 2"])
+
+    # Act
+    responses = list(evaluate_commands(read_commands(lines), Session()))
+
+    # Assert
+    assert responses == ["2.0"]
+    assert next(lines) == "add 2 2"
+
+
+def test_run_batch_writes_one_line_per_command():
+    """Test that run_batch streams results to the writer and keeps going after errors."""
+    # Arrange
+    stream = StringIO("add 2 3\ndivide 1 0\n\n2 ^ 10\nhistory\n")
+    out = StringIO()
+
+    # Act
+    count = run_batch(stream, out)
+
+    # Assert
+    assert count == 4
+    assert out.getvalue().splitlines() == [
+        "5.0",
+        "error: division_by_zero: Cannot divide by zero.",
+        "1024.0",
+        "1. AddCalculation: 2.0 Add 3.0 = 5.0",
+    ]
+
+
+def test_run_batch_uses_given_session():
+    """Test that a caller-supplied session keeps the history of the run."""
+    session = Session()
+    run_batch(["add 1 1"], StringIO(), session)
+    assert len(session.history) == 1
+
+
+# -----------------------------------------------------------------------------------
+# Multi-process evaluation
+# -----------------------------------------------------------------------------------
+
+def test_iter_chunks():
+    """Test that lines are grouped into bounded chunks in order."""
+    assert list(iter_chunks(range(7), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert list(iter_chunks([], 3)) == []
+
+
+def test_evaluate_chunk_rejects_history():
+    """Test that a worker chunk evaluates commands but has no shared history to show."""
+    responses = evaluate_chunk(["add 1 2", "", "history", "divide 1 0"])
+    assert responses == [
+        "3.0",
+        "error: unsupported_command: history is not available with --workers",
+        "error: division_by_zero: Cannot divide by zero.",
+    ]
+
+
+@pytest.mark.parametrize("max_pending", [None, 1])
+def test_run_parallel_keeps_input_order(max_pending):
+    """Test that parallel evaluation writes the same lines, in the same order, as run_batch."""
+    # Arrange
+    commands = [f"add {i} 1" if i % 5 else f"divide {i} 0" for i in range(60)] + ["", "exit", "add 1 1"]
+    serial, parallel = StringIO(), StringIO()
+
+    # Act
+    run_batch(commands, serial)
+    count = run_parallel(commands, parallel, workers=2, chunk_size=7, max_pending=max_pending)
+
+    # Assert
+    assert count == 60
+    assert parallel.getvalue() == serial.getvalue()
+
+
+def test_run_parallel_handles_chunks_without_results():
+    """Test that chunks of only blank lines or comments write nothing."""
+    out = StringIO()
+    assert run_parallel(["# comment", "", "add 1 1"], out, workers=2, chunk_size=2) == 1
+    assert out.getvalue() == "2.0\n"
+
+
+def test_run_parallel_workers_write_to_the_cache_file(tmp_path):
+    """Test that results computed in worker processes reach a shared --cache-file."""
+    # Arrange
+    path = str(tmp_path / "results.db")
+    parent = SQLiteResultCache(path)
+    original = CalculationFactory.result_cache
+    CalculationFactory.result_cache = ResultCache(16, backing=parent)
+    try:
+        # Act
+        out = StringIO()
+        run_parallel([f"add {i} 1" for i in range(20)], out, workers=2, chunk_size=5)
+    finally:
+        CalculationFactory.result_cache = original
+        parent.close()
+
+    # Assert
+    assert out.getvalue() == "".join(f"{i + 1}.0\n" for i in range(20))
+    reader = SQLiteResultCache(path)
+    assert len(reader) == 20
+    reader.close()
+
+
+def test_init_worker_opens_its_own_cache(tmp_path):
+    """Test that a worker gets a fresh result cache with the parent's settings."""
+    original = CalculationFactory.result_cache
+    try:
+        CalculationFactory.result_cache = ResultCache(8, ttl=5.0)
+        settings = cache_settings()
+        assert settings == (8, 5.0, 5.0, None)
+
+        init_worker(settings)
+        cache = CalculationFactory.result_cache
+        assert cache is not original and (cache.maxsize, cache.ttl, cache.backing) == (8, 5.0, None)
+
+        path = str(tmp_path / "results.db")
+        init_worker((8, None, None, path))
+        backing = CalculationFactory.result_cache.backing
+        assert isinstance(backing, SQLiteResultCache) and backing.path == path
+        backing.close()
+
+        init_worker(None)
+        assert CalculationFactory.result_cache is None and cache_settings() is None
+    finally:
+        CalculationFactory.result_cache = original
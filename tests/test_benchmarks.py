@@ -0,0 +1,92 @@
+""" tests/test_benchmarks.py """
+import json
+
+import pytest
+
+from benchmarks import compare, percentile, summarize
+from benchmarks import micro
+
+
+def test_summarize_statistics():
+    """Test the statistics reported for a set of samples."""
+    stats = summarize([5.0, 1.0, 3.0, 2.0, 4.0])
+    assert stats["samples"] == 5
+    assert (stats["min_ns"], stats["median_ns"], stats["max_ns"]) == (1.0, 3.0, 5.0)
+    assert stats["mean_ns"] == 3.0
+    assert summarize([7.0])["stdev_ns"] == 0.0
+
+
+@pytest.mark.parametrize("pct, expected", [(50, 50), (95, 95), (99, 99), (100, 100), (0, 1)])
+def test_percentile_nearest_rank(pct, expected):
+    """Test nearest-rank percentiles over 1..100."""
+    assert percentile(list(range(1, 101)), pct) == expected
+
+
+def test_compare_flags_regressions():
+    """Test that only slowdowns beyond the threshold are flagged."""
+    baseline = {"results": {"a": {"median_ns": 100.0}, "b": {"median_ns": 100.0}, "gone": {"median_ns": 1.0}}}
+    current = {"results": {"a": {"median_ns": 105.0}, "b": {"median_ns": 150.0}, "new": {"median_ns": 1.0}}}
+    rows = {row["name"]: row for row in compare(baseline, current, threshold=0.10)}
+    assert set(rows) == {"a", "b"}
+    assert not rows["a"]["regression"]
+    assert rows["b"]["regression"]
+    assert rows["b"]["change"] == pytest.approx(0.5)
+
+
+def test_micro_suite_writes_and_compares(tmp_path, capsys):
+    """Test a tiny run of the micro suite end to end, including compare mode."""
+    # Arrange
+    output = tmp_path / "baseline.json"
+    argv = ["--filter", "operations.addition", "--repeat", "3", "--quick"]
+
+    # Act
+    assert micro.main(argv + ["--output", str(output)]) == 0
+    report = json.loads(output.read_text())
+    code = micro.main(argv + ["--compare", str(output), "--threshold", "1000"])
+
+    # Assert
+    assert list(report["results"]) == ["operations.addition"]
+    assert report["results"]["operations.addition"]["samples"] == 3
+    assert code == 0
+    assert "operations.addition" in capsys.readouterr().out
+
+
+def test_micro_suite_covers_every_hot_path():
+    """Test that every requested hot path has a benchmark."""
+    names = [name for name, _, _ in micro.benchmarks()]
+    assert "factory.create_calculation.hit" in names
+    assert "factory.create_calculation.miss" in names
+    assert "calculation.__str__" in names and "calculation.__repr__" in names
+    assert [name for name in names if name.startswith("display_history.")] == [
+        "display_history.10", "display_history.100", "display_history.1000"]
+    assert len([name for name in names if name.startswith("operations.")]) == 6
+
+
+def test_repl_benchmark_drives_calculator(tmp_path, capsys):
+    """Test that the REPL harness runs the real loop and restores input and stdout."""
+    # Arrange
+    import builtins
+    import sys
+    from benchmarks import repl
+    original_input, original_stdout = builtins.input, sys.stdout
+    stream = repl.generate_stream(300, mix={kind: 1 for kind in repl.DEFAULT_MIX}, seed=3)
+
+    # Act
+    outcome = repl.run(stream)
+
+    # Assert
+    assert builtins.input is original_input and sys.stdout is original_stdout
+    assert outcome["commands"] == 300
+    assert outcome["commands_per_second"] > 0
+    assert set(outcome["results"]) == {f"repl.{kind}" for kind in repl.DEFAULT_MIX}
+    assert sum(result["samples"] for result in outcome["results"].values()) == 300
+
+
+def test_repl_benchmark_main(tmp_path, capsys):
+    """Test the REPL benchmark command line, including JSON output and compare mode."""
+    from benchmarks import repl
+    output = tmp_path / "repl.json"
+    assert repl.main(["--commands", "200", "--output", str(output)]) == 0
+    assert "commands/s" in capsys.readouterr().out
+    assert repl.main(["--commands", "200", "--compare", str(output), "--threshold", "1000"]) == 0
+    assert "repl.throughput" in json.loads(output.read_text())["results"]
@@ -0,0 +1,147 @@
+""" tests/test_bounded_history.py """
+import os
+import threading
+
+import pytest
+
+from app.calculation import AddCalculation, CalculationFactory, DivideCalculation
+from app.bounded_history import BoundedHistory
+from app.history_index import HistoryIndex
+from app.history_log import HistoryLog
+
+
+def add(history, *values):
+    """Appends add(value, 1) for every value."""
+    for value in values:
+        history.append(CalculationFactory.create_calculation('add', float(value), 1.0))
+
+
+def test_bounded_history_keeps_memory_flat():
+    """Test that only `capacity` entries stay in memory while every entry stays readable."""
+    # Arrange
+    with BoundedHistory(capacity=4) as history:
+        spill_path = history.path
+
+        # Act
+        add(history, *range(10))
+
+        # Assert
+        assert len(history) == 10
+        assert history.in_memory == 4
+        assert repr(history) == "BoundedHistory(capacity=4, entries=10, in_memory=4)"
+        assert [calculation.a for calculation in history] == [float(i) for i in range(10)]
+        assert history[0].result == 1.0 and history[-1].result == 10.0
+        assert [calculation.a for calculation in history[2:7]] == [2.0, 3.0, 4.0, 5.0, 6.0]
+        assert isinstance(history[5], AddCalculation)
+        assert len(history._a) == 4  # The ring columns never grow.
+        with pytest.raises(IndexError, match="history index out of range"):
+            history[10]
+        with pytest.raises(IndexError, match="history index out of range"):
+            history[-11]
+        assert history.entry(0) == ('add', 0.0, 1.0, 1.0)  # On disk.
+        assert history.entry(-1) == ('add', 9.0, 1.0, 10.0)  # In the ring.
+        for index in (10, -11):
+            with pytest.raises(IndexError, match="history index out of range"):
+                history.entry(index)
+    # A temporary spill segment is removed on close.
+    assert not os.path.exists(spill_path)
+    assert not os.path.exists(os.path.dirname(spill_path))
+    history.close()  # Closing twice is harmless.
+
+
+def test_bounded_history_with_persistent_segment(tmp_path):
+    """Test that a persistent segment holds earlier sessions and the ring on close."""
+    # Arrange
+    path = str(tmp_path / "history.log")
+    with HistoryLog(path) as log:
+        log.append(CalculationFactory.create_calculation('divide', 8.0, 2.0))
+
+    # Act
+    with BoundedHistory(capacity=2, path=path) as history:
+        assert len(history) == 1
+        assert isinstance(history[0], DivideCalculation)
+        add(history, 1, 2, 3)
+        assert history.in_memory == 2
+
+    # Assert
+    with HistoryLog(path) as log:
+        assert [entry[:4] for entry in log.records()] == [
+            ('divide', 8.0, 2.0, 4.0), ('add', 1.0, 1.0, 2.0), ('add', 2.0, 1.0, 3.0), ('add', 3.0, 1.0, 4.0)]
+
+
+def test_bounded_history_spills_in_the_background(monkeypatch):
+    """Test that append() returns while the spill thread is still writing."""
+    # Arrange
+    history = BoundedHistory(capacity=2)
+    release = threading.Event()
+    original_append_entry = history._log.append_entry
+
+    def slow_append_entry(*entry):
+        release.wait()
+        original_append_entry(*entry)
+
+    monkeypatch.setattr(history._log, 'append_entry', slow_append_entry)
+
+    # Act: the REPL thread is not blocked by the stalled disk.
+    add(history, 1, 2, 3, 4)
+
+    # Assert
+    assert history.in_memory == 2
+    assert history[-1].a == 4.0  # Entries in the ring are readable right away.
+    release.set()
+    assert [calculation.a for calculation in history] == [1.0, 2.0, 3.0, 4.0]
+    history.close()
+
+
+def test_bounded_history_observers():
+    """Test that observers see entries from both tiers."""
+    with BoundedHistory(capacity=3) as history:
+        add(history, *range(5))
+        index = HistoryIndex(history)
+        add(history, 10)
+        assert list(index.query(op='add', last=2).positions) == [4, 5]
+        assert [calculation.a for calculation in index.query(op='add')] == [0.0, 1.0, 2.0, 3.0, 4.0, 10.0]
+
+
+def test_bounded_history_limits():
+    """Test the capacity and operation-table limits."""
+    with pytest.raises(ValueError, match="capacity must be at least 1"):
+        BoundedHistory(capacity=0)
+    with BoundedHistory(capacity=1) as history:
+        for code in range(256):
+            assert history._code_for(f"op{code}") == code
+        with pytest.raises(ValueError, match="at most 256 calculation types"):
+            history._code_for('one_too_many')
+
+
+@pytest.mark.parametrize("persistent", [False, True])
+def test_bounded_history_spill_failure(tmp_path, monkeypatch, persistent):
+    """Test that a failing disk is reported on the next append or read instead of hanging."""
+    # Arrange
+    history = BoundedHistory(capacity=2, path=str(tmp_path / "history.log") if persistent else None)
+    spill_path = history.path
+
+    release = threading.Event()
+
+    def failing_append_entry(*entry):
+        release.wait()
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(history._log, 'append_entry', failing_append_entry)
+
+    # Act: the first eviction fails in the background; the blocks queued behind it are drained, not written.
+    add(history, 1, 2, 3, 4, 5)
+    release.set()
+    history._spill_queue.join()
+
+    # Assert
+    assert history[-1].a == 5.0  # The ring is still readable.
+    with pytest.raises(RuntimeError, match="Moving history entries to '.*' failed: .*No space left on device"):
+        history[0]
+    with pytest.raises(RuntimeError, match="No space left on device"):
+        add(history, 4)
+    with pytest.raises(RuntimeError, match="No space left on device"):
+        history.close()
+    assert history._log._file.closed
+    assert os.path.exists(spill_path) == persistent
+    history.close()  # Closing again does nothing.
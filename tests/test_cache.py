@@ -0,0 +1,161 @@
+""" tests/test_cache.py """
+import decimal
+import threading
+
+import pytest
+from unittest.mock import patch
+
+from app.cache import ResultCache, make_key
+from app.calculation import AddCalculation, CalculationFactory, DivideCalculation, MultiplyCalculation
+from app.operations import Operations
+
+
+class FakeClock:
+    """A clock the tests move by hand."""
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def factory_cache(monkeypatch):
+    """Installs a fresh factory-level result cache for one test."""
+    cache = ResultCache(maxsize=2)
+    monkeypatch.setattr(CalculationFactory, 'result_cache', cache)
+    return cache
+
+
+@patch.object(Operations, 'power', return_value=1024.0)
+def test_repeated_calculations_execute_once(mock_power, factory_cache):
+    """Test that a repeated (operation, a, b) only executes once."""
+    # Act
+    results = [CalculationFactory.create_calculation('power', 2.0, 10.0).result for _ in range(3)]
+
+    # Assert
+    assert results == [1024.0] * 3
+    mock_power.assert_called_once_with(2.0, 10.0)
+    assert factory_cache.stats()[:3] == (2, 1, 0)
+    assert factory_cache.stats().hit_rate == pytest.approx(2 / 3)
+
+
+def test_lru_eviction(factory_cache):
+    """Test that the least recently used entry is evicted first."""
+    # Arrange
+    for a in (1.0, 2.0, 1.0, 3.0):  # 1.0 is used again, so 2.0 is the oldest when 3.0 arrives.
+        CalculationFactory.create_calculation('add', a, 1.0).result
+
+    # Act & Assert
+    with patch.object(Operations, 'addition', return_value=0.0) as mock_addition:
+        assert CalculationFactory.create_calculation('add', 1.0, 1.0).result == 2.0
+        assert CalculationFactory.create_calculation('add', 2.0, 1.0).result == 0.0
+        mock_addition.assert_called_once_with(2.0, 1.0)
+    assert factory_cache.evictions == 2
+    assert len(factory_cache) == 2
+
+
+def test_errors_are_cached_separately(factory_cache):
+    """Test that division by zero is remembered and raised again on a hit."""
+    with patch.object(DivideCalculation, 'execute', autospec=True,
+                      side_effect=ZeroDivisionError("Cannot divide by zero.")) as mock_execute:
+        for _ in range(2):
+            with pytest.raises(ZeroDivisionError, match="Cannot divide by zero."):
+                CalculationFactory.create_calculation('divide', 1.0, 0.0).result
+    mock_execute.assert_called_once()
+    assert (factory_cache.misses, factory_cache.hits, factory_cache.error_hits) == (1, 1, 1)
+
+
+def test_other_errors_are_not_cached():
+    """Test that only operand-determined errors are cached."""
+    cache = ResultCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        raise ValueError("boom")
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            cache.get_or_compute('key', compute)
+    assert len(calls) == 2
+    assert len(cache) == 0
+
+
+def test_ttl_expiry():
+    """Test that results and errors expire after their time-to-live."""
+    # Arrange
+    clock = FakeClock()
+    cache = ResultCache(maxsize=8, ttl=10.0, error_ttl=1.0, clock=clock)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return 42.0
+
+    def fail():
+        calls.append(1)
+        raise OverflowError(34, "Result too large")
+
+    # Act & Assert
+    assert cache.get_or_compute('value', compute) == 42.0
+    with pytest.raises(OverflowError):
+        cache.get_or_compute('error', fail)
+    clock.now = 5.0
+    assert cache.get_or_compute('value', compute) == 42.0
+    with pytest.raises(OverflowError) as error:
+        cache.get_or_compute('error', fail)  # Expired after 1 second.
+    assert error.value.args == (34, "Result too large")
+    clock.now = 10.0
+    assert cache.get_or_compute('value', compute) == 42.0  # Expired after 10 seconds.
+    assert len(calls) == 4
+    assert cache.expirations == 2
+    assert ResultCache(ttl=3.0).error_ttl == 3.0
+
+
+def test_keys_distinguish_types_and_signed_zeros(factory_cache):
+    """Test that equal-comparing operands of different types or signs do not share entries."""
+    assert make_key(AddCalculation, 1, 2.0) != make_key(AddCalculation, 1.0, 2.0)
+    assert make_key(AddCalculation, 1.0, 2.0) != make_key(MultiplyCalculation, 1.0, 2.0)
+    assert make_key(MultiplyCalculation, 0.0, 5.0) != make_key(MultiplyCalculation, -0.0, 5.0)
+    assert str(CalculationFactory.create_calculation('multiply', 0.0, 5.0).result) == "0.0"
+    assert str(CalculationFactory.create_calculation('multiply', -0.0, 5.0).result) == "-0.0"
+
+
+
+def test_decimal_keys_include_the_precision():
+    """Test that Decimal results computed at different precisions do not share entries."""
+    one, three = decimal.Decimal(1), decimal.Decimal(3)
+    with decimal.localcontext(prec=5):
+        five = make_key(DivideCalculation, one, three)
+    assert five != make_key(DivideCalculation, one, three)
+    assert make_key(DivideCalculation, 1.0, 3.0) == (DivideCalculation, float, 1.0, float, 3.0)
+
+def test_cache_is_thread_safe():
+    """Test concurrent lookups and stores from several threads."""
+    cache = ResultCache(maxsize=50)
+
+    def work(offset):
+        for i in range(2000):
+            assert cache.get_or_compute((offset + i) % 100, lambda i=i: (offset + i) % 100) == (offset + i) % 100
+
+    threads = [threading.Thread(target=work, args=(offset,)) for offset in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = cache.stats()
+    assert stats.hits + stats.misses == 8000
+    assert stats.size <= 50
+
+
+def test_cache_admin():
+    """Test clear, repr, an empty hit rate and invalid sizes."""
+    cache = ResultCache(maxsize=4, ttl=2.0)
+    cache.get_or_compute('a', lambda: 1)
+    assert repr(cache) == "ResultCache(maxsize=4, ttl=2.0, entries=1)"
+    cache.clear()
+    assert len(cache) == 0
+    assert ResultCache().stats().hit_rate == 0.0
+    with pytest.raises(ValueError, match="maxsize must be at least 1"):
+        ResultCache(maxsize=0)
@@ -11,9 +11,14 @@ Tests are organized following the AAA (Arrange, Act, Assert) pattern and adhere
 to PEP8 standards for code style and formatting.
 """
 
+import re
+import threading
+from array import array
 import pytest
 from unittest.mock import patch
 from app.operations import Operations
+from app.dispatch import AmbiguousNameError
+from app.interning import InternTable
 from app.calculation import (
     CalculationFactory,
     AddCalculation,
@@ -729,3 +734,321 @@ def test_calculation_str_parameterized(
 
     # Assert: Verify the string representation matches the expected format
     assert calc_str == expected_str
+
+
+# -----------------------------------------------------------------------------------
+# Test Result Caching and __slots__
+# -----------------------------------------------------------------------------------
+
+@patch.object(Operations, 'addition', return_value=15.0)
+def test_calculation_result_is_cached(mock_addition):
+    """
+    Test that the result of a Calculation is computed once and reused.
+
+    Printing a calculation several times (as the history does) must not
+    run the arithmetic again.
+    """
+    # Arrange
+    add_calc = AddCalculation(10.0, 5.0)
+
+    # Act
+    first = add_calc.result
+    calc_str = str(add_calc)
+    second = add_calc.result
+
+    # Assert
+    mock_addition.assert_called_once_with(10.0, 5.0)
+    assert first == second == 15.0
+    assert calc_str == "AddCalculation: 10.0 Add 5.0 = 15.0"
+
+
+@pytest.mark.parametrize("operand, value, expected_result", [
+    ('a', 20.0, 25.0),
+    ('b', 1.0, 11.0),
+])
+def test_calculation_cache_dropped_when_operand_changes(operand, value, expected_result):
+    """
+    Test that changing an operand drops the cached result.
+    """
+    # Arrange
+    add_calc = AddCalculation(10.0, 5.0)
+    assert add_calc.result == 15.0
+
+    # Act
+    setattr(add_calc, operand, value)
+
+    # Assert
+    assert getattr(add_calc, operand) == value
+    assert add_calc.result == expected_result
+
+
+def test_calculation_errors_are_not_cached():
+    """
+    Test that a failing calculation raises every time its result is requested.
+    """
+    # Arrange
+    divide_calc = DivideCalculation(10.0, 0.0)
+
+    # Act & Assert
+    for _ in range(2):
+        with pytest.raises(ZeroDivisionError):
+            divide_calc.result
+
+
+@pytest.mark.parametrize("calc_type", ['add', 'subtract', 'multiply', 'divide', 'power', 'modulo'])
+def test_calculation_has_no_instance_dict(calc_type):
+    """
+    Test that Calculation subclasses use __slots__ and carry no per-instance __dict__.
+    """
+    # Arrange & Act
+    calc = CalculationFactory.create_calculation(calc_type, 2.0, 3.0)
+
+    # Assert
+    assert not hasattr(calc, '__dict__')
+
+
+# -----------------------------------------------------------------------------------
+# Test Abbreviations, Aliases and Registration Changes
+# -----------------------------------------------------------------------------------
+@pytest.fixture
+def powmod_registered():
+    """Registers a temporary 'powmod' calculation with an alias, and removes it afterwards."""
+    @CalculationFactory.register_calculation('PowMod', aliases=('pm',))
+    class PowModCalculation(Calculation):
+        __slots__ = ()
+
+        def execute(self) -> float:
+            return Operations.modulo(Operations.power(self.a, self.b), 7.0)
+
+    yield PowModCalculation
+    CalculationFactory.unregister_calculation('powmod')
+
+
+@pytest.mark.parametrize("calculation_type, expected_class", [
+    ('mul', MultiplyCalculation),
+    ('DIV', DivideCalculation),
+    ('sub', SubtractCalculation),
+    ('plus', AddCalculation),
+    ('minus', SubtractCalculation),
+    ('times', MultiplyCalculation),
+    ('Modul', ModuloCalculation),
+])
+def test_factory_resolves_abbreviations_and_aliases(calculation_type, expected_class):
+    """Test that unambiguous prefixes and aliases create the full calculation type."""
+    assert isinstance(CalculationFactory.create_calculation(calculation_type, 6.0, 3.0), expected_class)
+
+
+def test_factory_ambiguous_abbreviation(powmod_registered):
+    """Test that a prefix shared by two types is rejected and the dispatch table follows registrations."""
+    # 'pow' now abbreviates both power and powmod; exact names and aliases still work.
+    with pytest.raises(AmbiguousNameError, match="Ambiguous calculation type: 'pow' could be power, powmod."):
+        CalculationFactory.create_calculation('pow', 2.0, 3.0)
+    assert CalculationFactory.create_calculation('powm', 2.0, 3.0).result == 1.0
+    assert CalculationFactory.create_calculation('PM', 2.0, 3.0).result == 1.0
+    assert isinstance(CalculationFactory.create_calculation('power', 2.0, 3.0), PowerCalculation)
+
+
+def test_factory_unregister(powmod_registered):
+    """Test that unregistering removes the type, its alias and its abbreviations."""
+    version = CalculationFactory._registry.version
+    CalculationFactory.unregister_calculation('powmod')
+    assert CalculationFactory._registry.version == version + 1
+    for calculation_type in ('powmod', 'pm'):
+        with pytest.raises(ValueError, match=f"Unsupported calculation type: '{calculation_type}'"):
+            CalculationFactory.create_calculation(calculation_type, 2.0, 3.0)
+    assert isinstance(CalculationFactory.create_calculation('pow', 2.0, 3.0), PowerCalculation)
+    with pytest.raises(ValueError, match="Unsupported calculation type: 'powmod'."):
+        CalculationFactory.unregister_calculation('powmod')
+    # Put it back so the fixture can remove it.
+    CalculationFactory.register_calculation('powmod')(powmod_registered)
+
+
+def test_factory_rejects_duplicate_aliases(powmod_registered):
+    """Test that aliases cannot shadow a registered type or alias."""
+    for calculation_type, aliases in [('pm', ()), ('other', ('add',)), ('other', ('pm',)), ('other', ('other',))]:
+        with pytest.raises(ValueError, match="is already registered."):
+            CalculationFactory.register_calculation(calculation_type, aliases=aliases)(AddCalculation)
+    assert 'other' not in CalculationFactory._registry.calculations
+
+
+def test_factory_unregister_second_name():
+    """Test that removing a second name of a class keeps the class's own name."""
+    CalculationFactory.register_calculation('sum')(AddCalculation)
+    assert isinstance(CalculationFactory.create_calculation('sum', 1.0, 2.0), AddCalculation)
+    CalculationFactory.unregister_calculation('sum')
+    assert CalculationFactory._registry.names[AddCalculation] == 'add'
+
+
+# -----------------------------------------------------------------------------------
+# Test Bulk Creation
+# -----------------------------------------------------------------------------------
+def test_create_many_groups_rows_by_type():
+    """Test that mixed rows are resolved once per spelling and computed in row order."""
+    # Arrange
+    operations = ['add', 'mul', 'plus', 'divide', 'mul', 'Modul']
+    a = [1, 2.0, 3, 4, 5, 7]
+    b = [5, 6, 7, 0, 2, 4]
+
+    # Act
+    with patch.object(CalculationFactory, '_resolve', wraps=CalculationFactory._resolve) as resolve:
+        batch = CalculationFactory.create_many(operations, a, b)
+    results, errors = batch.results()
+
+    # Assert
+    assert resolve.call_count == 5  # 'mul' is resolved once.
+    assert batch.classes == [AddCalculation, MultiplyCalculation, DivideCalculation, ModuloCalculation]
+    assert list(errors) == [0, 0, 0, 1, 0, 0]
+    assert [result for result, error in zip(results, errors) if not error] == [6.0, 12.0, 10.0, 10.0, 3.0]
+    assert batch.results() is batch.results()
+    assert repr(batch) == ("CalculationBatch(rows=6, classes=[AddCalculation, MultiplyCalculation, "
+                           "DivideCalculation, ModuloCalculation])")
+
+
+def test_create_many_with_one_operation():
+    """Test one operation for every row, including an int too large for a float."""
+    batch = CalculationFactory.create_many('power', [2, 10**400, 4], [3, 1, 0.5])
+    results, errors = batch.results()
+    assert batch.calculation_class(1) is PowerCalculation
+    assert list(errors) == [0, 1, 0]
+    assert (results[0], results[2]) == (8.0, 2.0)
+    assert CalculationFactory.create_many([], [], []).results() == (array('d'), array('B'))
+
+
+def test_create_many_views():
+    """Test that rows come back as ordinary calculations, with known results once computed."""
+    # Arrange
+    batch = CalculationFactory.create_many(['add', 'divide', 'subtract'], [1.0, 1.0, 5.0], [2.0, 0.0, 3.0])
+
+    # Act / Assert: before the results are computed, views compute their own.
+    assert isinstance(batch[0], AddCalculation) and batch[0].result == 3.0
+    batch.results()
+    with patch.object(Operations, 'subtraction') as mock_subtraction:
+        assert [calculation.result for calculation in batch[::2]] == [3.0, 2.0]
+    mock_subtraction.assert_not_called()
+    with pytest.raises(ZeroDivisionError):
+        batch[-2].result  # A failed row has no stored result; it raises like a single calculation.
+    assert [type(calculation) for calculation in batch] == [AddCalculation, DivideCalculation, SubtractCalculation]
+    for index in (3, -4):
+        with pytest.raises(IndexError, match="batch index out of range"):
+            batch[index]
+
+
+def test_create_many_views_with_interning(monkeypatch):
+    """Test that views are shared instances when interning is on."""
+    monkeypatch.setattr(CalculationFactory, 'intern_table', InternTable())
+    batch = CalculationFactory.create_many('add', [1.0, 1.0], [2.0, 2.0])
+    assert batch[0] is batch[1]
+    batch.results()
+    assert batch[0] is batch[1] and batch[0].frozen
+
+
+@pytest.mark.parametrize("operations, a, b, message", [
+    (['add'], [1.0, 2.0], [1.0, 2.0], "Operation and operand sequences must have the same length."),
+    ('add', [1.0, 2.0], [1.0], "Operation and operand sequences must have the same length."),
+    (['add', 'floor'], [1.0, 2.0], [1.0, 2.0], "Unsupported calculation type: 'floor'."),
+])
+def test_create_many_rejects_bad_input(operations, a, b, message):
+    """Test length mismatches and unknown types."""
+    with pytest.raises(ValueError, match=re.escape(message)):
+        CalculationFactory.create_many(operations, a, b)
+
+
+def test_execute_many_default(powmod_registered):
+    """Test that types without a batch kernel execute one instance per row."""
+    # Arrange
+    class FailingCalculation(Calculation):
+        __slots__ = ()
+
+        def execute(self) -> float:
+            if self.b == 0:
+                raise ZeroDivisionError("Cannot divide by zero.")
+            return self.a
+
+    # Act
+    batch = CalculationFactory.create_many(['pm', 'add'], [2.0, 1.0], [3.0, 1.0])
+    results, errors = FailingCalculation.execute_many([1.0, 2.0], [0.0, 1.0])
+
+    # Assert
+    assert batch.results() == (array('d', [1.0, 2.0]), array('B', [0, 0]))
+    assert list(errors) == [1, 0] and results[1] == 2.0
+
+
+def test_create_many_type_limit():
+    """Test that a batch holds at most 256 distinct calculation types."""
+    names = [f'bulk{i}' for i in range(257)]
+    for name in names:
+        CalculationFactory.register_calculation(name)(type(name, (AddCalculation,), {'__slots__': ()}))
+    try:
+        with pytest.raises(ValueError, match="at most 256 calculation types per batch"):
+            CalculationFactory.create_many(names, [1.0] * 257, [1.0] * 257)
+    finally:
+        for name in names:
+            CalculationFactory.unregister_calculation(name)
+
+
+# -----------------------------------------------------------------------------------
+# Test Concurrent Use of the Registry
+# -----------------------------------------------------------------------------------
+def test_lookups_do_not_take_the_registry_lock():
+    """Test that creating calculations never waits for a registration in progress."""
+    created = []
+    with CalculationFactory._lock:
+        worker = threading.Thread(target=lambda: created.append(CalculationFactory.create_calculation('mul', 6.0, 7.0)))
+        worker.start()
+        worker.join(timeout=5)
+    assert not worker.is_alive()
+    assert created[0].result == 42.0
+
+
+def test_registry_stress():
+    """Test many threads creating calculations while types are registered and removed."""
+    # Arrange
+    stop = threading.Event()
+    errors = []
+    counts = []
+
+    class TempCalculation(Calculation):
+        __slots__ = ()
+
+        def execute(self) -> float:
+            return self.a
+
+    def create_calculations():
+        count = 0
+        try:
+            while not stop.is_set():
+                assert CalculationFactory.create_calculation('add', 2.0, 3.0).result == 5.0
+                assert CalculationFactory.create_calculation('mult', 2.0, 3.0).result == 6.0
+                assert CalculationFactory.create_calculation('plus', 1.0, 1.0).result == 2.0
+                try:
+                    # Either registered or not, but never half-registered.
+                    assert CalculationFactory.create_calculation('tmp0', 7.0, 0.0).result == 7.0
+                except ValueError as error:
+                    assert str(error).startswith("Unsupported calculation type: 'tmp0'.")
+                count += 1
+        except Exception as error:  # pragma: no cover - only reached when the test fails
+            errors.append(error)
+        counts.append(count)
+
+    workers = [threading.Thread(target=create_calculations) for _ in range(4)]
+
+    # Act
+    for worker in workers:
+        worker.start()
+    try:
+        for round_number in range(25):
+            names = [f"tmp{i}" for i in range(4)]
+            for name in names:
+                CalculationFactory.register_calculation(name, aliases=(f"{name}_alias",))(TempCalculation)
+            for name in names:
+                CalculationFactory.unregister_calculation(name)
+    finally:
+        stop.set()
+        for worker in workers:
+            worker.join()
+
+    # Assert
+    assert errors == []
+    assert len(counts) == 4 and all(counts)
+    assert not CalculationFactory.is_registered('tmp0')
+    assert CalculationFactory._registry.names.get(TempCalculation) is None
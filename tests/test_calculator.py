@@ -2,9 +2,16 @@
 import sys
 import pytest
 from io import StringIO
+from unittest.mock import patch
 
 from pytest import MonkeyPatch
 from app.calculator import calculator, display_history, display_help
+from app.cache import ResultCache
+from app.disk_cache import SQLiteResultCache
+from app.calculation import AddCalculation, CalculationFactory
+from app.history_log import HistoryLog
+from app.interning import InternTable
+from app.history_summary import HistorySummary
 
 
 # Helper function to capture print statements
@@ -202,10 +209,27 @@ def test_display_help(capsys):
             subtract  : Subtracts the second number from the first.
             multiply  : Multiplies two numbers.
             divide    : Divides the first number by the second.
+        - Operations and commands can be abbreviated to any unambiguous prefix of at
+          least three letters (mul 7 8, div 20 4, his); plus, minus and times are aliases.
+
+        <expression>
+        - Evaluate an infix expression using + - * / % ^ and parentheses.
+
+        simplify <expression>
+        - Show the expression after constant folding and algebraic simplification.
 
     Special Commands:
         help      : Display this help message.
         history   : Show the history of calculations.
+                    Add conditions to search it, e.g. 'history op=divide result>100 last=50'
+                    (fields: op, a, b, result with =, <, <=, >, >=; and last=N).
+        summary   : Show count, sum, mean, variance, min and max of the results per operation.
+        cache     : Show the hit, miss and eviction counts of the result cache (see --cache).
+        stats     : Show per-operation counts, errors and latency percentiles.
+                    Use 'stats on', 'stats off' or 'stats reset' to control collection.
+        backend   : Show or choose the number type for this session: float (default), int
+                    (exact integers), decimal [precision] or fraction, e.g. 'backend decimal 50'.
+                    Infix expressions are always evaluated in floating point.
         exit      : Exit the calculator.
 
     Examples:
@@ -213,6 +237,8 @@ def test_display_help(capsys):
         subtract 15.5 3.2
         multiply 7 8
         divide 20 4
+        (3 + 4) * 2 ^ 10 % 7
+        simplify (x * 1 + 0) * (2 + 3)
     """
     # Remove leading/trailing whitespace for comparison
     assert captured.out.strip() == expected_output.strip()
@@ -237,3 +263,373 @@ def test_calculator_help_command(monkeypatch, capsys):
     captured = capsys.readouterr()
     assert "Calculator REPL Help" in captured.out
     assert "Exiting calculator..." in captured.out
+
+
+@pytest.mark.parametrize(
+    "expression, expected",
+    [
+        ("(3 + 4) * 2 ^ 10 % 7", "Result: 0.0"),
+        ("1 + 2 * 3", "Result: 7.0"),
+        ("-2 ^ 2", "Result: -4.0"),
+    ],
+    ids=[
+        "expression_with_parentheses_and_power",
+        "expression_precedence",
+        "expression_unary_minus",
+    ]
+)
+def test_expression_mode(monkeypatch: MonkeyPatch, expression: str, expected: str):
+    """Test that infix expressions are evaluated in the REPL."""
+    inputs = [expression, "exit"]
+    output = run_calculator_with_input(monkeypatch, inputs)
+    assert expected in output
+
+
+@pytest.mark.parametrize(
+    "expression, expected",
+    [
+        ("1 / (2 - 2)", "Division by zero is not allowed"),
+        ("(1 + 2", "Invalid expression: expected ')'."),
+        ("10 ^ 400", "Numerical result out of range"),
+        ("(" * 1500 + "1" + ")" * 1500, "Invalid expression: too deeply nested."),
+    ],
+    ids=[
+        "expression_divide_by_zero",
+        "expression_unbalanced_parentheses",
+        "expression_overflow",
+        "expression_too_deeply_nested",
+    ]
+)
+def test_expression_mode_errors(monkeypatch: MonkeyPatch, expression: str, expected: str):
+    """Test that expression errors are reported without leaving the REPL."""
+    inputs = [expression, "exit"]
+    output = run_calculator_with_input(monkeypatch, inputs)
+    assert expected in output
+    assert "Exiting calculator..." in output
+
+
+@pytest.mark.parametrize(
+    "command, expected",
+    [
+        ("simplify (x * 1 + 0) * (2 + 3)", "Simplified: (x * 5.0) (nodes: 9 -> 3)"),
+        ("simplify a ^ 0 + 2 * 3", "Simplified: ((a ^ 0.0) + 6.0) (nodes: 7 -> 5)"),
+        ("simplify (1 +", "Invalid expression: unexpected end of input."),
+    ],
+    ids=[
+        "simplify_identities_and_folding",
+        "simplify_power_zero_kept",
+        "simplify_invalid_expression",
+    ]
+)
+def test_simplify_command(monkeypatch: MonkeyPatch, command: str, expected: str):
+    """Test the simplify command in the REPL."""
+    inputs = [command, "exit"]
+    output = run_calculator_with_input(monkeypatch, inputs)
+    assert expected in output
+
+
+def test_stats_command(monkeypatch: MonkeyPatch):
+    """Test collecting and showing per-operation statistics from the REPL."""
+    # Arrange
+    inputs = [
+        "stats",
+        "stats on",
+        "add 1 2",
+        "add 3 4",
+        "divide 1 0",
+        "floor 1 2",
+        "add one two",
+        "(1 +",
+        "1 / 0",
+        "stats",
+        "stats reset",
+        "stats off",
+        "stats bogus",
+        "exit",
+    ]
+
+    # Act
+    output = run_calculator_with_input(monkeypatch, inputs)
+
+    # Assert
+    assert "Statistics collection is off. Type 'stats on' to start collecting." in output
+    assert "Statistics collection enabled." in output
+    lines = output.splitlines()
+    add_line = next(line for line in lines if line.startswith("add "))
+    assert add_line.split()[1] == "2"
+    # 'divide 1 0' and the division inside '1 / 0' are both counted.
+    assert "divide" in output and "zero_division=2" in output
+    assert "unsupported_type=1" in output
+    assert "input" in output and output.count("parse_failure=1") == 2
+    assert "Statistics reset." in output
+    assert "Statistics collection disabled." in output
+    assert "Usage: stats [on|off|reset]" in output
+
+
+def test_calculator_history_with_unknown_types(monkeypatch: MonkeyPatch, tmp_path):
+    """Test that entries of types this session does not know are shown instead of crashing the REPL."""
+    # Arrange: a history file written by a session that had a 'cube' plugin.
+    path = str(tmp_path / "history.log")
+    with HistoryLog(path) as log:
+        log.append_entry('cube', 2.0, 1.0, 9.0)
+    inputs = iter(["add 1 1", "history", "history op=cube", "exit"])
+    monkeypatch.setattr('builtins.input', lambda _: next(inputs))
+    captured_output = StringIO()
+    monkeypatch.setattr(sys, 'stdout', captured_output)
+
+    # Act
+    calculator(history_file=path)
+
+    # Assert
+    output = captured_output.getvalue()
+    assert "Calculation History:\n1. cube: 2.0 cube 1.0 = 9.0\n2. AddCalculation: 1.0 Add 1.0 = 2.0" in output
+    assert "Matching calculations (1):\n1. cube: 2.0 cube 1.0 = 9.0" in output
+
+
+def test_calculator_persistent_history(monkeypatch: MonkeyPatch, tmp_path):
+    """Test that the REPL history is kept in the history file across sessions."""
+    # Arrange
+    path = str(tmp_path / "history.log")
+    inputs = iter(["add 2 3", "exit", "multiply 4 5", "history", "exit"])
+    monkeypatch.setattr('builtins.input', lambda _: next(inputs))
+    captured_output = StringIO()
+    monkeypatch.setattr(sys, 'stdout', captured_output)
+
+    # Act
+    calculator(history_file=path)
+    calculator(history_file=path)
+
+    # Assert
+    output = captured_output.getvalue()
+    assert "1. AddCalculation: 2.0 Add 3.0 = 5.0" in output
+    assert "2. MultiplyCalculation: 4.0 Multiply 5.0 = 20.0" in output
+
+
+def test_history_query(monkeypatch: MonkeyPatch):
+    """Test searching the history from the REPL."""
+    # Arrange
+    inputs = [
+        "history op=add",
+        "divide 1000 2",
+        "add 1 2",
+        "divide 9 3",
+        "divide 800 4",
+        "history op=divide result>100",
+        "multiply 100 3",
+        "history result>=200 last=2",
+        "history op=power",
+        "history result~5",
+        "exit",
+    ]
+
+    # Act
+    output = run_calculator_with_input(monkeypatch, inputs)
+
+    # Assert
+    assert "Matching calculations (2):\n1. DivideCalculation: 1000.0 Divide 2.0 = 500.0\n" \
+           "4. DivideCalculation: 800.0 Divide 4.0 = 200.0" in output
+    assert "Matching calculations (2):\n4. DivideCalculation: 800.0 Divide 4.0 = 200.0\n" \
+           "5. MultiplyCalculation: 100.0 Multiply 3.0 = 300.0" in output
+    assert output.count("No calculations match.") == 2
+    assert "Invalid history query: cannot understand 'result~5'." in output
+
+
+def test_summary_command(monkeypatch: MonkeyPatch):
+    """Test the running aggregates shown by the 'summary' command."""
+    # Arrange
+    inputs = ["summary", "add 1 1", "summary", "add 2 2", "divide 9 3", "summary", "exit"]
+
+    # Act
+    output = run_calculator_with_input(monkeypatch, inputs)
+
+    # Assert
+    assert "No calculations performed yet." in output
+    lines = output.splitlines()
+    all_rows = [line.split() for line in lines if line.startswith("all ")]
+    assert all_rows[0] == ['all', '1', '2', '2', '0', '2', '2']
+    assert all_rows[1] == ['all', '3', '9', '3', '1', '2', '4']
+    assert ['add', '2', '6', '3', '2', '2', '4'] in [line.split() for line in lines]
+
+
+def test_summary_follows_history_from_the_start(monkeypatch: MonkeyPatch, tmp_path):
+    """Test that the summary is only built by the first 'summary', and covers earlier sessions too."""
+    # Arrange: one calculation from an earlier session, and a spy on when the summary is created.
+    path = str(tmp_path / "history.log")
+    with HistoryLog(path) as log:
+        log.append_entry('add', 1.0, 1.0, 2.0)
+    inputs = ["add 2 2", "summary", "add 3 3", "summary", "exit"]
+    consumed = []
+    created_after = []
+
+    def spy(history):
+        created_after.append(len(consumed))
+        return HistorySummary(history)
+
+    def fake_input(_):
+        consumed.append(True)
+        return inputs[len(consumed) - 1]
+
+    monkeypatch.setattr('app.calculator.HistorySummary', spy)
+    monkeypatch.setattr('builtins.input', fake_input)
+    captured_output = StringIO()
+    monkeypatch.setattr(sys, 'stdout', captured_output)
+
+    # Act
+    calculator(history_file=path)
+
+    # Assert
+    assert created_after == [2]
+    all_rows = [line.split() for line in captured_output.getvalue().splitlines() if line.startswith("all ")]
+    assert all_rows == [['all', '2', '6', '3', '2', '2', '4'], ['all', '3', '12', '4', '4', '2', '6']]
+
+
+def test_calculator_bounded_history(monkeypatch: MonkeyPatch):
+    """Test that a bounded history still shows and queries every calculation, without an index."""
+    # Arrange
+    inputs = iter(["add 1 1", "add 2 2", "add 3 3", "history", "history result>3", "exit"])
+    monkeypatch.setattr('builtins.input', lambda _: next(inputs))
+    captured_output = StringIO()
+    monkeypatch.setattr(sys, 'stdout', captured_output)
+
+    # Act
+    calculator(history_limit=2)
+
+    # Assert
+    output = captured_output.getvalue()
+    assert "1. AddCalculation: 1.0 Add 1.0 = 2.0\n2. AddCalculation: 2.0 Add 2.0 = 4.0\n" \
+           "3. AddCalculation: 3.0 Add 3.0 = 6.0" in output
+    assert "Matching calculations (2):\n2. AddCalculation: 2.0 Add 2.0 = 4.0\n" \
+           "3. AddCalculation: 3.0 Add 3.0 = 6.0" in output
+
+
+def test_calculator_bounded_history_does_not_index(monkeypatch: MonkeyPatch):
+    """Test that queries over a bounded history scan it instead of building a HistoryIndex."""
+    inputs = iter(["add 1 1", "history op=add", "exit"])
+    monkeypatch.setattr('builtins.input', lambda _: next(inputs))
+    monkeypatch.setattr(sys, 'stdout', StringIO())
+    with patch('app.calculator.HistoryIndex', side_effect=AssertionError("indexed a bounded history")):
+        calculator(history_limit=2)
+
+
+def test_cache_command(monkeypatch: MonkeyPatch):
+    """Test the 'cache' command with and without a result cache."""
+    # Arrange
+    inputs = ["cache", "add 1 2", "add 1 2", "divide 1 0", "divide 1 0", "cache", "exit"]
+
+    # Act
+    output = run_calculator_with_input(monkeypatch, inputs[:1] + ["exit"])
+    monkeypatch.setattr(CalculationFactory, 'result_cache', ResultCache(maxsize=8))
+    cached_output = run_calculator_with_input(monkeypatch, inputs[1:])
+
+    # Assert
+    assert "Result cache is off. Start the calculator with --cache SIZE to enable it." in output
+    assert ("Result cache: 2/8 entries, 2 hits (1 errors), 2 misses, 0 evictions, "
+            "0 expirations, hit rate 50.0%") in cached_output
+    assert cached_output.count("Division by zero is not allowed") == 2
+
+
+def test_cache_command_with_interning(monkeypatch: MonkeyPatch):
+    """Test that the 'cache' command reports shared calculations when interning is on."""
+    monkeypatch.setattr(CalculationFactory, 'intern_table', InternTable(maxsize=8))
+    output = run_calculator_with_input(monkeypatch, ["add 1 2", "add 1 2", "add 2 2", "cache", "exit"])
+    assert "Result cache is off." in output
+    assert "Interned calculations: 2 shared, 1 hits, 2 misses" in output
+
+
+def test_cache_command_with_disk_cache(monkeypatch: MonkeyPatch, tmp_path):
+    """Test that the 'cache' command also reports the disk tier."""
+    # Arrange
+    path = str(tmp_path / "results.db")
+    backing = SQLiteResultCache(path)
+    monkeypatch.setattr(CalculationFactory, 'result_cache', ResultCache(maxsize=8, backing=backing))
+
+    # Act
+    output = run_calculator_with_input(monkeypatch, ["add 1 2", "cache", "exit"])
+    backing.close()
+
+    # Assert
+    assert f"Disk cache {path}: 0 hits (0 errors), 1 misses, 0 written" in output
+
+
+def test_abbreviated_commands_and_operations(monkeypatch: MonkeyPatch):
+    """Test that the REPL accepts aliases and unambiguous abbreviations of operations and commands."""
+    # Arrange
+    @CalculationFactory.register_calculation('powmod')
+    class PowModCalculation(AddCalculation):
+        __slots__ = ()
+
+    inputs = ["mul 7 8", "PLUS 1 2", "his", "pow 2 3", "sta on", "sta off", "help me", "exi"]
+
+    # Act
+    try:
+        output = run_calculator_with_input(monkeypatch, inputs)
+    finally:
+        CalculationFactory.unregister_calculation('powmod')
+
+    # Assert
+    assert "Result: MultiplyCalculation: 7.0 Multiply 8.0 = 56.0" in output
+    assert "Result: AddCalculation: 1.0 Add 2.0 = 3.0" in output
+    assert "1. MultiplyCalculation: 7.0 Multiply 8.0 = 56.0" in output
+    assert "Ambiguous command: 'pow' could be power, powmod." in output
+    assert "Statistics collection enabled." in output and "Statistics collection disabled." in output
+    assert "Invalid input. Please follow the format" in output  # Commands take no extra words.
+    assert output.endswith("Exiting calculator...\n")
+
+
+def test_backend_command(monkeypatch: MonkeyPatch):
+    """Test switching the numeric backend of a REPL session."""
+    inputs = [
+        "backend",
+        "backend int",
+        "divide 1 3",
+        "multiply 123456789123456789 987654321987654321",
+        "add 0.5 x",
+        "backend decimal 5",
+        "backend",
+        "divide 1 3",
+        "power -8 0.5",
+        "backend fraction",
+        "subtract 0.3 0.1",
+        "backend float",
+        "add 0.1 0.2",
+        "backend complex",
+        "backend decimal five",
+        "backend int 10",
+        "exit",
+    ]
+    output = run_calculator_with_input(monkeypatch, inputs)
+    assert "Numeric backend: float. Choose with 'backend float|int|decimal [precision]|fraction'." in output
+    assert "Numeric backend: int." in output
+    assert "Result: DivideCalculation: 1 Divide 3 = 1/3" in output
+    assert "= 121932631356500531347203169112635269" in output
+    assert "Invalid input. Please follow the format: <operation> <num1> <num2>" in output
+    assert output.count("Numeric backend: decimal (precision 5).") == 2
+    assert "Result: DivideCalculation: 1 Divide 3 = 0.33333" in output
+    assert "Invalid operation for decimal numbers: PowerCalculation" in output
+    assert "Result: SubtractCalculation: 3/10 Subtract 1/10 = 1/5" in output
+    assert "Numeric backend: float." in output
+    assert "Result: AddCalculation: 0.1 Add 0.2 = 0.30000000000000004" in output
+    assert "Unknown numeric backend: 'complex'." in output
+    assert "Usage: backend [float|int|decimal [precision]|fraction]" in output
+    assert "The 'int' backend does not take a precision." in output
+
+
+def test_backend_results_in_history(monkeypatch: MonkeyPatch):
+    """Test that exact results are stored in the history as floats, huge integers as inf."""
+    inputs = ["backend int", "power 10 400", "divide 1 4", "power 10 1e10", "backend float", "power 10 400", "history",
+              "exit"]
+    output = run_calculator_with_input(monkeypatch, inputs)
+    assert "Result: PowerCalculation: 10 Power 400 = 1" + "0" * 400 in output
+    assert "Numerical result out of range" in output
+    assert "Exponent too large for exact numbers (the limit is 10000)." in output
+    assert "1. PowerCalculation: 10.0 Power 400.0 = inf" in output
+    assert "2. DivideCalculation: 1.0 Divide 4.0 = 0.25" in output
+
+
+def test_backend_precision_with_interning(monkeypatch: MonkeyPatch):
+    """Test that switching the decimal precision is not undone by shared calculations."""
+    monkeypatch.setattr(CalculationFactory, 'intern_table', InternTable(maxsize=8))
+    inputs = ["backend decimal 50", "divide 1 3", "backend decimal 5", "divide 1 3", "exit"]
+    output = run_calculator_with_input(monkeypatch, inputs)
+    assert "= 0." + "3" * 50 in output
+    assert "Result: DivideCalculation: 1 Divide 3 = 0.33333\n" in output
@@ -0,0 +1,167 @@
+""" tests/test_client.py """
+import asyncio
+import os
+import socket
+import threading
+
+import pytest
+
+from app.client import private_directory, run_one_shot, send_command, socket_path
+from app.server import remove_stale_socket, start_unix_server
+
+
+def stale_socket(path):
+    """Leaves a socket file at `path` that nothing listens on, as a daemon that died would."""
+    with socket.socket(socket.AF_UNIX) as listener:
+        listener.bind(path)
+
+
+@pytest.fixture(params=[False, True], ids=["fresh_socket", "stale_socket"])
+def daemon(request, tmp_path):
+    """Runs a Unix socket daemon in a background thread and yields its socket path."""
+    path = str(tmp_path / "calculator.sock")
+    if request.param:
+        stale_socket(path)  # A stale socket from an earlier daemon is replaced.
+    started = threading.Event()
+    state = {}
+
+    def serve():
+        async def main():
+            server = await start_unix_server(path)
+            state['stop'] = asyncio.Event()
+            state['loop'] = asyncio.get_running_loop()
+            started.set()
+            await state['stop'].wait()
+            server.close()
+            await server.wait_closed()
+        asyncio.run(main())
+
+    thread = threading.Thread(target=serve)
+    thread.start()
+    started.wait(5)
+    yield path
+    state['loop'].call_soon_threadsafe(state['stop'].set)
+    thread.join(5)
+
+
+def test_socket_path(monkeypatch, tmp_path):
+    """Test that the socket path honours $CALCULATOR_SOCKET, then $XDG_RUNTIME_DIR, then a private directory."""
+    monkeypatch.setenv("CALCULATOR_SOCKET", "/run/custom.sock")
+    assert socket_path() == "/run/custom.sock"
+    monkeypatch.delenv("CALCULATOR_SOCKET")
+    monkeypatch.setenv("XDG_RUNTIME_DIR", "/run/user/1000")
+    assert socket_path() == "/run/user/1000/calculator.sock"
+    monkeypatch.delenv("XDG_RUNTIME_DIR")
+    monkeypatch.setenv("TMPDIR", str(tmp_path))
+    directory = tmp_path / f"calculator-{os.getuid()}"
+    assert socket_path() == str(directory / "calculator.sock")
+    assert directory.stat().st_mode & 0o777 == 0o700
+    # The directory is reused once it exists.
+    assert socket_path() == str(directory / "calculator.sock")
+
+
+@pytest.mark.parametrize("kind", ["open_directory", "symlink", "file", "foreign_directory"])
+def test_private_directory_refuses_shared_entries(monkeypatch, tmp_path, kind):
+    """Test that an entry in the temporary directory that others could control is not used."""
+    monkeypatch.setenv("TMPDIR", str(tmp_path))
+    if kind == "foreign_directory":
+        # Pretend to be another user, for whom the directory below was made by someone else.
+        monkeypatch.setattr(os, "getuid", lambda: os.geteuid() + 1)
+    path = tmp_path / f"calculator-{os.getuid()}"
+    if kind == "open_directory":
+        path.mkdir(mode=0o700)
+        path.chmod(0o777)
+    elif kind == "symlink":
+        (tmp_path / "elsewhere").mkdir(mode=0o700)
+        path.symlink_to(tmp_path / "elsewhere")
+    elif kind == "file":
+        path.write_text("")
+    else:
+        path.mkdir(mode=0o700)
+    with pytest.raises(PermissionError, match="not a private directory"):
+        private_directory()
+    # A one-shot call then computes in-process instead of trusting the socket.
+    monkeypatch.delenv("CALCULATOR_SOCKET", raising=False)
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    assert send_command("add 2 3") is None
+
+
+def test_send_command_to_daemon(daemon):
+    """Test that a command is answered by the warm daemon."""
+    assert send_command("add 2 3", daemon) == "5.0"
+    assert send_command("(1 + 2) * 3", daemon) == "9.0"
+
+
+@pytest.mark.parametrize("stale_file", [False, True], ids=["no_socket", "stale_socket"])
+def test_send_command_without_daemon(tmp_path, stale_file):
+    """Test that send_command reports a missing or dead daemon with None."""
+    path = tmp_path / "calculator.sock"
+    if stale_file:
+        stale_socket(str(path))
+    assert send_command("add 2 3", str(path)) is None
+
+
+def test_send_command_with_unusable_socket_path(tmp_path):
+    """Test that socket errors other than a missing daemon are reported with None too."""
+    assert send_command("add 2 3", str(tmp_path / ("x" * 200))) is None  # Too long for AF_UNIX.
+    assert send_command("add 2 3", str(tmp_path)) is None  # A directory, not a socket.
+
+
+def test_send_command_to_unresponsive_daemon(tmp_path, monkeypatch):
+    """Test that a daemon that accepts but never replies times out into None."""
+    monkeypatch.setattr("app.client.DAEMON_TIMEOUT", 0.05)
+    path = str(tmp_path / "calculator.sock")
+    with socket.socket(socket.AF_UNIX) as listener:
+        listener.bind(path)
+        listener.listen()
+        assert send_command("add 2 3", path) is None
+
+
+def test_run_one_shot_uses_daemon(daemon, capsys):
+    """Test that one-shot calls print the daemon's reply and exit with 0."""
+    assert run_one_shot(["multiply", "6", "7"], daemon) == 0
+    assert capsys.readouterr().out == "42.0\n"
+
+
+@pytest.mark.parametrize(
+    "argv, expected_output, expected_code",
+    [
+        (["add", "2", "3"], "5.0\n", 0),
+        (["divide", "1", "0"], "error: division_by_zero: Cannot divide by zero.\n", 1),
+        ([], "", 0),
+    ],
+    ids=[
+        "in_process_result",
+        "in_process_error",
+        "empty_command",
+    ]
+)
+def test_run_one_shot_falls_back_in_process(tmp_path, capsys, argv, expected_output, expected_code):
+    """Test that one-shot calls compute in-process when no daemon is running."""
+    assert run_one_shot(argv, str(tmp_path / "missing.sock")) == expected_code
+    assert capsys.readouterr().out == expected_output
+
+
+def test_start_unix_server_keeps_files_it_does_not_own(tmp_path, monkeypatch):
+    """Test that only a stale socket of the current user is removed to make way for the daemon."""
+    path = tmp_path / "calculator.sock"
+    path.write_text("not a socket")
+    with pytest.raises(OSError):
+        asyncio.run(start_unix_server(str(path)))
+    assert path.read_text() == "not a socket"
+    path.unlink()
+
+    stale_socket(str(path))
+    monkeypatch.setattr(os, "getuid", lambda: os.geteuid() + 1)
+    assert remove_stale_socket(str(path)) is False
+    monkeypatch.undo()
+    assert remove_stale_socket(str(path)) is True
+    assert remove_stale_socket(str(path)) is False  # Already gone.
+
+
+def test_start_unix_server_keeps_a_running_daemon(daemon):
+    """Test that a second daemon does not take over the socket of one still running."""
+    assert remove_stale_socket(daemon) is False
+    with pytest.raises(OSError):
+        asyncio.run(start_unix_server(daemon))
+    assert send_command("add 2 3", daemon) == "5.0"
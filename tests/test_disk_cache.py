@@ -0,0 +1,175 @@
+""" tests/test_disk_cache.py """
+import math
+import sqlite3
+import subprocess
+import sys
+import time
+
+import pytest
+from unittest.mock import patch
+
+from app.cache import ResultCache
+from app.calculation import Calculation, CalculationFactory, DivideCalculation
+from app.disk_cache import SQLiteResultCache
+from app.operations import Operations
+
+
+@pytest.fixture
+def disk_cache(tmp_path):
+    """A SQLite result cache that only writes when flushed or full."""
+    cache = SQLiteResultCache(str(tmp_path / "results.db"), batch_size=1000, flush_interval=3600)
+    yield cache
+    cache.close()
+
+
+def test_results_are_shared_through_the_database(tmp_path):
+    """Test that a result computed by one cache is a hit for another one on the same file."""
+    # Arrange
+    path = str(tmp_path / "results.db")
+    with patch.object(Operations, 'power', return_value=1024.0) as mock_power:
+        first = SQLiteResultCache(path)
+        calculation = CalculationFactory.create_calculation('power', 2.0, 10.0)
+        assert first.calculate(calculation) == 1024.0
+        assert first.calculate(calculation) == 1024.0  # Served from the pending batch.
+        first.close()
+        first.close()  # Closing twice is harmless.
+
+        # Act
+        second = SQLiteResultCache(path)
+        result = second.calculate(CalculationFactory.create_calculation('power', 2.0, 10.0))
+
+    # Assert
+    assert result == 1024.0
+    mock_power.assert_called_once_with(2.0, 10.0)
+    assert (first.hits, first.misses, first.written) == (1, 1, 1)
+    assert (second.hits, second.misses) == (1, 0)
+    assert len(second) == 1
+    assert repr(second) == f"SQLiteResultCache(path={path!r})"
+    second.close()
+
+
+def test_writes_are_batched_in_the_background(tmp_path):
+    """Test that the writer thread commits a full batch without an explicit flush."""
+    cache = SQLiteResultCache(str(tmp_path / "results.db"), batch_size=3, flush_interval=3600)
+    for a in range(3):
+        cache.calculate(CalculationFactory.create_calculation('add', float(a), 1.0))
+    for _ in range(500):
+        if cache.written == 3:
+            break
+        time.sleep(0.01)
+    assert cache.written == 3
+    assert len(cache) == 3
+    cache.close()
+
+
+def test_results_queued_during_a_write_stay_pending(disk_cache):
+    """Test that a result replaced while its batch is being written is written again later."""
+    key = ('add', 'float:1.0', 'float:1.0')
+    disk_cache.get_or_compute(key, lambda: 2.0)
+
+    class ReplacingConnection:
+        """Delegates to the real connection and replaces the pending row mid-write."""
+        def execute(self, statement, *args):
+            if statement == "COMMIT":
+                disk_cache._queue(key, (3.0, None, None))
+            return disk_cache._reader.execute(statement, *args)
+
+        def executemany(self, statement, rows):
+            return disk_cache._reader.executemany(statement, rows)
+
+    disk_cache._write_pending(ReplacingConnection())
+    assert disk_cache._pending == {key: (3.0, None, None)}
+    disk_cache.flush()
+    assert disk_cache._pending == {}
+    assert disk_cache.get_or_compute(key, lambda: 0.0) == 3.0
+
+
+def test_errors_are_stored(disk_cache):
+    """Test that arithmetic errors are stored and raised again, and other errors are not."""
+    with patch.object(DivideCalculation, 'execute', autospec=True,
+                      side_effect=ZeroDivisionError("Cannot divide by zero.")) as mock_execute:
+        for _ in range(2):
+            with pytest.raises(ZeroDivisionError, match="Cannot divide by zero."):
+                disk_cache.calculate(CalculationFactory.create_calculation('divide', 1.0, 0.0))
+    mock_execute.assert_called_once()
+    disk_cache.flush()
+    with pytest.raises(ZeroDivisionError, match="Cannot divide by zero."):
+        disk_cache.calculate(CalculationFactory.create_calculation('divide', 1.0, 0.0))
+    assert disk_cache.error_hits == 2
+
+    class CustomError(ArithmeticError):
+        pass
+
+    def fail():
+        raise CustomError("not persisted")
+
+    for _ in range(2):
+        with pytest.raises(CustomError):
+            disk_cache.get_or_compute(('custom', 'a', 'b'), fail)
+    assert disk_cache.misses == 3
+
+
+def test_only_floats_and_registered_calculations_are_stored(disk_cache):
+    """Test what the disk cache refuses to store."""
+    class HalfCalculation(Calculation):
+        def execute(self) -> float:
+            return self.a / 2
+
+    assert disk_cache.calculate(HalfCalculation(4.0, 0.0)) == 2.0
+    assert disk_cache.get_or_compute(('add', 'int:1', 'int:2'), lambda: 3) == 3
+    disk_cache.flush()
+    disk_cache.flush()  # Nothing pending.
+    assert len(disk_cache) == 0
+    assert disk_cache.misses == 1
+
+
+def test_memory_cache_backed_by_disk(disk_cache):
+    """Test the two tiers together: memory first, then disk, then execute."""
+    memory = ResultCache(maxsize=1, backing=disk_cache)
+    with patch.object(CalculationFactory, 'result_cache', memory):
+        for a in (1.0, 2.0, 1.0, 1.0):
+            CalculationFactory.create_calculation('add', a, 1.0).result
+    assert (memory.hits, memory.misses) == (1, 3)
+    assert (disk_cache.hits, disk_cache.misses) == (1, 2)
+
+
+def test_processes_share_results(tmp_path):
+    """Test that a result cached by one process is a hit in the next one."""
+    path = str(tmp_path / "results.db")
+    script = (
+        "import sys\n"
+        "from app.calculation import CalculationFactory\n"
+        "from app.disk_cache import SQLiteResultCache\n"
+        "cache = SQLiteResultCache(sys.argv[1])\n"
+        "cache.calculate(CalculationFactory.create_calculation('multiply', 6.0, 7.0))\n"
+        "print(cache.hits)\n"
+    )
+    outputs = [subprocess.run([sys.executable, "-c", script, path], capture_output=True, text=True,
+                              check=True).stdout.strip() for _ in range(2)]
+    assert outputs == ["0", "1"]  # Written at exit by the first process.
+
+
+def test_nan_results_are_not_shared(tmp_path):
+    """Test that a NaN result is computed again in the next process instead of coming back as NULL."""
+    path = str(tmp_path / "results.db")
+    script = (
+        "import sys\n"
+        "from app.calculation import CalculationFactory\n"
+        "from app.disk_cache import SQLiteResultCache\n"
+        "cache = SQLiteResultCache(sys.argv[1])\n"
+        "print(cache.calculate(CalculationFactory.create_calculation('multiply', float('inf'), 0.0)), cache.hits)\n"
+    )
+    outputs = [subprocess.run([sys.executable, "-c", script, path], capture_output=True, text=True,
+                              check=True).stdout.strip() for _ in range(2)]
+    assert outputs == ["nan 0", "nan 0"]
+
+
+def test_null_rows_are_misses(disk_cache):
+    """Test that a stored NULL result (as an older version wrote for NaN) is treated as a miss."""
+    connection = sqlite3.connect(disk_cache.path)
+    with connection:
+        connection.execute("INSERT INTO results VALUES ('multiply', 'float:inf', 'float:0.0', NULL, NULL, NULL)")
+    connection.close()
+    result = disk_cache.calculate(CalculationFactory.create_calculation('multiply', float('inf'), 0.0))
+    assert math.isnan(result)
+    assert (disk_cache.hits, disk_cache.misses) == (0, 1)
@@ -0,0 +1,45 @@
+""" tests/test_dispatch.py """
+import pytest
+
+from app.dispatch import AmbiguousNameError, PrefixTable
+
+TABLE = PrefixTable(['add', 'power', 'powmod', 'pow2', 'multiply', 'modulo'], {'plus': 'add', 'mod': 'modulo', 'mult': 'multiply'},
+                    kind="calculation type")
+
+
+@pytest.mark.parametrize("word, target", [
+    ('add', 'add'),           # Exact names
+    ('ADD', 'add'),           # are case-insensitive.
+    ('mul', 'multiply'),      # Unambiguous prefixes,
+    ('Multi', 'multiply'),
+    ('plu', 'add'),           # also of aliases.
+    ('plus', 'add'),          # Aliases
+    ('mod', 'modulo'),        # win over abbreviations of longer names ('modulo').
+    ('powe', 'power'),
+    ('pow2', 'pow2'),         # Exact names win over being a prefix of nothing else.
+    ('po', None),             # Too short to be an abbreviation.
+    ('floor', None),
+    ('', None),
+])
+def test_resolve(word, target):
+    """Test names, aliases and abbreviations."""
+    assert TABLE.resolve(word) == target
+
+
+def test_ambiguous_prefix():
+    """Test that an ambiguous prefix raises with every candidate listed."""
+    with pytest.raises(AmbiguousNameError, match="Ambiguous calculation type: 'pow' could be pow2, power, powmod.") as error:
+        TABLE.resolve('POW')
+    assert error.value.candidates == ('pow2', 'power', 'powmod')
+    assert isinstance(error.value, ValueError)
+
+
+def test_table_container_protocol():
+    """Test membership and size of the flattened table."""
+    table = PrefixTable(['help', 'history'])
+    assert 'His' in table and 'help' in table and 'hel' in table
+    assert 'h' not in table
+    # help, history, hel, his, hist, histo, histor ('hel' is unique; 'he' is too short).
+    assert len(table) == 7
+    with pytest.raises(AmbiguousNameError, match="Ambiguous name"):
+        PrefixTable(['history', 'historic']).resolve('histor')
@@ -0,0 +1,306 @@
+""" tests/test_expression.py """
+import inspect
+import math
+import re
+import sys
+import pytest
+from unittest.mock import patch
+
+from app.cache import ResultCache
+from app.calculation import CalculationFactory
+from app.operations import Operations
+from app.stats import STATS
+from app.expression import (
+    BinaryOperation,
+    Number,
+    Variable,
+    build,
+    cache_clear,
+    cache_info,
+    compile_expression,
+    compile_tree,
+    count_nodes,
+    evaluate_expression,
+    format_tree,
+    optimize,
+    parse,
+)
+
+
+@pytest.mark.parametrize(
+    "expression, expected",
+    [
+        ("1 + 2", 3.0),
+        ("2 + 3 * 4", 14.0),
+        ("(2 + 3) * 4", 20.0),
+        ("10 - 4 - 3", 3.0),
+        ("2 ^ 3 ^ 2", 512.0),
+        ("-2 ^ 2", -4.0),
+        ("2 ^ -1", 0.5),
+        ("-(1 + 2)", -3.0),
+        ("+4 % 3", 1.0),
+        ("(3 + 4) * 2 ^ 10 % 7", 0.0),
+        ("1.5e2 / .5", 300.0),
+    ],
+    ids=[
+        "addition",
+        "precedence",
+        "parentheses",
+        "left_associative_subtraction",
+        "right_associative_power",
+        "unary_minus_binds_looser_than_power",
+        "negative_exponent",
+        "negated_group",
+        "unary_plus",
+        "compound",
+        "scientific_notation",
+    ]
+)
+def test_evaluate_expression(expression, expected):
+    """Test that expressions follow the usual precedence and associativity rules."""
+    assert evaluate_expression(expression) == expected
+
+
+@pytest.mark.parametrize(
+    "expression, message",
+    [
+        ("", "empty input"),
+        ("1 +", "unexpected end of input"),
+        ("(1 + 2", "expected ')'"),
+        ("1 2", "unexpected '2'"),
+        ("* 2", "unexpected '*'"),
+        ("()", "unexpected ')'"),
+        ("2 & 3", "unexpected character '&'"),
+    ],
+    ids=[
+        "empty",
+        "dangling_operator",
+        "unbalanced_parentheses",
+        "missing_operator",
+        "leading_operator",
+        "empty_parentheses",
+        "unknown_character",
+    ]
+)
+def test_parse_errors(expression, message):
+    """Test that malformed expressions raise ValueError with a helpful message."""
+    with pytest.raises(ValueError, match=re.escape(message)):
+        parse(expression)
+
+
+@pytest.mark.parametrize("expression", [
+    "(" * 1500 + "1" + ")" * 1500,
+    "-" * 3000 + "1",
+    "2 ^ " * 3000 + "2",
+    " + ".join(["x"] * 5000),
+])
+def test_too_deeply_nested_expressions(expression):
+    """Test that input nested beyond the recursion limit raises ValueError, not RecursionError."""
+    with pytest.raises(ValueError, match="Invalid expression: too deeply nested."):
+        evaluate_expression(expression, x=1.0)
+
+
+def test_nesting_up_to_the_limit():
+    """Test that nesting just inside MAX_NESTING still parses."""
+    assert evaluate_expression("(" * 99 + "1" + ")" * 99) == 1.0
+    assert evaluate_expression("-" * 98 + "2") == 2.0
+
+
+def test_compile_tree_rejects_too_deep_trees():
+    """Test deep trees built programmatically, failing at compile time or at evaluation time."""
+    chain = Variable('x')
+    for _ in range(3000):
+        chain = BinaryOperation('add', chain, Number(1.0))
+    with pytest.raises(ValueError, match="too deeply nested"):
+        compile_tree(chain)
+
+    chain = Variable('x')
+    for _ in range(200):
+        chain = BinaryOperation('add', chain, Number(1.0))
+    evaluate = compile_tree(chain)
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(len(inspect.stack()) + 100)
+    try:
+        with pytest.raises(ValueError, match="too deeply nested"):
+            evaluate({'x': 1.0})
+    finally:
+        sys.setrecursionlimit(limit)
+    assert evaluate({'x': 1.0}) == 201.0
+
+
+def test_parse_builds_tree_of_registered_types():
+    """Test that the tree uses the calculation types registered in CalculationFactory."""
+    tree = parse("1 + 2 * 3")
+    assert tree == BinaryOperation('add', Number(1.0), BinaryOperation('multiply', Number(2.0), Number(3.0)))
+    assert format_tree(tree) == "(1.0 + (2.0 * 3.0))"
+    assert format_tree(BinaryOperation('custom', Number(1.0), Number(2.0))) == "(1.0 custom 2.0)"
+
+
+@pytest.mark.parametrize("expression, error", [
+    ("1 / (2 - 2) * 0", ZeroDivisionError),
+    ("0 * (1 / 0)", ZeroDivisionError),
+    ("(1 / 0) ^ 0", ZeroDivisionError),
+    ("0 * (10 ^ 400)", OverflowError),
+    ("x * 0", ValueError),
+    ("x ^ 0", ValueError),
+])
+def test_optimizer_keeps_failing_operands(expression, error):
+    """Test that identities never remove an operand whose evaluation fails."""
+    with pytest.raises(error):
+        evaluate_expression(expression)
+
+
+
+@pytest.mark.parametrize("value", [math.inf, -math.inf, math.nan])
+def test_multiply_by_zero_with_non_finite_variables(value):
+    """Test that x * 0 is nan, not 0, when x is infinite or nan."""
+    assert math.isnan(compile_expression("x * 0").evaluate(x=value))
+    assert math.isnan(compile_expression("0 * x").evaluate(x=value))
+
+def test_division_by_zero_raises():
+    """Test that division by zero inside an expression raises ZeroDivisionError."""
+    with pytest.raises(ZeroDivisionError):
+        evaluate_expression("1 / (3 - 3)")
+
+
+def test_compile_tree_rejects_unknown_operation():
+    """Test that compiling a node with an unregistered type fails up front."""
+    with pytest.raises(ValueError, match="Unsupported calculation type: 'floor'"):
+        compile_tree(BinaryOperation('floor', Number(1.0), Number(2.0)))
+
+
+def test_compiled_expressions_use_stats_and_result_cache():
+    """Test that expression evaluation goes through Calculation.result like single calculations."""
+    # Arrange
+    evaluate = compile_tree(parse("x * 2 + 1"))
+    original = CalculationFactory.result_cache
+    CalculationFactory.result_cache = ResultCache(16)
+    STATS.reset()
+    STATS.enable()
+    try:
+        # Act
+        assert evaluate({'x': 3.0}) == evaluate({'x': 3.0}) == 7.0
+        snapshot = STATS.snapshot()
+        cache_stats = CalculationFactory.result_cache.stats()
+    finally:
+        STATS.disable()
+        STATS.reset()
+        CalculationFactory.result_cache = original
+
+    # Assert
+    assert snapshot['multiply']['count'] == snapshot['add']['count'] == 2
+    assert (cache_stats.hits, cache_stats.misses) == (2, 2)
+
+
+def test_compiled_expressions_are_cached():
+    """Test that equivalent expression text reuses one compiled form from the LRU cache."""
+    # Arrange
+    cache_clear()
+
+    # Act
+    first = compile_expression("1 + 2")
+    second = compile_expression("  1   + 2 ")
+
+    # Assert
+    assert first is second
+    assert first() == first.evaluate() == 3.0
+    assert repr(first) == "CompiledExpression('1 + 2')"
+    info = cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+
+
+# -----------------------------------------------------------------------------------
+# Variables, Programmatic API and Optimizer
+# -----------------------------------------------------------------------------------
+
+def test_variables_are_bound_at_evaluation():
+    """Test that variables take their values from the evaluate call."""
+    compiled = compile_expression("x * (y + 1)")
+    assert compiled(x=2.0, y=3.0) == 8.0
+    assert evaluate_expression("x ^ 2", x=3.0) == 9.0
+    with pytest.raises(ValueError, match="no value for variable 'y'"):
+        compiled(x=2.0)
+
+
+@pytest.mark.parametrize(
+    "expression, expected",
+    [
+        ("x + 0", "x"),
+        ("0 + x", "x"),
+        ("x - 0", "x"),
+        ("x * 1", "x"),
+        ("1 * x", "x"),
+        ("x * 0", "(x * 0.0)"),
+        ("0 * x", "(0.0 * x)"),
+        ("x / 1", "x"),
+        ("x ^ 1", "x"),
+        ("x ^ 0", "(x ^ 0.0)"),
+        ("2 * 3 + x", "(6.0 + x)"),
+        ("x - 1", "(x - 1.0)"),
+        ("x / 2", "(x / 2.0)"),
+        ("1 / 0", "(1.0 / 0.0)"),
+        ("(x + 1) * 0", "((x + 1.0) * 0.0)"),
+        ("(x + 1) ^ 0", "((x + 1.0) ^ 0.0)"),
+    ],
+    ids=[
+        "add_zero_right",
+        "add_zero_left",
+        "subtract_zero",
+        "multiply_one_right",
+        "multiply_one_left",
+        "multiply_zero_right_kept",
+        "multiply_zero_left_kept",
+        "divide_one",
+        "power_one",
+        "power_zero_kept",
+        "constant_folding",
+        "no_identity_subtract",
+        "no_identity_divide",
+        "failing_constant_left_in_place",
+        "multiply_zero_keeps_operation",
+        "power_zero_keeps_operation",
+    ]
+)
+def test_optimize_rules(expression, expected):
+    """Test constant folding and algebraic identities."""
+    assert format_tree(optimize(parse(expression))) == expected
+
+
+def test_optimize_shares_common_subexpressions():
+    """Test that equal subtrees become one shared node and run once per evaluation."""
+    # Arrange
+    tree = parse("(a + b) * (a + b) + (a + b)")
+
+    # Act
+    optimized = optimize(tree)
+
+    # Assert
+    assert optimized.left.left is optimized.left.right is optimized.right
+    assert count_nodes(tree) == 11
+    assert count_nodes(optimized) == 5
+    with patch.object(Operations, 'addition', wraps=Operations.addition) as mock_addition:
+        assert compile_tree(optimized)({'a': 1.0, 'b': 2.0}) == 12.0
+    # One call for the shared (a + b) and one for the outer addition.
+    assert mock_addition.call_count == 2
+
+
+def test_build_programmatic_api():
+    """Test building trees through the programmatic API on top of CalculationFactory."""
+    # Arrange
+    tree = build('ADD', build('multiply', 'x', 1), 0)
+
+    # Act
+    optimized = optimize(tree)
+
+    # Assert
+    assert tree == BinaryOperation('add', BinaryOperation('multiply', Variable('x'), Number(1.0)), Number(0.0))
+    assert optimized == Variable('x')
+    assert build('power', Number(2.0), 3) == BinaryOperation('power', Number(2.0), Number(3.0))
+    with pytest.raises(ValueError, match="Unsupported calculation type: 'floor'"):
+        build('floor', 1, 2)
+
+
+def test_fold_skips_unregistered_types():
+    """Test that nodes for unknown calculation types are never folded."""
+    tree = BinaryOperation('floor', Number(1.0), Number(2.0))
+    assert optimize(tree) == tree
@@ -0,0 +1,166 @@
+""" tests/test_history.py """
+import pytest
+from unittest.mock import patch
+
+from app.operations import Operations
+from app.calculation import (
+    AddCalculation,
+    CalculationFactory,
+    DivideCalculation,
+    PowerCalculation,
+    SubtractCalculation,
+)
+from app.history import CalculationHistory, HistoryObserver, ObservableHistory, format_entry, stored_value
+
+
+def build_history(*entries):
+    """Builds a CalculationHistory from (calculation_type, a, b) tuples."""
+    history = CalculationHistory()
+    for calculation_type, a, b in entries:
+        history.append(CalculationFactory.create_calculation(calculation_type, a, b))
+    return history
+
+
+def test_history_starts_empty():
+    """Test that a new history is empty and falsy."""
+    history = CalculationHistory()
+    assert len(history) == 0
+    assert not history
+    assert list(history) == []
+    assert repr(history) == "CalculationHistory(entries=0)"
+
+
+def test_history_append_and_index():
+    """Test that stored entries come back as Calculation objects of the right type."""
+    # Arrange
+    history = build_history(('add', 10.0, 5.0), ('divide', 20.0, 4.0))
+
+    # Act
+    first, last = history[0], history[-1]
+
+    # Assert
+    assert len(history) == 2
+    assert isinstance(first, AddCalculation)
+    assert (first.a, first.b, first.result) == (10.0, 5.0, 15.0)
+    assert isinstance(last, DivideCalculation)
+    assert str(last) == "DivideCalculation: 20.0 Divide 4.0 = 5.0"
+
+
+def test_history_slicing_and_iteration():
+    """Test slicing and iteration over the history."""
+    # Arrange
+    history = build_history(('add', 1.0, 1.0), ('subtract', 5.0, 2.0), ('multiply', 3.0, 3.0))
+
+    # Act
+    sliced = history[1:]
+    iterated = [str(calculation) for calculation in history]
+
+    # Assert
+    assert [calculation.result for calculation in sliced] == [3.0, 9.0]
+    assert isinstance(sliced[0], SubtractCalculation)
+    assert iterated == [
+        "AddCalculation: 1.0 Add 1.0 = 2.0",
+        "SubtractCalculation: 5.0 Subtract 2.0 = 3.0",
+        "MultiplyCalculation: 3.0 Multiply 3.0 = 9.0",
+    ]
+
+
+@pytest.mark.parametrize("index", [2, -3])
+def test_history_index_out_of_range(index):
+    """Test that indexing past either end raises IndexError."""
+    history = build_history(('add', 1.0, 1.0), ('add', 2.0, 2.0))
+    with pytest.raises(IndexError, match="history index out of range"):
+        history[index]
+    with pytest.raises(IndexError, match="history index out of range"):
+        history.entry(index)
+
+
+def test_history_entry():
+    """Test reading one raw entry without building a Calculation."""
+    history = build_history(('add', 1.0, 1.0), ('subtract', 5.0, 2.0))
+    assert history.entry(1) == ('subtract', 5.0, 2.0, 3.0)
+    assert history.entry(-2) == ('add', 1.0, 1.0, 2.0)
+
+
+def test_format_entry():
+    """Test that entries print like their Calculation, or plainly when the type is unknown."""
+    assert format_entry('add', 1.0, 2.0, 3.0) == "AddCalculation: 1.0 Add 2.0 = 3.0"
+    assert format_entry('cube', 2.0, 1.0, 9.0) == "cube: 2.0 cube 1.0 = 9.0"
+
+
+def test_history_stores_exact_results_as_floats():
+    """Test that results of the exact backends are stored as float64 values."""
+    history = CalculationHistory()
+    history.append(PowerCalculation.from_result(10, 400, 10 ** 400))
+    history.append(PowerCalculation.from_result(-10, 401, -10 ** 401))
+    assert [entry[3] for entry in history.entries()] == [float('inf'), float('-inf')]
+    assert stored_value(2) == 2.0 and type(stored_value(2)) is float
+
+
+@patch.object(Operations, 'addition', return_value=15.0)
+def test_history_does_not_recompute_results(mock_addition):
+    """Test that materialized entries reuse the stored result instead of re-running execute."""
+    # Arrange
+    history = build_history(('add', 10.0, 5.0))
+
+    # Act
+    for calculation in history:
+        str(calculation)
+
+    # Assert
+    mock_addition.assert_called_once_with(10.0, 5.0)
+
+
+def test_history_rejects_more_than_256_types():
+    """Test that the uint8 operation code column is never overflowed."""
+    # Arrange
+    history = CalculationHistory()
+    calculation_classes = [type(f"Op{i}Calculation", (AddCalculation,), {'__slots__': ()}) for i in range(257)]
+    for calculation_class in calculation_classes[:256]:
+        history.append(calculation_class(1.0, 1.0))
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="at most 256 calculation types"):
+        history.append(calculation_classes[256](1.0, 1.0))
+    assert len(history) == 256
+
+
+class RecordingObserver(HistoryObserver):
+    """Collects everything a history reports."""
+    def __init__(self):
+        self.seen = []
+        self.resets = 0
+
+    def on_append(self, position, operation, a, b, result):
+        self.seen.append((position, operation, a, b, result))
+
+    def reset(self):
+        self.resets += 1
+        self.seen = []
+
+
+def test_history_observers():
+    """Test that observers are replayed the existing entries and then follow appends."""
+    # Arrange
+    history = build_history(('add', 1.0, 2.0))
+    observer = RecordingObserver()
+
+    # Act
+    assert history.add_observer(observer) is observer
+    history.append(CalculationFactory.create_calculation('divide', 8.0, 2.0))
+    history.remove_observer(observer)
+    history.append(CalculationFactory.create_calculation('add', 5.0, 5.0))
+
+    # Assert
+    assert observer.seen == [(0, 'add', 1.0, 2.0, 3.0), (1, 'divide', 8.0, 2.0, 4.0)]
+    assert list(history.entries()) == [('add', 1.0, 2.0, 3.0), ('divide', 8.0, 2.0, 4.0), ('add', 5.0, 5.0, 10.0)]
+
+
+def test_incomplete_history_store_cannot_be_created():
+    """Test that a store missing part of the ObservableHistory interface fails when it is created."""
+    class AppendOnly(ObservableHistory):
+        def entries(self):
+            return iter(())
+
+    with pytest.raises(TypeError, match="abstract methods __len__, entry"):
+        AppendOnly()
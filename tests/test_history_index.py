@@ -0,0 +1,191 @@
+""" tests/test_history_index.py """
+import math
+import random
+
+import pytest
+from unittest.mock import patch
+
+from app.calculation import CalculationFactory, DivideCalculation
+from app.history import CalculationHistory
+from app.history_index import Bound, HistoryIndex, HistoryScan, parse_query
+from app.history_log import HistoryLog
+from app.operations import Operations
+
+
+def build_history(*entries):
+    """Builds a CalculationHistory from (calculation_type, a, b) tuples."""
+    history = CalculationHistory()
+    for calculation_type, a, b in entries:
+        history.append(CalculationFactory.create_calculation(calculation_type, a, b))
+    return history
+
+
+ENTRIES = [
+    ('divide', 1000.0, 2.0),   # 0: 500
+    ('add', 1.0, 2.0),         # 1: 3
+    ('divide', 9.0, 3.0),      # 2: 3
+    ('multiply', 50.0, 3.0),   # 3: 150
+    ('divide', 800.0, 4.0),    # 4: 200
+    ('add', 100.0, 100.0),     # 5: 200
+]
+
+
+@pytest.mark.parametrize("query, positions", [
+    ({}, [0, 1, 2, 3, 4, 5]),
+    ({'last': 2}, [4, 5]),
+    ({'op': 'divide'}, [0, 2, 4]),
+    ({'op': 'divide', 'last': 2}, [2, 4]),
+    ({'op': 'power'}, []),
+    ({'result': Bound(3.0, 3.0)}, [1, 2]),
+    ({'result': Bound(low=200.0)}, [0, 4, 5]),
+    ({'result': Bound(low=200.0, low_inclusive=False)}, [0]),
+    ({'result': Bound(high=150.0, high_inclusive=False)}, [1, 2]),
+    ({'result': Bound(low=100.0, high=200.0)}, [3, 4, 5]),
+    ({'result': Bound(low=600.0, high=100.0)}, []),
+    ({'op': 'divide', 'result': Bound(low=100.0)}, [0, 4]),
+    ({'op': 'divide', 'result': Bound(low=100.0), 'last': 1}, [4]),
+    ({'op': 'add', 'a': Bound(high=10.0)}, [1]),
+    ({'a': Bound(low=50.0), 'b': Bound(low=3.0), 'last': 2}, [4, 5]),
+    ({'a': Bound(low=50.0), 'b': Bound(low=3.0), 'last': 10}, [3, 4, 5]),
+])
+@pytest.mark.parametrize("index_class", [HistoryIndex, HistoryScan])
+def test_query(query, positions, index_class):
+    """Test queries by operation, range and last=N, answered by the index or by scanning."""
+    # Arrange
+    history = build_history(*ENTRIES)
+    index = index_class(history)
+
+    # Act
+    matches = index.query(**query)
+
+    # Assert
+    assert list(matches.positions) == positions
+    assert len(matches) == len(positions)
+    assert [calculation.result for calculation in matches] == [history[p].result for p in positions]
+
+
+def test_index_follows_appends_and_results_are_paged():
+    """Test that entries appended after the index was created are found and pages are lazy."""
+    # Arrange
+    history = build_history(*ENTRIES[:2])
+    index = HistoryIndex(history)
+    for i in range(250):
+        history.append(CalculationFactory.create_calculation('divide', float(i), 1.0))
+
+    # Act
+    with patch.object(Operations, 'division') as mock_division:
+        matches = index.query(op='divide', result=Bound(low=10.0))
+        first_page = matches.page(0, 100)
+        pages = list(matches.pages(100))
+
+    # Assert
+    mock_division.assert_not_called()  # Results come from the history, not re-execution.
+    assert len(index) == 252
+    assert repr(matches) == "QueryResult(matches=241)"
+    assert isinstance(matches[0], DivideCalculation)
+    assert [len(page) for page in pages] == [100, 100, 41]
+    assert first_page[0].result == 500.0 and pages[-1][-1].result == 249.0
+    assert [position for position, _ in matches.items()][:3] == [0, 12, 13]
+
+
+def test_index_with_merged_sorted_runs(monkeypatch):
+    """Test range queries once appends have been merged into the sorted runs."""
+    # Arrange
+    monkeypatch.setattr('app.history_index._MIN_TAIL', 8)
+    rng = random.Random(7)
+    history = CalculationHistory()
+    index = HistoryIndex(history)
+    values = [float(rng.randint(0, 50)) for _ in range(500)]
+    for count, value in enumerate(values):
+        history.append(CalculationFactory.create_calculation('add', value, 0.0))
+        if count % 100 == 99:
+            index.query(result=Bound(low=0.0))  # Merges the tail into the sorted run.
+
+    # Act
+    matches = index.query(result=Bound(low=10.0, high=20.0, high_inclusive=False))
+
+    # Assert
+    assert list(matches.positions) == [p for p, value in enumerate(values) if 10.0 <= value < 20.0]
+    assert len(index._sorted['result'].tail) <= 8
+
+
+def test_index_rebuilds_after_compaction(tmp_path):
+    """Test that an index over a HistoryLog follows compaction."""
+    with HistoryLog(str(tmp_path / "history.log")) as log:
+        for calculation_type, a, b in ENTRIES:
+            log.append(CalculationFactory.create_calculation(calculation_type, a, b))
+        index = HistoryIndex(log)
+        assert list(index.query(op='divide').positions) == [0, 2, 4]
+        log.compact(keep=3)
+        assert list(index.query(op='divide').positions) == [1]
+        assert index.query(op='divide')[0].result == 200.0
+        log.append(CalculationFactory.create_calculation('divide', 9.0, 1.0))
+        assert list(index.query(op='divide').positions) == [1, 3]
+
+
+
+def test_index_matches_scan_with_nan_and_inf(monkeypatch):
+    """Test that the index and a linear scan agree on histories holding NaN and infinities."""
+    # Arrange
+    monkeypatch.setattr('app.history_index._MIN_TAIL', 64)
+    rng = random.Random(11)
+    history = CalculationHistory()
+    index = HistoryIndex(history)
+    specials = [math.nan, math.inf, -math.inf]
+    queries = ["result>50", "result=2", "result<=-1", "result=nan", "result=inf", "result>-inf",
+               "a=nan", "b<inf", "result=nan result>1", "result>1 result=nan", "op=add result<nan"]
+    for count in range(3000):
+        a = rng.choice(specials) if rng.random() < 0.03 else float(rng.randint(-100, 100))
+        b = rng.choice(specials) if rng.random() < 0.03 else float(rng.randint(-10, 10))
+        history.append(CalculationFactory.create_calculation(rng.choice(['add', 'multiply']), a, b))
+        if count % 500 == 499:
+            index.query(result=Bound(low=0.0))  # Merges the tail into the sorted runs.
+
+    # Act / Assert
+    scan = HistoryScan(history)
+    for text in queries:
+        assert list(index.query(**parse_query(text)).positions) == list(scan.query(**parse_query(text)).positions), text
+    nan_results = [position for position, entry in enumerate(history.entries()) if math.isnan(entry[3])]
+    assert nan_results and list(index.query(**parse_query("result=nan")).positions) == nan_results
+    assert not index.query(**parse_query("result=nan result>1")).positions
+    assert len(index._sorted['result'].nans) > 0
+
+
+def test_nan_bounds():
+    """Test that NaN only lies in the '=nan' bound."""
+    nan = math.nan
+    assert nan not in Bound() and nan not in Bound(low=0.0) and nan not in Bound(2.0, 2.0)
+    assert nan in Bound(nan, nan) and 1.0 not in Bound(nan, nan)
+    assert Bound(nan, nan).intersect(Bound()).matches_nan and Bound().intersect(Bound(nan, nan)).matches_nan
+    assert 1.0 not in Bound(nan, nan).intersect(Bound(low=0.0))
+
+
+@pytest.mark.parametrize("index_class", [HistoryIndex, HistoryScan])
+def test_query_rejects_unknown_fields(index_class):
+    """Test that only a, b and result can be range-queried."""
+    index = index_class(CalculationHistory())
+    with pytest.raises(ValueError, match="unknown field 'c'"):
+        index.query(c=Bound(1.0))
+
+
+def test_parse_query():
+    """Test parsing REPL query text into query() arguments."""
+    assert parse_query("op=Divide result>100 last=50") == {
+        'op': 'divide', 'result': Bound(low=100.0, low_inclusive=False), 'last': 50}
+    assert parse_query("a>=1 a<5 a<=4 b=2") == {
+        'a': Bound(1.0, 4.0), 'b': Bound(2.0, 2.0)}
+    assert parse_query("result<5 result>1 result>=1") == {
+        'result': Bound(1.0, 5.0, low_inclusive=False, high_inclusive=False)}
+    assert parse_query("result>=1 result>1") == {'result': Bound(low=1.0, low_inclusive=False)}
+
+
+@pytest.mark.parametrize("text, message", [
+    ("op>divide", "use 'op=...'"),
+    ("last=two", "'last' needs a whole number"),
+    ("result>ten", "'ten' is not a number"),
+    ("colour=red", "cannot understand 'colour=red'"),
+])
+def test_parse_query_errors(text, message):
+    """Test that malformed conditions are reported."""
+    with pytest.raises(ValueError, match=message):
+        parse_query(text)
@@ -0,0 +1,160 @@
+""" tests/test_history_log.py """
+import os
+
+import pytest
+
+from app.calculation import AddCalculation, Calculation, CalculationFactory, DivideCalculation
+from app.history_log import HEADER_SIZE, RECORD, HistoryLog
+
+
+def append_all(log, *entries):
+    """Appends (calculation_type, a, b) tuples to `log`."""
+    for calculation_type, a, b in entries:
+        log.append(CalculationFactory.create_calculation(calculation_type, a, b))
+
+
+def test_new_log_is_empty(tmp_path):
+    """Test that a new log only contains its header."""
+    path = tmp_path / "history.log"
+    with HistoryLog(str(path)) as log:
+        assert len(log) == 0
+        assert not log
+        assert list(log) == []
+        assert repr(log) == f"HistoryLog(path={str(path)!r}, entries=0)"
+    assert os.path.getsize(path) == HEADER_SIZE
+
+
+def test_log_append_index_and_reopen(tmp_path):
+    """Test that entries survive closing and reopening the log."""
+    # Arrange
+    path = str(tmp_path / "history.log")
+    with HistoryLog(path) as log:
+        append_all(log, ('add', 10.0, 5.0), ('divide', 20.0, 4.0), ('add', 1.0, 1.0))
+        assert len(log) == 3
+        assert log[-1].result == 2.0
+
+    # Act
+    log = HistoryLog(path)
+
+    # Assert
+    assert len(log) == 3
+    assert isinstance(log[0], AddCalculation)
+    assert isinstance(log[1], DivideCalculation)
+    assert str(log[1]) == "DivideCalculation: 20.0 Divide 4.0 = 5.0"
+    assert [calculation.result for calculation in log[1:]] == [5.0, 2.0]
+    assert [entry[:4] for entry in log.records()] == [
+        ('add', 10.0, 5.0, 15.0), ('divide', 20.0, 4.0, 5.0), ('add', 1.0, 1.0, 2.0)]
+    assert log.record(0)[4] > 0  # Timestamp.
+    with pytest.raises(IndexError, match="history index out of range"):
+        log[3]
+    with pytest.raises(IndexError, match="history index out of range"):
+        log[-4]
+
+    # Appending after reopening keeps the existing operation codes.
+    append_all(log, ('multiply', 2.0, 3.0), ('add', 2.0, 2.0))
+    assert [str(calculation) for calculation in log[3:]] == [
+        "MultiplyCalculation: 2.0 Multiply 3.0 = 6.0", "AddCalculation: 2.0 Add 2.0 = 4.0"]
+    log.close()
+    log.close()  # Closing twice is harmless.
+
+
+def test_log_reads_see_buffered_appends(tmp_path):
+    """Test that reading between appends remaps the file and sees every entry."""
+    log = HistoryLog(str(tmp_path / "history.log"), checkpoint_every=10 ** 6, checkpoint_interval=3600)
+    append_all(log, ('add', 1.0, 2.0))
+    records = log.records()
+    assert next(records)[:4] == ('add', 1.0, 2.0, 3.0)
+    append_all(log, ('subtract', 5.0, 1.0))
+    assert len(log) == 2
+    assert log[1].result == 4.0
+    assert list(records) == []  # A running iterator keeps the view it started with.
+    log.close()
+
+
+@pytest.mark.parametrize("checkpoint_every, checkpoint_interval, durable", [
+    (2, 3600, 4),   # Checkpoints after the 2nd and 4th record.
+    (1000, 0, 5),   # Checkpoints on every append because the interval always elapsed.
+    (1000, 3600, 0),  # Nothing is written before close().
+])
+def test_log_checkpoints(tmp_path, checkpoint_every, checkpoint_interval, durable):
+    """Test that records reach the file every N records or T seconds."""
+    path = tmp_path / "history.log"
+    log = HistoryLog(str(path), checkpoint_every, checkpoint_interval)
+    append_all(log, *[('add', float(i), 1.0) for i in range(5)])
+    assert os.path.getsize(path) == HEADER_SIZE + durable * RECORD.size
+    log.close()
+    assert os.path.getsize(path) == HEADER_SIZE + 5 * RECORD.size
+
+
+def test_log_drops_torn_record(tmp_path):
+    """Test that a partially written record at the end of the file is discarded on reopen."""
+    path = tmp_path / "history.log"
+    with HistoryLog(str(path)) as log:
+        append_all(log, ('add', 1.0, 2.0), ('add', 3.0, 4.0))
+    with open(path, 'ab') as stream:
+        stream.write(b'\x00' * (RECORD.size - 5))
+
+    with HistoryLog(str(path)) as log:
+        assert len(log) == 2
+        append_all(log, ('add', 5.0, 6.0))
+        assert [calculation.result for calculation in log] == [3.0, 7.0, 11.0]
+
+
+def test_log_compact(tmp_path):
+    """Test compacting the log to its newest entries."""
+    path = tmp_path / "history.log"
+    with HistoryLog(str(path)) as log:
+        append_all(log, ('divide', 8.0, 2.0), ('add', 1.0, 2.0), ('add', 3.0, 4.0), ('power', 2.0, 3.0))
+        log.compact(keep=3)
+        assert [calculation.result for calculation in log] == [3.0, 7.0, 8.0]
+        assert not os.path.exists(str(path) + '.compact')
+        append_all(log, ('subtract', 9.0, 1.0))
+        log.compact()
+        assert [calculation.result for calculation in log] == [3.0, 7.0, 8.0, 8.0]
+    assert os.path.getsize(path) == HEADER_SIZE + 4 * RECORD.size
+    assert HistoryLog(str(path))._names == ['add', 'power', 'subtract']
+
+
+def test_log_unregistered_calculation(tmp_path):
+    """Test that a calculation class the factory does not know is stored but cannot be rebuilt."""
+    class HalfCalculation(Calculation):
+        def execute(self) -> float:
+            return self.a / 2
+
+    with HistoryLog(str(tmp_path / "history.log")) as log:
+        log.append(HalfCalculation(4.0, 0.0))
+        assert log.record(0)[:4] == ('HalfCalculation', 4.0, 0.0, 2.0)
+        with pytest.raises(ValueError, match="Unsupported calculation type: 'HalfCalculation'."):
+            log[0]
+
+
+def test_log_rejects_other_files(tmp_path):
+    """Test that files that are not history logs are refused."""
+    short = tmp_path / "short.log"
+    short.write_bytes(b'hello')
+    with pytest.raises(ValueError, match="is not a calculator history log"):
+        HistoryLog(str(short))
+
+    wrong_magic = tmp_path / "magic.log"
+    wrong_magic.write_bytes(b'\x01' * HEADER_SIZE)
+    with pytest.raises(ValueError, match="is not a calculator history log"):
+        HistoryLog(str(wrong_magic))
+
+    path = tmp_path / "version.log"
+    HistoryLog(str(path)).close()
+    data = bytearray(path.read_bytes())
+    data[8] = 99
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match="Unsupported history log version 99"):
+        HistoryLog(str(path))
+
+
+def test_log_operation_limits(tmp_path):
+    """Test the limits of the operation-name table."""
+    with HistoryLog(str(tmp_path / "history.log")) as log:
+        with pytest.raises(ValueError, match="does not fit in the header"):
+            log._code_for('x' * HEADER_SIZE)
+        for code in range(256):
+            assert log._code_for(f"op{code}") == code
+        with pytest.raises(ValueError, match="at most 256 calculation types"):
+            log._code_for('one_too_many')
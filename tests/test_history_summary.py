@@ -0,0 +1,79 @@
+""" tests/test_history_summary.py """
+import math
+import random
+import statistics
+
+import pytest
+
+from app.calculation import CalculationFactory
+from app.history import CalculationHistory
+from app.history_log import HistoryLog
+from app.history_summary import HistorySummary, RunningStats
+
+
+def test_running_stats_empty_and_single():
+    """Test the aggregates of zero and one value."""
+    stats = RunningStats()
+    assert stats.as_dict() == {"count": 0, "sum": 0.0, "mean": 0.0, "variance": 0.0,
+                               "stdev": 0.0, "min": None, "max": None}
+    stats.add(4.0)
+    assert stats.as_dict() == {"count": 1, "sum": 4.0, "mean": 4.0, "variance": 0.0,
+                               "stdev": 0.0, "min": 4.0, "max": 4.0}
+
+
+def test_running_stats_match_statistics_module():
+    """Test Welford's updates against a two-pass computation, including a large offset."""
+    rng = random.Random(3)
+    values = [1e9 + rng.random() for _ in range(1000)]
+    stats = RunningStats()
+    for value in values:
+        stats.add(value)
+    assert stats.count == 1000
+    assert stats.total == pytest.approx(math.fsum(values))
+    assert stats.mean == pytest.approx(statistics.fmean(values))
+    assert stats.variance == pytest.approx(statistics.variance(values), rel=1e-6)
+    assert stats.stdev == pytest.approx(statistics.stdev(values), rel=1e-6)
+    assert (stats.min, stats.max) == (min(values), max(values))
+
+
+def test_summary_follows_history():
+    """Test that the summary covers existing entries and follows new ones."""
+    # Arrange
+    history = CalculationHistory()
+    history.append(CalculationFactory.create_calculation('add', 1.0, 2.0))
+    summary = HistorySummary(history)
+
+    # Act
+    for a, b in [(8.0, 2.0), (9.0, 3.0)]:
+        history.append(CalculationFactory.create_calculation('divide', a, b))
+
+    # Assert
+    snapshot = summary.snapshot()
+    assert list(snapshot) == ['add', 'divide', 'all']
+    assert snapshot['divide']['count'] == 2
+    assert snapshot['divide']['mean'] == 3.5
+    assert snapshot['divide']['variance'] == 0.5
+    assert snapshot['all']['sum'] == 10.0
+    assert (snapshot['all']['min'], snapshot['all']['max']) == (3.0, 4.0)
+    table = summary.format().splitlines()
+    assert table[0].split() == ['operation', 'count', 'sum', 'mean', 'variance', 'min', 'max']
+    assert table[-1].split()[:3] == ['all', '3', '10']
+
+
+def test_summary_after_compaction(tmp_path):
+    """Test that compacting a HistoryLog recomputes the summary from the kept entries."""
+    with HistoryLog(str(tmp_path / "history.log")) as log:
+        for value in [1.0, 2.0, 3.0, 4.0]:
+            log.append(CalculationFactory.create_calculation('add', value, 0.0))
+        summary = HistorySummary(log)
+        assert summary.total.count == 4
+        log.compact(keep=2)
+        assert summary.total.count == 2
+        assert summary.total.mean == 3.5
+
+
+def test_summary_of_empty_history():
+    """Test the summary before any calculation."""
+    summary = HistorySummary(CalculationHistory())
+    assert summary.format() == "No calculations performed yet."
+    assert summary.snapshot() == {'all': RunningStats().as_dict()}
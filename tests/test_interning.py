@@ -0,0 +1,141 @@
+""" tests/test_interning.py """
+import gc
+import threading
+
+import pytest
+from unittest.mock import patch
+
+from app.calculation import AddCalculation, CalculationFactory, DivideCalculation
+from app.history import CalculationHistory
+from app.interning import InternTable
+from app.operations import Operations
+
+
+@pytest.fixture
+def intern_table(monkeypatch):
+    """Installs a fresh factory-level intern table for one test."""
+    table = InternTable(maxsize=2)
+    monkeypatch.setattr(CalculationFactory, 'intern_table', table)
+    return table
+
+
+@patch.object(Operations, 'addition', return_value=3.0)
+def test_repeated_inputs_share_one_instance(mock_addition, intern_table):
+    """Test that identical inputs return the same frozen instance, which computes once."""
+    # Act
+    calculations = [CalculationFactory.create_calculation('add', 1.0, 2.0) for _ in range(3)]
+
+    # Assert
+    assert calculations[0] is calculations[1] is calculations[2]
+    assert [calculation.result for calculation in calculations] == [3.0] * 3
+    mock_addition.assert_called_once_with(1.0, 2.0)
+    assert (intern_table.hits, intern_table.misses, len(intern_table)) == (2, 1, 1)
+
+
+def test_interning_keeps_distinct_inputs_apart(intern_table):
+    """Test that the operation, the operand types and the sign of zero are part of the identity."""
+    add = CalculationFactory.create_calculation('add', 1.0, 0.0)
+    assert CalculationFactory.create_calculation('plus', 1.0, 0.0) is add  # Aliases resolve first.
+    assert CalculationFactory.create_calculation('add', 1, 0.0) is not add
+    assert CalculationFactory.create_calculation('add', 1.0, -0.0) is not add
+    assert CalculationFactory.create_calculation('subtract', 1.0, 0.0) is not add
+
+
+def test_interned_calculations_are_frozen(intern_table):
+    """Test that a shared instance rejects operand changes, while private ones still allow them."""
+    shared = CalculationFactory.create_calculation('add', 1.0, 2.0)
+    assert shared.frozen
+    with pytest.raises(AttributeError, match="AddCalculation is shared and cannot be changed."):
+        shared.a = 5.0
+    with pytest.raises(AttributeError, match="AddCalculation is shared and cannot be changed."):
+        shared.b = 5.0
+    assert (shared.a, shared.b, shared.result) == (1.0, 2.0, 3.0)
+
+    private = AddCalculation(1.0, 2.0)
+    private.a = 5.0
+    assert not private.frozen and private.result == 7.0
+
+
+def test_interned_errors_are_raised_every_time(intern_table):
+    """Test that a shared instance does not cache errors, like any other calculation."""
+    calculation = CalculationFactory.create_calculation('divide', 1.0, 0.0)
+    for _ in range(2):
+        with pytest.raises(ZeroDivisionError):
+            calculation.result
+    assert CalculationFactory.create_calculation('divide', 1.0, 0.0) is calculation
+
+
+def test_intern_table_is_bounded():
+    """Test that the table itself keeps only the most recent instances alive."""
+    # Arrange
+    table = InternTable(maxsize=2)
+
+    # Act
+    for value in (1.0, 2.0, 3.0):
+        table.intern(AddCalculation, value, value)
+    gc.collect()
+    size_after_eviction = len(table)
+    held = table.intern(AddCalculation, 4.0, 4.0)
+    table.intern(AddCalculation, 5.0, 5.0)
+    table.intern(AddCalculation, 6.0, 6.0)
+    gc.collect()
+
+    # Assert: an evicted instance that is still referenced elsewhere stays shared.
+    assert size_after_eviction == 2
+    assert len(table) == 3 and table.intern(AddCalculation, 4.0, 4.0) is held
+    table.intern(AddCalculation, 1.0, 1.0)
+    assert (table.hits, table.misses) == (1, 7)
+    assert repr(table) == "InternTable(maxsize=2, entries=2)"
+
+    table.clear()
+    assert len(table) == 0
+
+
+def test_intern_table_rejects_bad_maxsize():
+    """Test that a table must be able to hold at least one instance."""
+    with pytest.raises(ValueError, match="InternTable maxsize must be at least 1."):
+        InternTable(maxsize=0)
+
+
+def test_intern_table_with_known_result():
+    """Test that an instance rebuilt from a stored result never runs the arithmetic."""
+    table = InternTable()
+    with patch.object(Operations, 'division') as mock_division:
+        calculation = table.intern(DivideCalculation, 6.0, 3.0, 2.0)
+        assert calculation.result == 2.0 and calculation.frozen
+    mock_division.assert_not_called()
+
+
+def test_history_hands_out_shared_instances(intern_table):
+    """Test that repeated history entries come back as one shared instance."""
+    # Arrange
+    history = CalculationHistory()
+    for _ in range(3):
+        history.append(CalculationFactory.create_calculation('add', 1.0, 2.0))
+    history.append(CalculationFactory.create_calculation('add', 2.0, 2.0))
+
+    # Act
+    calculations = list(history)
+
+    # Assert
+    assert calculations[0] is calculations[1] is calculations[2] is history[0]
+    assert calculations[3] is not calculations[0]
+    assert [str(calculation) for calculation in history[1:3]] == ["AddCalculation: 1.0 Add 2.0 = 3.0"] * 2
+
+
+def test_interning_from_many_threads():
+    """Test that concurrent requests for the same input all get one instance."""
+    table = InternTable(maxsize=64)
+    results = []
+
+    def worker():
+        results.extend(table.intern(AddCalculation, float(i % 8), 1.0) for i in range(200))
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(calculation) for calculation in results}) == 8
+    assert table.misses == 8 and table.hits == 792
@@ -0,0 +1,209 @@
+""" tests/test_kernels.py """
+import json
+from array import array
+
+import pytest
+from unittest.mock import patch
+
+from app.kernels import (
+    PROFILE_VERSION, SAMPLE_SIZES, KernelDispatcher, input_kind, kernel_profile_path, size_bucket,
+)
+from app.operations import KERNELS, Operations
+
+
+def fake_kernels():
+    """Kernels that record which one ran."""
+    def kernel(name):
+        return lambda a, b: (name, len(a))
+    return {
+        'addition': {'slow': kernel('slow'), 'fast': kernel('fast'), 'vector': kernel('vector')},
+        'division': {'only': kernel('only')},
+    }
+
+
+def timings(**seconds):
+    """A replacement for KernelDispatcher._measure reporting fixed timings by kernel name."""
+    def measure(self, kernel, a, b):
+        return seconds[kernel(a, b)[0]]
+    return measure
+
+
+@pytest.fixture
+def dispatcher():
+    """A dispatcher over fake kernels, where 'vector' is only used on float64 buffers."""
+    return KernelDispatcher(fake_kernels(), buffer_only=['vector'])
+
+
+@pytest.mark.parametrize(
+    "length, bucket",
+    [(0, 0), (16, 0), (17, 1), (256, 1), (4096, 2), (65536, 3), (65537, 4), (10 ** 7, 4)],
+)
+def test_size_bucket(length, bucket):
+    assert size_bucket(length) == bucket
+
+
+def test_input_kind():
+    """Test that only one-dimensional float64 buffers count as buffers."""
+    floats = array('d', [1.0, 2.0])
+    assert input_kind(floats, memoryview(floats)) == 'buffer'
+    assert input_kind(floats, [1.0, 2.0]) == 'sequence'
+    assert input_kind(floats, array('l', [1, 2])) == 'sequence'
+    assert input_kind(floats, memoryview(array('f', [1.0, 2.0]))) == 'sequence'
+    assert input_kind(floats, memoryview(floats).cast('B').cast('d', (1, 2))) == 'sequence'
+    assert input_kind(floats, memoryview(array('d', [1.0, 2.0, 3.0]))[::2]) == 'sequence'
+
+
+def test_kernel_profile_path(monkeypatch):
+    monkeypatch.setenv("CALCULATOR_KERNEL_PROFILE", "/tmp/profile.json")
+    assert kernel_profile_path() == "/tmp/profile.json"
+    monkeypatch.delenv("CALCULATOR_KERNEL_PROFILE")
+    monkeypatch.setenv("XDG_CACHE_HOME", "/cache")
+    assert kernel_profile_path() == "/cache/calculator/kernels.json"
+    monkeypatch.delenv("XDG_CACHE_HOME")
+    monkeypatch.setenv("HOME", "/home/someone")
+    assert kernel_profile_path() == "/home/someone/.cache/calculator/kernels.json"
+
+
+def test_dispatcher_picks_the_fastest_kernel(dispatcher):
+    """Test that the first call of a kind and size times the candidates and keeps the fastest."""
+    with patch.object(KernelDispatcher, '_measure', timings(slow=2.0, fast=1.0, vector=0.5)):
+        assert dispatcher.run('addition', [1.0] * 3, [2.0] * 3) == ('fast', 3)
+        assert dispatcher.run('addition', array('d', [1.0]), array('d', [2.0])) == ('vector', 1)
+        assert dispatcher.run('division', [1.0], [2.0]) == ('only', 1)
+    assert dispatcher.decisions == {
+        ('addition', 'sequence', 0): 'fast',
+        ('addition', 'buffer', 0): 'vector',
+        ('division', 'sequence', 0): 'only',
+    }
+    # A single candidate is not timed.
+    assert dispatcher.calibrations == 2
+
+
+def test_dispatcher_reuses_decisions(dispatcher):
+    """Test that later calls of the same kind and size run the chosen kernel without timing again."""
+    with patch.object(KernelDispatcher, '_measure', timings(slow=1.0, fast=2.0, vector=3.0)):
+        dispatcher.run('addition', [1.0], [2.0])
+    with patch.object(KernelDispatcher, '_measure', side_effect=AssertionError("timed again")):
+        assert dispatcher.run('addition', [1.0] * 10, [2.0] * 10) == ('slow', 10)
+    with patch.object(KernelDispatcher, '_measure', timings(slow=2.0, fast=1.0, vector=3.0)):
+        assert dispatcher.run('addition', [1.0] * 100, [2.0] * 100) == ('fast', 100)
+    assert dispatcher.calibrations == 2
+
+
+def test_dispatcher_measures_on_samples(dispatcher):
+    """Test that kernels are timed on sample data of the bucket's size and kind."""
+    seen = []
+
+    def kernel(a, b):
+        seen.append((type(a), len(a), len(b)))
+        return 'recorded'
+
+    dispatcher.repeat = 2
+    assert dispatcher._measure(kernel, [1.0] * 1024, [2.0] * 1024) >= 0
+    assert seen == [(list, 1024, 1024)] * 8
+    with patch.object(KernelDispatcher, '_measure', side_effect=lambda kernel, a, b: seen.append((type(a), len(a))) or 1.0):
+        dispatcher.run('addition', array('d', [1.0] * 17), array('d', [2.0] * 17))
+    assert seen[8:] == [(array, SAMPLE_SIZES[1])] * 3
+
+
+def test_dispatcher_calibrate_and_describe(tmp_path):
+    """Test calibrating every operation, kind and size bucket at once."""
+    dispatcher = KernelDispatcher(fake_kernels(), str(tmp_path / "kernels.json"), buffer_only=['vector'])
+    with patch.object(KernelDispatcher, '_measure', timings(slow=2.0, fast=1.0, vector=0.5)):
+        decisions = dispatcher.calibrate(['addition'])
+    assert len(decisions) == 2 * len(SAMPLE_SIZES)
+    assert set(decisions.values()) == {'fast', 'vector'}
+    lines = dispatcher.describe().splitlines()
+    assert lines[0] == "addition       buffer    <= 16     vector"
+    assert lines[-1] == "addition       sequence  > 65536   fast"
+    assert json.loads((tmp_path / "kernels.json").read_text())["decisions"]["addition/sequence/4"] == "fast"
+    assert repr(dispatcher) == f"KernelDispatcher(path={str(tmp_path / 'kernels.json')!r}, decisions=10)"
+
+    # Recalibrating replaces earlier decisions, including ones already in use.
+    with patch.object(KernelDispatcher, '_measure', timings(slow=0.1, fast=1.0, vector=0.5)):
+        assert set(dispatcher.calibrate().values()) == {'slow', 'only'}
+        assert dispatcher.run('addition', [1.0], [1.0]) == ('slow', 1)
+
+
+def test_profile_is_reused_by_later_runs(tmp_path):
+    """Test that a saved profile spares a new dispatcher the calibration."""
+    path = str(tmp_path / "cache" / "kernels.json")
+    first = KernelDispatcher(fake_kernels(), path, buffer_only=['vector'])
+    with patch.object(KernelDispatcher, '_measure', timings(slow=2.0, fast=1.0, vector=0.5)):
+        first.run('addition', array('d', [1.0]), array('d', [1.0]))
+    second = KernelDispatcher(fake_kernels(), path, buffer_only=['vector'])
+    with patch.object(KernelDispatcher, '_measure', side_effect=AssertionError("calibrated again")):
+        assert second.run('addition', array('d', [1.0]), array('d', [1.0])) == ('vector', 1)
+    assert second.calibrations == 0
+
+
+@pytest.mark.parametrize(
+    "profile",
+    [
+        "not json",
+        '["a list"]',
+        {"version": PROFILE_VERSION + 1},
+        {"version": PROFILE_VERSION, "environment": "another machine", "decisions": {}},
+        {"version": PROFILE_VERSION, "decisions": []},
+    ],
+    ids=["invalid_json", "not_an_object", "old_version", "other_environment", "bad_decisions"],
+)
+def test_unusable_profiles_are_recalibrated(tmp_path, dispatcher, profile):
+    """Test that a profile that cannot be used is ignored and then replaced."""
+    path = tmp_path / "kernels.json"
+    if isinstance(profile, dict):
+        profile.setdefault("environment", dispatcher.environment())
+        profile = json.dumps(profile)
+    path.write_text(profile)
+    dispatcher.path = str(path)
+    with patch.object(KernelDispatcher, '_measure', timings(slow=2.0, fast=1.0, vector=0.5)):
+        assert dispatcher.run('addition', [1.0], [1.0]) == ('fast', 1)
+    assert dispatcher.calibrations == 1
+    assert json.loads(path.read_text())["decisions"] == {"addition/sequence/0": "fast"}
+
+
+def test_stale_profile_entries_are_dropped(tmp_path, dispatcher):
+    """Test that entries naming unknown operations, kinds, buckets or kernels are not used."""
+    path = tmp_path / "kernels.json"
+    path.write_text(json.dumps({
+        "version": PROFILE_VERSION,
+        "environment": dispatcher.environment(),
+        "decisions": {
+            "addition/sequence/0": "slow",
+            "addition/sequence/1": "vector",
+            "addition/sequence/x": "slow",
+            "addition/sequence/9": "slow",
+            "addition/matrix/0": "slow",
+            "modulo/sequence/0": "slow",
+            "addition/buffer/0": "missing",
+        },
+    }))
+    dispatcher.path = str(path)
+    with patch.object(KernelDispatcher, '_measure', timings(slow=2.0, fast=1.0, vector=0.5)):
+        assert dispatcher.run('addition', [1.0], [1.0]) == ('slow', 1)
+    assert dispatcher.decisions == {('addition', 'sequence', 0): 'slow'}
+
+
+def test_unwritable_profile_is_skipped(tmp_path, dispatcher):
+    """Test that failing to save the profile does not fail the calculation."""
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    dispatcher.path = str(blocker / "kernels.json")
+    with patch.object(KernelDispatcher, '_measure', timings(slow=2.0, fast=1.0, vector=0.5)):
+        assert dispatcher.run('addition', [1.0], [1.0]) == ('fast', 1)
+
+
+def test_environment_names_the_kernels(dispatcher):
+    assert dispatcher.environment().endswith("; kernels: fast, only, slow, vector")
+
+
+def test_operations_dispatch_real_kernels():
+    """Test that the dispatcher behind Operations gives the results every kernel gives."""
+    dispatcher = KernelDispatcher(KERNELS, buffer_only=['numpy'], repeat=1)
+    a, b = array('d', [6.0, 1.0, -7.5]), array('d', [3.0, 0.0, 2.0])
+    with patch.object(Operations, 'dispatcher', dispatcher):
+        results, errors = Operations.batch_division(a, b)
+        assert list(errors) == [0, 1, 0] and results[0] == 2.0 and results[2] == -3.75
+        assert Operations.batch_modulo(list(a), list(b))[0][2] == 0.5
+    assert set(dispatcher.decisions) == {('division', 'buffer', 0), ('modulo', 'sequence', 0)}
+    assert dispatcher.decisions[('modulo', 'sequence', 0)] in ('scalar', 'operator', 'array')
@@ -0,0 +1,179 @@
+""" tests/test_numeric.py """
+import re
+from decimal import Decimal
+from fractions import Fraction
+
+import pytest
+from unittest.mock import patch
+
+from app.cache import ResultCache
+from app.calculation import CalculationFactory, DivideCalculation
+from app.interning import InternTable
+from app.numeric import DecimalBackend, ExactIntBackend, FractionBackend, NumericBackend, get_backend
+
+
+@pytest.mark.parametrize(
+    "backend, operation, a, b, expected",
+    [
+        (NumericBackend(), 'divide', '1', '4', 0.25),
+        (ExactIntBackend(), 'multiply', '123456789123456789', '987654321987654321',
+         121932631356500531347203169112635269),
+        (ExactIntBackend(), 'power', '3', '100', 3 ** 100),
+        (ExactIntBackend(), 'divide', '1', '3', Fraction(1, 3)),
+        (ExactIntBackend(), 'divide', '6', '3', 2),
+        (ExactIntBackend(), 'power', '2', '-2', Fraction(1, 4)),
+        (ExactIntBackend(), 'add', '0.1', '0.2', Fraction(3, 10)),
+        (ExactIntBackend(), 'add', '0.5', '1e1', Fraction(21, 2)),
+        (ExactIntBackend(), 'modulo', '-7', '3', 2),
+        (ExactIntBackend(), 'multiply', '0.5', '4', 2),
+        (FractionBackend(), 'divide', '1', '3', Fraction(1, 3)),
+        (FractionBackend(), 'subtract', '0.3', '0.1', Fraction(1, 5)),
+        (DecimalBackend(), 'add', '0.1', '0.2', Decimal('0.3')),
+        (DecimalBackend(5), 'divide', '1', '3', Decimal('0.33333')),
+        (DecimalBackend(), 'modulo', '-7', '3', Decimal('2')),
+        (DecimalBackend(), 'modulo', '7', '-3', Decimal('-2')),
+    ],
+    ids=[
+        "float",
+        "int_product",
+        "int_power",
+        "int_division_is_a_fraction",
+        "int_division_stays_an_int",
+        "int_negative_power",
+        "int_non_integral_operands",
+        "int_exponent_notation",
+        "int_modulo",
+        "int_integral_rational_result",
+        "fraction_division",
+        "fraction_subtraction",
+        "decimal_addition",
+        "decimal_precision",
+        "decimal_modulo_follows_divisor_sign",
+        "decimal_negative_divisor",
+    ]
+)
+def test_backend_results(backend, operation, a, b, expected):
+    """Test that each backend computes exactly where its number type allows."""
+    result = backend.create(operation, a, b).result
+    assert result == expected and type(result) is type(expected)
+
+
+def test_int_backend_fast_path():
+    """Test that integer results are kept without redoing the arithmetic on rationals."""
+    backend = ExactIntBackend()
+    calculation = CalculationFactory.create_calculation('add', 2, 3)
+    with patch('app.numeric._Rational') as rational:
+        assert backend.calculate(calculation) is calculation
+    rational.assert_not_called()
+
+
+def test_int_backend_keeps_irrational_results():
+    """Test that a result no rational can hold stays a float."""
+    calculation = ExactIntBackend().create('power', '2', '0.5')
+    assert calculation.b == Fraction(1, 2) and calculation.result == pytest.approx(2 ** 0.5)
+    calculation = ExactIntBackend().create('power', '2', '-0.5')
+    assert calculation.result == pytest.approx(2 ** -0.5)
+
+
+def test_int_backend_divides_big_integers_exactly():
+    """Test that division and negative powers never go through float, however large the integers."""
+    big = 10 ** 300 + 1
+    calculation = CalculationFactory.create_calculation('divide', big, 3)
+    with patch('app.operations.Operations.division', wraps=lambda a, b: a / b) as division:
+        result = ExactIntBackend().calculate(calculation).result
+    assert result == Fraction(big, 3) and type(division.call_args.args[0]) is Fraction
+    assert ExactIntBackend().create('divide', str(3 * big), '3').result == big
+    assert ExactIntBackend().create('power', str(big), '-1').result == Fraction(1, big)
+    with pytest.raises(ZeroDivisionError):
+        ExactIntBackend().create('power', '0', '-1')
+
+
+@pytest.mark.parametrize(
+    "operation, a, b, message",
+    [
+        ('power', '10', '1e10', "Exponent too large for exact numbers (the limit is 10000)."),
+        ('power', '10', '-20000', "Exponent too large for exact numbers (the limit is 10000)."),
+        ('power', '10', '10000', "Exact result has more than 4300 digits."),
+        ('multiply', '9' * 3000, '9' * 3000, "Exact result has more than 4300 digits."),
+    ],
+    ids=["huge_exponent", "huge_negative_exponent", "too_many_digits", "big_product"],
+)
+def test_int_backend_limits(operation, a, b, message):
+    """Test that results too large to compute or show are refused instead of hanging the REPL."""
+    with pytest.raises(OverflowError, match=re.escape(message)):
+        ExactIntBackend().create(operation, a, b)
+
+
+def test_int_backend_limits_fraction_digits():
+    """Test that the digits of a fraction's denominator count too."""
+    calculation = CalculationFactory.create_calculation('divide', 1, 10 ** 5000 + 1)
+    with pytest.raises(OverflowError, match="Exact result has more than 4300 digits."):
+        ExactIntBackend().calculate(calculation)
+    with patch('app.numeric.sys.get_int_max_str_digits', return_value=0):
+        assert ExactIntBackend().calculate(calculation).result == Fraction(1, 10 ** 5000 + 1)
+
+
+def test_int_backend_converts_numbers():
+    """Test per-call conversion of numbers that are not text."""
+    backend = ExactIntBackend()
+    assert backend.convert(7) == 7 and backend.convert(2.5) == Fraction(5, 2) and backend.convert(4.0) == 4
+    assert type(backend.convert(4.0)) is int
+    assert FractionBackend().convert(0.5) == Fraction(1, 2)
+    assert DecimalBackend().convert(3) == Decimal(3) and NumericBackend().convert(3) == 3.0
+
+
+@pytest.mark.parametrize("backend", [NumericBackend(), ExactIntBackend(), FractionBackend(), DecimalBackend()])
+def test_backends_reject_bad_numbers(backend):
+    with pytest.raises(ValueError):
+        backend.parse("three")
+
+
+def test_decimal_backend_errors():
+    """Test that decimal errors are reported like float ones."""
+    backend = DecimalBackend()
+    with pytest.raises(ValueError, match="Invalid operation for decimal numbers: PowerCalculation"):
+        backend.create('power', '-8', '0.5')
+    with pytest.raises(OverflowError, match="Numerical result out of range"):
+        backend.create('power', '10', '1000000000000')
+    with pytest.raises(ZeroDivisionError):
+        backend.create('divide', '1', '0')
+    with pytest.raises(ValueError, match="Decimal precision must be at least 1."):
+        DecimalBackend(0)
+
+
+def test_decimal_results_are_cached_per_precision(monkeypatch):
+    """Test that a result cached at one precision is not reused at another."""
+    monkeypatch.setattr(CalculationFactory, 'result_cache', ResultCache(maxsize=8))
+    assert DecimalBackend(5).create('divide', '2', '3').result == Decimal('0.66667')
+    assert DecimalBackend(3).create('divide', '2', '3').result == Decimal('0.667')
+    assert DecimalBackend(5).create('divide', '2', '3').result == Decimal('0.66667')
+    assert CalculationFactory.result_cache.stats().hits == 1
+
+
+def test_get_backend():
+    """Test selecting backends by name."""
+    assert isinstance(get_backend('float'), NumericBackend)
+    assert isinstance(get_backend('INT'), ExactIntBackend)
+    assert repr(get_backend('decimal', 50)) == "DecimalBackend(precision=50)"
+    assert repr(get_backend('fraction')) == "FractionBackend()"
+    with pytest.raises(ValueError, match="Unknown numeric backend: 'complex'. Available backends: "
+                                         "float, int, decimal, fraction"):
+        get_backend('complex')
+    with pytest.raises(ValueError, match="The 'int' backend does not take a precision."):
+        get_backend('int', 10)
+
+
+def test_backend_calculations_are_ordinary_calculations():
+    """Test that backend calculations print and repr like any other."""
+    calculation = ExactIntBackend().create('divide', '1', '3')
+    assert isinstance(calculation, DivideCalculation)
+    assert str(calculation) == "DivideCalculation: 1 Divide 3 = 1/3"
+
+
+def test_decimal_precision_with_interning(monkeypatch):
+    """Test that interned decimal calculations are not shared between precisions."""
+    monkeypatch.setattr(CalculationFactory, 'intern_table', InternTable(maxsize=8))
+    fifty, five = DecimalBackend(50), DecimalBackend(5)
+    assert len(str(fifty.create('divide', '1', '3').result)) == 52
+    assert five.create('divide', '1', '3').result == Decimal('0.33333')
+    assert five.create_calculation('divide', Decimal(1), Decimal(3)) is five.create('divide', '1', '3')
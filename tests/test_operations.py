@@ -2,7 +2,11 @@ import pytest # Import the pytest framework for writing and running tests
 # Import Union for type hinting multiple possible types
 # This helps with future type cast errors that may occur otherwise
 from typing import Union 
-from app.operations import Operations
+import math
+from array import array
+from unittest.mock import patch
+from app.kernels import KernelDispatcher, size_bucket
+from app.operations import BUFFER_ONLY_KERNELS, DEFAULT_KERNELS, KERNELS, Operations
 
 """
 Because we encapsulated these methods in a class we don't need to import
@@ -177,3 +181,169 @@ def test_division_mod_negative(operation, a: Number, b: Number) -> None:
     
     assert "Division by zero is not allowed." in str(excinfo.value), \
         f"Expected error message 'Division by zero is not allowed.', but got '{excinfo.value}'"
+
+
+@pytest.mark.parametrize(
+    "operation, a, b, expected",
+    [
+        (Operations.batch_addition, [1, 2.5, -3], [4, 2.5, 3], [5.0, 5.0, 0.0]),
+        (Operations.batch_subtraction, [5, 0, -2], [2, 3, 2], [3.0, -3.0, -4.0]),
+        (Operations.batch_multiplication, [3, 0, 5.5], [3, 10, 5.5], [9.0, 0.0, 30.25]),
+        (Operations.batch_division, [3, -4, 0], [3, -2, 5], [1.0, 2.0, 0.0]),
+        (Operations.batch_power, [2, 3, 4], [3, 2, 0.5], [8.0, 9.0, 2.0]),
+        (Operations.batch_modulo, [3, 5.5, 2.5], [3, 2.0, -5.5], [0.0, 1.5, -3.0]),
+    ],
+    ids=[
+        "batch_addition",
+        "batch_subtraction",
+        "batch_multiplication",
+        "batch_division",
+        "batch_power",
+        "batch_modulo",
+    ]
+)
+def test_batch_operations(operation, a, b, expected) -> None:
+    results, errors = operation(array('d', a), memoryview(array('d', b)))
+    assert list(results) == expected, f"Expected {operation.__name__} to be {expected}, but got {list(results)}"
+    assert list(errors) == [0] * len(expected)
+
+
+@pytest.mark.parametrize(
+    "operation, a, b, expected_errors",
+    [
+        (Operations.batch_division, [1, 2, 3], [1, 0, 3], [0, 1, 0]),
+        (Operations.batch_modulo, [1, 2, 3], [0, 0, 2], [1, 1, 0]),
+        (Operations.batch_power, [0, -8, 10], [-1, 0.5, 400], [1, 1, 1]),
+        (Operations.batch_addition, [10**400, 1, 10**400], [1, 1, -10**400], [1, 0, 0]),
+        (Operations.batch_multiplication, [10**400, 2.0], [0.5, 2.0], [1, 0]),
+        (Operations.batch_division, [10**400, 1], [3, 2], [1, 0]),
+    ],
+    ids=[
+        "batch_divide_by_zero",
+        "batch_mod_by_zero",
+        "batch_power_undefined",
+        "batch_add_int_too_large",
+        "batch_multiply_int_too_large",
+        "batch_divide_int_too_large",
+    ]
+)
+def test_batch_operations_error_mask(operation, a, b, expected_errors) -> None:
+    results, errors = operation(a, b)
+    assert list(errors) == expected_errors
+    for result, error in zip(results, errors):
+        assert math.isnan(result) == bool(error)
+
+
+def test_batch_operations_float_overflow() -> None:
+    """A float sum or product that overflows is inf, like the scalar operators; power fails."""
+    results, errors = Operations.batch_multiplication([1e308, 2.0], [10.0, 2.0])
+    assert list(results) == [math.inf, 4.0] and list(errors) == [0, 0]
+    results, errors = Operations.batch_power([10.0], [400.0])
+    assert math.isnan(results[0]) and list(errors) == [1]
+
+
+BATCH_OPERATIONS = ["batch_addition", "batch_subtraction", "batch_multiplication",
+                    "batch_division", "batch_power", "batch_modulo"]
+
+
+@pytest.mark.parametrize("name", BATCH_OPERATIONS)
+def test_batch_operations_numpy_matches_array_path(name) -> None:
+    """The NumPy path returns the same results and error mask as the array path."""
+    numpy = pytest.importorskip("numpy")
+    operation = getattr(Operations, name)
+    a = [1.5, 1e308, -8.0, 0.0, 10.0, math.inf, 7.0, 0.0]
+    b = [2.0, 10.0, 0.5, -1.0, 400.0, 2.0, 0.0, 0.0]
+
+    expected_results, expected_errors = operation(a, b)
+    results, errors = operation(numpy.array(a), numpy.array(b))
+
+    assert isinstance(results, numpy.ndarray)
+    assert list(errors) == list(expected_errors)
+    assert numpy.array_equal(results, numpy.array(expected_results), equal_nan=True)
+
+
+@pytest.mark.parametrize("name", BATCH_OPERATIONS)
+def test_batch_operations_numpy_with_int_too_large(name) -> None:
+    """An int operand too large for a float64 is flagged in the mask on the NumPy path too."""
+    numpy = pytest.importorskip("numpy")
+    operation = getattr(Operations, name)
+    results, errors = operation([10**400, 6], numpy.array([3.0, 3.0]))
+    assert list(errors) == [1, 0]
+    assert math.isnan(results[0]) and results[1] == operation([6], [3.0])[0][0]
+
+
+def test_batch_operations_length_mismatch() -> None:
+    with pytest.raises(ValueError, match="Operand sequences must have the same length."):
+        Operations.batch_addition([1, 2], [1])
+
+
+KERNEL_CASES = [
+    (name, kernel) for name in KERNELS for kernel in KERNELS[name]
+]
+
+
+@pytest.mark.parametrize("name, kernel", KERNEL_CASES, ids=[f"{name}-{kernel}" for name, kernel in KERNEL_CASES])
+def test_batch_kernels_agree(name, kernel) -> None:
+    """Every kernel of an operation returns the same results and error mask."""
+    a = [1.5, 1e308, -8.0, 0.0, 10.0, math.inf, 7.0, 0.0, -7.5, 2.0]
+    b = [2.0, 10.0, 0.5, -1.0, 400.0, 2.0, 0.0, 0.0, 2.0, -3.0]
+    expected_results, expected_errors = KERNELS[name]['array'](a, b)
+
+    # NumPy only takes float64 buffers; the other kernels take any sequence.
+    results, errors = KERNELS[name][kernel](array('d', a), array('d', b))
+
+    assert isinstance(results, array) and isinstance(errors, array)
+    assert list(errors) == list(expected_errors)
+    assert [str(x) for x in results] == [str(x) for x in expected_results]
+
+
+@pytest.mark.parametrize("kernel", ["scalar", "operator", "array"])
+def test_batch_kernels_with_int_too_large(kernel) -> None:
+    """Ints too large for a float are flagged by every kernel that takes sequences."""
+    results, errors = KERNELS['addition'][kernel]([10**400, 1, 2], [1, 1, 3])
+    assert list(errors) == [1, 0, 0] and list(results)[1:] == [2.0, 5.0]
+    with pytest.raises(ValueError, match="Operand sequences must have the same length."):
+        KERNELS['division'][kernel]([1.0], [])
+
+
+def test_batch_operations_without_dispatcher(monkeypatch) -> None:
+    """Without a dispatcher the batch methods use the default kernels."""
+    monkeypatch.setattr(Operations, 'dispatcher', None)
+    calls = []
+    monkeypatch.setitem(KERNELS['division'], DEFAULT_KERNELS['division'],
+                        lambda a, b: calls.append((a, b)) or (array('d', [0.5]), array('B', [0])))
+    assert Operations.batch_division([1.0], [2.0]) == (array('d', [0.5]), array('B', [0]))
+    assert calls == [([1.0], [2.0])]
+
+
+def test_batch_operations_use_the_dispatcher() -> None:
+    """The batch methods run whichever kernel the dispatcher chose."""
+    with patch.object(Operations.dispatcher, 'run', return_value="chosen") as run:
+        assert Operations.batch_power([2.0], [3.0]) == "chosen"
+    run.assert_called_once_with('power', [2.0], [3.0])
+
+
+@pytest.mark.parametrize("name", ["addition", "division", "power"])
+def test_batch_numpy_kernel_on_buffers(name) -> None:
+    """The NumPy kernel takes array('d') and contiguous memoryview operands and returns arrays."""
+    pytest.importorskip("numpy")
+    a = array('d', [6.0, 1.0, -8.0, 1e308])
+    b = array('d', [3.0, 0.0, 0.5, 10.0])
+    expected = KERNELS[name]['array'](a, b)
+    results, errors = KERNELS[name]['numpy'](memoryview(a), b)
+    assert isinstance(results, array) and results.typecode == 'd' and errors.typecode == 'B'
+    assert list(errors) == list(expected[1])
+    assert [str(x) for x in results] == [str(x) for x in expected[0]]
+
+
+def test_batch_operations_on_strided_views() -> None:
+    """A strided memoryview is not a plain buffer, so it never reaches the NumPy kernel."""
+    pytest.importorskip("numpy")
+    view = memoryview(array('d', range(20000)))[::2]
+    dispatcher = KernelDispatcher(KERNELS, buffer_only=BUFFER_ONLY_KERNELS, repeat=1)
+    # A dispatcher that picks NumPy for buffers of this size.
+    dispatcher.decisions[('addition', 'buffer', size_bucket(len(view)))] = 'numpy'
+    with patch.object(Operations, 'dispatcher', dispatcher):
+        results, errors = Operations.batch_addition(view, view)
+    assert results[:3] == array('d', [0.0, 4.0, 8.0]) and len(results) == 10000 and not any(errors)
+    assert ('addition', 'sequence', size_bucket(len(view))) in dispatcher.decisions
@@ -0,0 +1,283 @@
+""" tests/test_plugins.py """
+import json
+import sys
+import textwrap
+import pytest
+
+from app.calculation import Calculation, CalculationFactory
+from app.expression import build, compile_tree, optimize, Number
+from app.history import calculation_from_entry
+from app.plugins import ENTRY_POINT_GROUP, iter_entry_points, load_plugins, read_manifest
+
+PLUGIN_SOURCE = textwrap.dedent("""
+    from app.calculation import Calculation, CalculationFactory
+
+    class CubeCalculation(Calculation):
+        __slots__ = ()
+
+        def execute(self):
+            return self.a ** 3 + self.b
+
+    @CalculationFactory.register_calculation('hypot', aliases=('hyp',))
+    class HypotCalculation(Calculation):
+        __slots__ = ()
+
+        def execute(self):
+            return (self.a ** 2 + self.b ** 2) ** 0.5
+
+    NOT_A_CALCULATION = 42
+""")
+
+PLUGIN_TYPES = ('cube', 'hypot', 'square', 'broken', 'badplug')
+
+
+@pytest.fixture
+def plugin_path(tmp_path, monkeypatch):
+    """Puts a plugin module 'calc_plugin_ops' on sys.path and forgets it and its types afterwards."""
+    (tmp_path / 'calc_plugin_ops.py').write_text(PLUGIN_SOURCE)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield tmp_path
+    sys.modules.pop('calc_plugin_ops', None)
+    for calculation_type in PLUGIN_TYPES:
+        if calculation_type in CalculationFactory._registry.calculations or calculation_type in CalculationFactory._registry.lazy:
+            CalculationFactory.unregister_calculation(calculation_type)
+
+
+# -----------------------------------------------------------------------------------
+# Lazy registration in CalculationFactory
+# -----------------------------------------------------------------------------------
+def test_lazy_type_is_imported_on_first_use(plugin_path):
+    """Test that a declared type is listed and resolved without importing its module."""
+    CalculationFactory.register_lazy('Cube', 'calc_plugin_ops:CubeCalculation', aliases=('cb',))
+
+    assert 'calc_plugin_ops' not in sys.modules
+    assert 'cube' in CalculationFactory._registry.dispatch
+    assert CalculationFactory._registry.available_types.endswith('cube')
+    with pytest.raises(ValueError, match="Available types: .*modulo, cube"):
+        CalculationFactory.create_calculation('floor', 1.0, 2.0)
+
+    calculation = CalculationFactory.create_calculation('cub', 2.0, 1.0)
+
+    assert 'calc_plugin_ops' in sys.modules
+    assert type(calculation).__name__ == 'CubeCalculation'
+    assert calculation.result == 9.0
+    assert CalculationFactory._registry.names[type(calculation)] == 'cube'
+    assert 'cube' not in CalculationFactory._registry.lazy
+    assert CalculationFactory.create_calculation('CB', 1.0, 1.0).result == 2.0
+
+
+def test_lazy_type_registering_itself(plugin_path):
+    """Test a plugin module that registers its class (and alias) with the decorator on import."""
+    CalculationFactory.register_lazy('hypot', 'calc_plugin_ops:HypotCalculation', aliases=('hyp',))
+
+    assert CalculationFactory.create_calculation('hyp', 3.0, 4.0).result == 5.0
+    assert CalculationFactory._registry.aliases['hyp'] == 'hypot'
+
+
+@pytest.mark.parametrize("target, message", [
+    ('calc_plugin_missing:Cube', "No module named 'calc_plugin_missing'"),
+    ('calc_plugin_ops:Missing', "has no attribute 'Missing'"),
+    ('calc_plugin_ops:NOT_A_CALCULATION', "is not a Calculation subclass"),
+])
+def test_lazy_type_that_cannot_load(plugin_path, target, message):
+    """Test that a broken plugin raises a ValueError and stays declared."""
+    CalculationFactory.register_lazy('broken', target, aliases=('brk',))
+
+    for _ in range(2):
+        with pytest.raises(ValueError, match=f"Cannot load calculation type 'broken' from '{target}': .*{message}"):
+            CalculationFactory.create_calculation('brk', 1.0, 2.0)
+    assert CalculationFactory._registry.lazy['broken'] == target
+    assert CalculationFactory._registry.aliases['brk'] == 'broken'
+
+
+@pytest.mark.parametrize("source, message", [
+    ("def broken(:\n", "SyntaxError|invalid syntax"),
+    ("raise RuntimeError('missing license server')\n", "missing license server"),
+])
+def test_lazy_type_whose_module_fails(plugin_path, source, message):
+    """Test that any error raised while importing a plugin module becomes a ValueError."""
+    (plugin_path / 'calc_plugin_bad.py').write_text(source)
+    CalculationFactory.register_lazy('badplug', 'calc_plugin_bad:X')
+    try:
+        with pytest.raises(ValueError, match=f"Cannot load calculation type 'badplug' from 'calc_plugin_bad:X': .*({message})"):
+            CalculationFactory.create_calculation('badplug', 1.0, 2.0)
+    finally:
+        sys.modules.pop('calc_plugin_bad', None)
+
+
+def test_register_lazy_rejects_bad_declarations(plugin_path):
+    """Test malformed targets and names that are already taken."""
+    with pytest.raises(ValueError, match="Invalid plugin target for 'cube': 'calc_plugin_ops'"):
+        CalculationFactory.register_lazy('cube', 'calc_plugin_ops')
+    CalculationFactory.register_lazy('cube', 'calc_plugin_ops:CubeCalculation')
+    for calculation_type, aliases in [('add', ()), ('CUBE', ()), ('square', ('plus',)), ('square', ('square',))]:
+        with pytest.raises(ValueError, match="is already registered."):
+            CalculationFactory.register_lazy(calculation_type, 'calc_plugin_ops:CubeCalculation', aliases)
+    assert 'square' not in CalculationFactory._registry.lazy
+
+
+def test_register_claims_lazy_type(plugin_path):
+    """Test that registering a class for a declared type replaces the declaration, keeping its aliases."""
+    CalculationFactory.register_lazy('cube', 'calc_plugin_ops:CubeCalculation', aliases=('cb',))
+    for aliases in [('cb',), ('cube',)]:
+        with pytest.raises(ValueError, match=f"Calculation type '{aliases[0]}' is already registered."):
+            CalculationFactory.register_calculation('square', aliases=aliases)(Calculation)
+    with pytest.raises(ValueError, match="Calculation type 'add' is already registered."):
+        CalculationFactory.register_calculation('cube', aliases=('add',))(Calculation)
+
+    CalculationFactory.register_calculation('cube', aliases=('cb',))(Calculation)
+
+    assert CalculationFactory.get_calculation_class('cb') is None
+    assert CalculationFactory.get_calculation_class('cube') is Calculation
+    assert 'cube' not in CalculationFactory._registry.lazy
+    assert 'calc_plugin_ops' not in sys.modules
+
+
+def test_unregister_lazy_type(plugin_path):
+    """Test that a declared type can be removed before it was ever loaded."""
+    CalculationFactory.register_lazy('cube', 'calc_plugin_ops:CubeCalculation', aliases=('cb',))
+    CalculationFactory.unregister_calculation('cube')
+
+    assert not CalculationFactory.is_registered('cube')
+    assert not CalculationFactory.is_registered('cb')
+    assert 'calc_plugin_ops' not in sys.modules
+    # A load racing with the removal still returns the class, without declaring the type again.
+    assert CalculationFactory._load('cube', 'calc_plugin_ops:CubeCalculation').__name__ == 'CubeCalculation'
+    assert not CalculationFactory.is_registered('cube')
+
+
+def test_lazy_types_in_history_and_expressions(plugin_path):
+    """Test that stored entries and expression trees load plugin types on demand."""
+    assert CalculationFactory.get_calculation_class('cube') is None
+    CalculationFactory.register_lazy('cube', 'calc_plugin_ops:CubeCalculation')
+
+    tree = build('cube', 'x', 1)
+
+    assert 'calc_plugin_ops' not in sys.modules
+    assert compile_tree(tree)({'x': 2.0}) == 9.0
+    assert optimize(build('cube', 3, 0)) == Number(27.0)
+    assert calculation_from_entry('cube', 2.0, 1.0, 9.0).result == 9.0
+    assert CalculationFactory.get_calculation_class('cube').__name__ == 'CubeCalculation'
+
+
+# -----------------------------------------------------------------------------------
+# Discovery: entry points and manifests
+# -----------------------------------------------------------------------------------
+def write_distribution(directory, name, entry_points):
+    info = directory / name
+    info.mkdir(parents=True)
+    if entry_points is not None:
+        (info / 'entry_points.txt').write_text(textwrap.dedent(entry_points))
+
+
+def test_iter_entry_points(tmp_path):
+    """Test reading the entry point group from dist-info and egg-info directories."""
+    first, second = tmp_path / 'first', tmp_path / 'second'
+    write_distribution(first, 'ops-1.0.dist-info', f"""
+        # Comment
+        [console_scripts]
+        cube = not_this:one
+
+        [{ENTRY_POINT_GROUP}]
+        cube = ops.cube:CubeCalculation
+        hypot = ops.geometry:Hypot [fast]
+    """)
+    write_distribution(first, 'empty-1.0.dist-info', None)
+    write_distribution(second, 'legacy.egg-info', f"""
+        [{ENTRY_POINT_GROUP}]
+        cube = legacy:Cube
+        square = legacy:Square
+    """)
+    (second / 'module.py').write_text('')
+
+    found = list(iter_entry_points(path=[str(first), str(tmp_path / 'missing'), str(second)]))
+
+    assert found == [('cube', 'ops.cube:CubeCalculation'), ('hypot', 'ops.geometry:Hypot'), ('square', 'legacy:Square')]
+
+
+def test_iter_entry_points_current_directory(tmp_path, monkeypatch):
+    """Test that an empty sys.path entry means the current directory."""
+    write_distribution(tmp_path, 'ops-1.0.dist-info', f"[{ENTRY_POINT_GROUP}]\ncube = ops:Cube\n")
+    monkeypatch.chdir(tmp_path)
+    assert list(iter_entry_points(path=[''])) == [('cube', 'ops:Cube')]
+
+
+def test_read_manifest(tmp_path):
+    """Test both forms of manifest entries."""
+    manifest = tmp_path / 'plugins.json'
+    manifest.write_text(json.dumps({"calculations": {
+        "cube": "ops:Cube",
+        "hypot": {"target": "ops:Hypot", "aliases": ["hyp"]},
+        "square": {"target": "ops:Square"},
+    }}))
+    assert read_manifest(str(manifest)) == {'cube': ('ops:Cube', []), 'hypot': ('ops:Hypot', ['hyp']),
+                                            'square': ('ops:Square', [])}
+
+
+@pytest.mark.parametrize("content, message", [
+    ('{"calculations": ', "Invalid plugin manifest '.*': Expecting value"),
+    ('[]', 'expected a "calculations" object'),
+    ('{"calculations": []}', 'expected a "calculations" object'),
+    ('{"calculations": {"cube": 3}}', "bad entry for 'cube'"),
+    ('{"calculations": {"cube": {"aliases": []}}}', "bad entry for 'cube'"),
+    ('{"calculations": {"cube": {"target": "ops:Cube", "aliases": "cb"}}}', "bad entry for 'cube'"),
+    ('{"calculations": {"cube": {"target": "ops:Cube", "aliases": [1]}}}', "bad entry for 'cube'"),
+])
+def test_read_manifest_errors(tmp_path, content, message):
+    """Test that malformed manifests raise a ValueError naming the file."""
+    manifest = tmp_path / 'plugins.json'
+    manifest.write_text(content)
+    with pytest.raises(ValueError, match=message):
+        read_manifest(str(manifest))
+
+
+def test_load_plugins(plugin_path, monkeypatch):
+    """Test declaring entry points and manifests, skipping types that are already known."""
+    write_distribution(plugin_path, 'calc_plugin_ops-1.0.dist-info',
+                       f"[{ENTRY_POINT_GROUP}]\ncube = calc_plugin_ops:CubeCalculation\nadd = calc_plugin_ops:Other\n")
+    manifest = plugin_path / 'plugins.json'
+    manifest.write_text(json.dumps({"calculations": {
+        "hypot": {"target": "calc_plugin_ops:HypotCalculation", "aliases": ["hyp"]},
+        "cube": "calc_plugin_ops:Other",
+    }}))
+    monkeypatch.setenv('CALCULATOR_PLUGINS', str(manifest))
+
+    assert load_plugins() == ['cube', 'hypot']
+    assert load_plugins() == []
+
+    assert 'calc_plugin_ops' not in sys.modules
+    assert CalculationFactory.create_calculation('hyp', 6.0, 8.0).result == 10.0
+    assert CalculationFactory.create_calculation('cube', 1.0, 1.0).result == 2.0
+
+
+def test_load_plugins_explicit_manifests(plugin_path, monkeypatch):
+    """Test that explicit manifests replace $CALCULATOR_PLUGINS."""
+    monkeypatch.setenv('CALCULATOR_PLUGINS', str(plugin_path / 'missing.json'))
+    manifest = plugin_path / 'plugins.json'
+    manifest.write_text('{"calculations": {"square": "calc_plugin_ops:CubeCalculation"}}')
+    assert load_plugins([str(manifest)], entry_points=False) == ['square']
+    assert load_plugins([], entry_points=False) == []
+
+
+def test_load_plugins_skips_bad_entries(plugin_path):
+    """Test that taken aliases and malformed targets are skipped with a warning, not fatal."""
+    manifest = plugin_path / 'plugins.json'
+    manifest.write_text(json.dumps({"calculations": {
+        "broken": "no_colon_here",
+        "hypot": {"target": "calc_plugin_ops:HypotCalculation", "aliases": ["plus", "hyp", "HYP", "hypot"]},
+        "cube": "calc_plugin_ops:CubeCalculation",
+    }}))
+
+    with pytest.warns(RuntimeWarning) as record:
+        declared = load_plugins([str(manifest)], entry_points=False)
+
+    assert declared == ['hypot', 'cube']
+    assert [str(warning.message) for warning in record] == [
+        "Skipping plugin 'broken': Invalid plugin target for 'broken': 'no_colon_here' (expected 'module:Class').",
+        "Plugin alias 'plus' for 'hypot' is already registered; ignoring it.",
+        "Plugin alias 'HYP' for 'hypot' is already registered; ignoring it.",
+        "Plugin alias 'hypot' for 'hypot' is already registered; ignoring it.",
+    ]
+    assert CalculationFactory._registry.aliases['plus'] == 'add'
+    assert CalculationFactory._registry.aliases['hyp'] == 'hypot'
+    assert CalculationFactory.create_calculation('cube', 2.0, 0.0).result == 8.0
@@ -0,0 +1,153 @@
+""" tests/test_server.py """
+import asyncio
+import threading
+
+import pytest
+
+from app.server import LINE_LIMIT, CalculatorClient, run_client, start_server
+
+
+def run_with_server(scenario):
+    """Starts a server on a free local port, runs `scenario(port)` against it and stops it."""
+    async def main():
+        server = await start_server("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            return await scenario(port)
+        finally:
+            server.close()
+            await server.wait_closed()
+    return asyncio.run(main())
+
+
+def test_request_reply():
+    """Test a single request and the structured error reply."""
+    async def scenario(port):
+        client = await CalculatorClient.connect("127.0.0.1", port)
+        replies = [await client.request("add 1 2"), await client.request("divide 1 0")]
+        await client.close()
+        return replies
+
+    assert run_with_server(scenario) == ["3.0", "error: division_by_zero: Cannot divide by zero."]
+
+
+@pytest.mark.parametrize("high_water", [64 * 1024, -1], ids=["buffered_replies", "drain_every_reply"])
+def test_pipelined_requests_keep_order(monkeypatch, high_water):
+    """Test that many pipelined requests are answered in order, one reply each."""
+    monkeypatch.setattr('app.server.WRITE_HIGH_WATER', high_water)
+
+    async def scenario(port):
+        client = await CalculatorClient.connect("127.0.0.1", port)
+        replies = await client.pipeline(f"multiply {i} 2" for i in range(20000))
+        await client.close()
+        return replies
+
+    assert run_with_server(scenario) == [f"{i * 2.0}" for i in range(20000)]
+
+
+def test_each_connection_has_its_own_history():
+    """Test that concurrent connections do not share history."""
+    async def scenario(port):
+        first = await CalculatorClient.connect("127.0.0.1", port)
+        second = await CalculatorClient.connect("127.0.0.1", port)
+        # Comments and blank lines get no reply, so they are written without waiting for one.
+        first.writer.write(b"# comment\n\n")
+        await first.pipeline(["add 1 1", "help"])
+        replies = [await first.request("history"), await second.request("history")]
+        await first.close()
+        await second.close()
+        return replies
+
+    assert run_with_server(scenario) == [
+        "1. AddCalculation: 1.0 Add 1.0 = 2.0",
+        "No calculations performed yet.",
+    ]
+
+
+def test_many_concurrent_clients():
+    """Test that the server handles many clients at once."""
+    async def scenario(port):
+        async def one_client(i):
+            client = await CalculatorClient.connect("127.0.0.1", port)
+            reply = await client.request(f"add {i} {i}")
+            await client.close()
+            return reply
+        return await asyncio.gather(*(one_client(i) for i in range(200)))
+
+    assert run_with_server(scenario) == [f"{i * 2.0}" for i in range(200)]
+
+
+def test_server_handles_client_disconnect():
+    """Test that a client disconnecting without 'exit' ends its connection cleanly."""
+    async def scenario(port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"add 1 1\n")
+        writer.write_eof()
+        replies = await reader.read()
+        writer.close()
+        await writer.wait_closed()
+        return replies
+
+    assert run_with_server(scenario) == b"2.0\n"
+
+
+def test_client_reports_closed_connection():
+    """Test that the client raises when the server closes before replying."""
+    async def scenario(port):
+        client = await CalculatorClient.connect("127.0.0.1", port)
+        with pytest.raises(ConnectionError, match="Server closed the connection."):
+            await client.pipeline(["exit"])
+        await client.close()
+
+    run_with_server(scenario)
+
+
+def test_run_client_helper():
+    """Test the synchronous client helper against a server running in another thread."""
+    # Arrange
+    started = threading.Event()
+    state = {}
+
+    def serve():
+        async def main():
+            server = await start_server("127.0.0.1", 0)
+            state['port'] = server.sockets[0].getsockname()[1]
+            state['stop'] = asyncio.Event()
+            state['loop'] = asyncio.get_running_loop()
+            started.set()
+            await state['stop'].wait()
+            server.close()
+            await server.wait_closed()
+        asyncio.run(main())
+
+    thread = threading.Thread(target=serve)
+    thread.start()
+    started.wait(5)
+
+    # Act
+    try:
+        replies = run_client(["power 2 10", "2 ^ 3"], "127.0.0.1", state['port'])
+    finally:
+        state['loop'].call_soon_threadsafe(state['stop'].set)
+        thread.join(5)
+
+    # Assert
+    assert replies == ["1024.0", "8.0"]
+
+
+@pytest.mark.parametrize("ending", [b"\nadd 1 2\n", b""], ids=["more_requests", "connection_ends"])
+def test_oversized_line_is_answered_with_an_error(ending):
+    """Test that a line over the limit gets an error reply and the connection keeps serving."""
+    async def scenario(port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"add " + b"1" * (3 * LINE_LIMIT) + ending)
+        writer.write_eof()
+        replies = (await reader.read()).decode("utf-8").splitlines()
+        writer.close()
+        await writer.wait_closed()
+        return replies
+
+    expected = [f"error: line_too_long: Lines are limited to {LINE_LIMIT} bytes."]
+    if ending:
+        expected.append("3.0")
+    assert run_with_server(scenario) == expected
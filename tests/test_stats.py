@@ -0,0 +1,139 @@
+""" tests/test_stats.py """
+import pytest
+
+from app.calculation import CalculationFactory, Calculation
+from app.stats import (
+    STATS,
+    LatencyHistogram,
+    StatsRegistry,
+    bucket_index,
+    bucket_value,
+)
+
+
+class HalfPowerCalculation(Calculation):
+    """A calculation registered only while a test needs an ambiguous prefix."""
+    __slots__ = ()
+
+    def execute(self) -> float:
+        return self.a ** 0.5
+
+
+@pytest.fixture(autouse=True)
+def clean_stats():
+    """Keeps the process-wide registry off and empty around every test."""
+    STATS.disable()
+    STATS.reset()
+    yield
+    STATS.disable()
+    STATS.reset()
+
+
+@pytest.mark.parametrize("value", [0, 1, 31, 32, 33, 63, 64, 1000, 123456789, 2 ** 63])
+def test_bucket_bounds_contain_value(value):
+    """Test that every value lands in a bucket whose upper bound is within ~6% of it."""
+    upper = bucket_value(bucket_index(value))
+    assert value <= upper <= value + value / 16 + 1
+
+
+def test_bucket_indexes_are_contiguous():
+    """Test that consecutive buckets cover consecutive value ranges."""
+    for index in range(40, 200):
+        assert bucket_index(bucket_value(index)) == index
+        assert bucket_index(bucket_value(index) + 1) == index + 1
+
+
+def test_histogram_percentiles():
+    """Test percentiles over a known distribution."""
+    # Arrange
+    histogram = LatencyHistogram()
+    assert histogram.percentile(50) == 0
+
+    # Act
+    for value in range(1, 1001):
+        histogram.record(value)
+    histogram.record(1_000_000)
+
+    # Assert
+    assert histogram.total == 1001
+    assert 500 <= histogram.percentile(50) <= 532
+    assert 990 <= histogram.percentile(99) <= 1023
+    assert histogram.percentile(100) == histogram.max == 1_000_000
+
+
+def test_registry_records_counts_errors_and_latency():
+    """Test the Python API of the registry."""
+    # Arrange
+    registry = StatsRegistry()
+    assert registry.format() == "No statistics collected yet."
+
+    # Act
+    registry.record('add', 20)
+    registry.record('add', 3_000)
+    registry.record('power', 2_500_000)
+    registry.record_error('divide', 'zero_division')
+    registry.record_error('divide', 'zero_division')
+
+    # Assert
+    snapshot = registry.snapshot()
+    assert list(snapshot) == ['add', 'divide', 'power']
+    assert snapshot['add']['count'] == 2
+    assert snapshot['add']['p50_ns'] == 20
+    assert snapshot['divide'] == {"count": 0, "errors": {'zero_division': 2},
+                                  "p50_ns": 0, "p99_ns": 0, "p999_ns": 0, "max_ns": 0}
+    table = registry.format()
+    assert "zero_division=2" in table
+    assert "20 ns" in table and "us" in table and "ms" in table
+
+
+def test_calculations_are_instrumented_only_when_enabled():
+    """Test that the factory and execute record into STATS only while it is enabled."""
+    # Disabled: nothing is recorded.
+    CalculationFactory.create_calculation('add', 1.0, 2.0).result
+    assert STATS.snapshot() == {}
+
+    # Enabled: successes, zero division, overflow and unsupported types are recorded.
+    STATS.enable()
+    CalculationFactory.create_calculation('add', 1.0, 2.0).result
+    with pytest.raises(ZeroDivisionError):
+        CalculationFactory.create_calculation('modulo', 1.0, 0.0).result
+    with pytest.raises(OverflowError):
+        CalculationFactory.create_calculation('power', 10.0, 400.0).result
+    with pytest.raises(ValueError):
+        CalculationFactory.create_calculation('floor', 1.0, 2.0)
+
+    CalculationFactory.register_calculation('powmod')(HalfPowerCalculation)
+    try:
+        with pytest.raises(ValueError, match="Ambiguous"):
+            CalculationFactory.create_calculation('pow', 1.0, 2.0)
+    finally:
+        CalculationFactory.unregister_calculation('powmod')
+
+    snapshot = STATS.snapshot()
+    assert snapshot['unknown']['errors'] == {'unsupported_type': 1, 'ambiguous_type': 1}
+    assert snapshot['add']['count'] == 1
+    assert snapshot['modulo']['errors'] == {'zero_division': 1}
+    assert snapshot['power']['errors'] == {'overflow': 1}
+
+
+def test_unregistered_calculation_uses_class_name():
+    """Test that calculations not created through the factory are reported by class name."""
+    class HalfCalculation(Calculation):
+        def execute(self) -> float:
+            return self.a / 2
+
+    STATS.enable()
+    assert HalfCalculation(4.0, 0.0).result == 2.0
+    assert STATS.snapshot()['HalfCalculation']['count'] == 1
+
+
+def test_cached_calculations_are_instrumented(monkeypatch):
+    """Test that the timed path also goes through the result cache."""
+    from app.cache import ResultCache
+    cache = ResultCache()
+    monkeypatch.setattr(CalculationFactory, 'result_cache', cache)
+    STATS.enable()
+    for _ in range(2):
+        CalculationFactory.create_calculation('add', 1.0, 2.0).result
+    assert STATS.snapshot()['add']['count'] == 2
+    assert cache.hits == 1